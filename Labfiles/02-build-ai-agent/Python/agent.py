@@ -85,6 +85,8 @@ def main():
             last_msg = agent_client.messages.get_last_message_text_by_role(
                 thread_id=thread.id,
                 role=MessageRole.AGENT,
+                run_id=run.id,
+                limit=1,
             )
             if last_msg:
                 print(f"Last Message: {last_msg.text.value}")
@@ -1,11 +1,13 @@
 import os, time
 import asyncio
 import json
+import importlib.util
 from dotenv import load_dotenv
 from contextlib import AsyncExitStack
 # Add references
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
+from mcp.shared.memory import create_connected_server_and_client_session
 from azure.ai.agents import AgentsClient
 from azure.ai.agents.models import FunctionTool, MessageRole, ListSortOrder
 from azure.identity import DefaultAzureCredential
@@ -17,6 +19,15 @@ os.system('cls' if os.name=='nt' else 'clear')
 load_dotenv()
 project_endpoint = os.getenv("PROJECT_ENDPOINT")
 model_deployment = os.getenv("MODEL_DEPLOYMENT_NAME")
+# Set MCP_IN_PROCESS=true to run the Python server inside this process instead of as a subprocess
+in_process = os.getenv("MCP_IN_PROCESS", "false").lower() == "true"
+
+def load_server(path):
+    # Import the server module (without running it) and return its FastMCP object
+    spec = importlib.util.spec_from_file_location("mcp_server", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.mcp
 
 async def connect_to_server(exit_stack: AsyncExitStack):
     # server_params = StdioServerParameters(
@@ -26,6 +37,17 @@ async def connect_to_server(exit_stack: AsyncExitStack):
     # )
     parent_server_path = os.path.join("..", "..", "09-min-mcp-server", "server.py")
     print("Starting server from:", parent_server_path)
+
+    if in_process:
+        # Same MCP session, over memory streams: no process to spawn, no pipes
+        server = load_server(parent_server_path)
+        session = await exit_stack.enter_async_context(
+            create_connected_server_and_client_session(getattr(server, "_mcp_server", server))
+        )
+        response = await session.list_tools()
+        print("\nConnected in-process to server with tools:", [tool.name for tool in response.tools])
+        return session
+
     server_params = StdioServerParameters(
         command="python",
         # args=["server.py"],
@@ -152,8 +174,8 @@ async def chat_loop(session):
         if run.status == "failed":
             print(f"Run failed: {run.last_error}")
 
-        # Display the response
-        messages = agents_client.messages.list(thread_id=thread.id, order=ListSortOrder.ASCENDING)
+        # Display the response, listing only the messages this run added
+        messages = agents_client.messages.list(thread_id=thread.id, run_id=run.id, order=ListSortOrder.ASCENDING)
         for message in messages:
             if message.text_messages:
                 last_msg = message.text_messages[-1]
@@ -38,4 +38,5 @@ def get_weekly_sales() -> dict:
         "Dry Shampoo": 17
     }
 
-mcp.run()
\ No newline at end of file
+if __name__ == "__main__":
+    mcp.run()
@@ -4,7 +4,7 @@ import os
 
 from azure.ai.agents import AgentsClient
 from azure.ai.agents.models import Agent, MessageRole, ListSortOrder
-from azure.identity import DefaultAzureCredential
+from credentials import shared_credential
 
 class OutlineAgent:
 
@@ -13,10 +13,7 @@ class OutlineAgent:
         # Create the agents client
         self.client = AgentsClient(
             endpoint=os.environ['PROJECT_ENDPOINT'],
-            credential=DefaultAzureCredential(
-                exclude_environment_credential=True,
-                exclude_managed_identity_credential=True
-            )
+            credential=shared_credential()
         )
 
         self.agent: Agent | None = None
@@ -55,7 +52,7 @@ class OutlineAgent:
             return [f'Error: {run.last_error}']
 
         # Get response messages
-        messages = self.client.messages.list(thread_id=thread.id, order=ListSortOrder.DESCENDING)
+        messages = self.client.messages.list(thread_id=thread.id, run_id=run.id, order=ListSortOrder.DESCENDING, limit=1)
         responses = []
         for msg in messages:
             # Only get the latest assistant response
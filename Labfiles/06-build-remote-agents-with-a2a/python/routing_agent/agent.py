@@ -7,7 +7,7 @@ import httpx
 
 from typing import Any, Callable
 from azure.ai.agents import AgentsClient
-from azure.identity import DefaultAzureCredential
+from credentials import shared_credential
 from azure.ai.agents.models import ListSortOrder, FunctionTool, MessageRole
 from collections.abc import Callable
 from dotenv import load_dotenv
@@ -28,6 +28,43 @@ load_dotenv()
 TaskCallbackArg = Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent
 TaskUpdateCallback = Callable[[TaskCallbackArg, AgentCard], Task]
 
+# Steps tried in turn on tool outputs over budget:
+# (artifacts kept, parts kept per artifact and in the status message, characters kept per text part)
+TOOL_OUTPUT_LEVELS = [(None, None, 2000), (10, 10, 1000), (5, 5, 500), (3, 3, 200), (1, 1, 100), (0, 0, 0)]
+
+
+def _truncate_parts(parts: list[dict], max_parts: int | None, max_chars: int) -> dict:
+    """At most max_parts parts with text cut to max_chars, and a count of the parts dropped."""
+    kept = []
+    for part in parts:
+        if max_parts is not None and len(kept) >= max_parts:
+            break
+        if "text" in part and len(part["text"]) > max_chars:
+            part = {**part, "text": f"{part['text'][:max_chars]}...[{len(part['text']) - max_chars} more chars]"}
+        elif "data" in part and len(json.dumps(part["data"])) > max_chars:
+            # Structured data is not cut part way; the part is dropped and counted
+            continue
+        kept.append(part)
+    truncated = {"parts": kept}
+    if len(kept) < len(parts):
+        truncated["omitted_parts"] = len(parts) - len(kept)
+    return truncated
+
+
+def _truncate_task(compact: dict, max_artifacts: int | None, max_parts: int | None, max_chars: int) -> dict:
+    """A copy of a compacted task with fewer artifacts, parts and characters, counting what was dropped."""
+    truncated = {"state": compact["state"]}
+    if "message" in compact:
+        truncated["message"] = _truncate_parts(compact["message"]["parts"], max_parts, max_chars)
+    artifacts = compact["artifacts"]
+    truncated["artifacts"] = [
+        {"name": artifact["name"], **_truncate_parts(artifact["parts"], max_parts, max_chars)}
+        for artifact in artifacts[:max_artifacts]
+    ]
+    if len(truncated["artifacts"]) < len(artifacts):
+        truncated["omitted_artifacts"] = len(artifacts) - len(truncated["artifacts"])
+    return truncated
+
 
 class RemoteAgentConnections:
     """A class to hold the connections to the remote agents."""
@@ -45,6 +82,11 @@ class RemoteAgentConnections:
 
 class RoutingAgent:
 
+    # Remote agent calls from one run step that may be in flight at once
+    MAX_CONCURRENT_TOOL_CALLS = int(os.getenv("MAX_CONCURRENT_TOOL_CALLS", "4"))
+    # Tokens allowed per submitted tool output, estimated at four bytes a token (0 for no limit)
+    TOOL_OUTPUT_TOKEN_BUDGET = int(os.getenv("TOOL_OUTPUT_TOKEN_BUDGET", "2000"))
+
     def __init__(self,task_callback: TaskUpdateCallback | None = None):
 
         self.task_callback = task_callback
@@ -55,15 +97,15 @@ class RoutingAgent:
         # Initialize Azure AI Agents client
         self.agents_client = AgentsClient(
             endpoint=os.environ["PROJECT_ENDPOINT"],
-            credential=DefaultAzureCredential(
-                exclude_environment_credential=True,
-                exclude_managed_identity_credential=True
-            )
+            credential=shared_credential()
         )
 
         self.azure_agent = None
         self.current_thread = None
 
+        # Bytes and estimated tokens of tool outputs, before and after compaction
+        self.tool_output_stats = {"bytes_in": 0, "bytes_out": 0, "tokens_in": 0, "tokens_out": 0}
+
 
     @classmethod
     async def create(cls, remote_agent_addresses: list[str], task_callback: TaskUpdateCallback | None = None) -> 'RoutingAgent':
@@ -170,6 +212,81 @@ class RoutingAgent:
             print(f"Error creating Azure AI agent: {e}")
             raise
 
+    async def _run_tool_call(self, tool_call) -> dict:
+        # Run one tool call from the agent; failures become an error output for that call only
+        function_name = tool_call.function.name
+
+        if function_name == "send_message":
+            try:
+                function_args = json.loads(tool_call.function.arguments)
+                result = await self.send_message(agent_name=function_args["agent_name"], task=function_args["task"])
+                output = self._compact_tool_output(result)
+
+            except Exception as e:
+                output = json.dumps({"error": str(e)})
+        else:
+            output = json.dumps({"error": f"Unknown function: {function_name}"})
+
+        return {"tool_call_id": tool_call.id,  "output": output}
+
+    def _compact_tool_output(self, result) -> str:
+        # A whole A2A Task repeats the request in its history and carries ids and metadata;
+        # the model only needs the task state, the status message (where agents such as the
+        # outline agent put their reply) and the artifacts' content. Outputs stay in the
+        # thread and are re-read on every later step, so they are also kept within a budget.
+        if not hasattr(result, 'model_dump'):
+            return json.dumps(str(result))
+
+        task = result.model_dump(mode="json", exclude_none=True)
+        full = json.dumps(task)
+        status = task.get("status") or {}
+        compact = {"state": status.get("state")}
+        if status.get("message"):
+            compact["message"] = {
+                "parts": [
+                    {k: v for k, v in part.items() if k in ("text", "data")}
+                    for part in status["message"].get("parts") or []
+                ],
+            }
+        compact.update({
+            "artifacts": [
+                {
+                    "name": artifact.get("name"),
+                    "parts": [
+                        {k: v for k, v in part.items() if k in ("text", "data")}
+                        for part in artifact.get("parts") or []
+                    ],
+                }
+                for artifact in task.get("artifacts") or []
+            ],
+        })
+        output = json.dumps(compact, separators=(",", ":"))
+
+        # Over budget, drop artifacts, parts and text step by step, so the output stays valid JSON
+        max_bytes = self.TOOL_OUTPUT_TOKEN_BUDGET * 4
+        for level in TOOL_OUTPUT_LEVELS:
+            if not max_bytes or len(output.encode("utf-8")) <= max_bytes:
+                break
+            output = json.dumps(_truncate_task(compact, *level), separators=(",", ":"))
+
+        stats = self.tool_output_stats
+        stats["bytes_in"] += len(full.encode("utf-8"))
+        stats["bytes_out"] += len(output.encode("utf-8"))
+        stats["tokens_in"] = stats["bytes_in"] // 4
+        stats["tokens_out"] = stats["bytes_out"] // 4
+        return output
+
+    async def _dispatch_tool_calls(self, tool_calls) -> list[dict]:
+        # Run a step's tool calls concurrently, at most MAX_CONCURRENT_TOOL_CALLS at once,
+        # keeping the outputs in the order of the calls
+        limit = asyncio.Semaphore(self.MAX_CONCURRENT_TOOL_CALLS)
+
+        async def run_one(tool_call) -> dict:
+            async with limit:
+                return await self._run_tool_call(tool_call)
+
+        return list(await asyncio.gather(*(run_one(tool_call) for tool_call in tool_calls)))
+
     async def process_user_message(self, user_message: str) -> str:
 
         if not hasattr(self, 'azure_agent') or not self.azure_agent:
@@ -192,6 +309,8 @@ class RoutingAgent:
                 agent_id=self.azure_agent.id
             )
             
+            tokens_before = (self.tool_output_stats["tokens_in"], self.tool_output_stats["tokens_out"])
+
             # Need to await send_message function
             while run.status in ["queued", "in_progress", "requires_action"]:
                 time.sleep(1)
@@ -199,36 +318,29 @@ class RoutingAgent:
 
                 if run.status == "requires_action":
                     tool_calls = run.required_action.submit_tool_outputs.tool_calls
-                    tool_outputs = []
-                    
-                    for tool_call in tool_calls:
-                        function_name = tool_call.function.name
-                        function_args = json.loads(tool_call.function.arguments)
-                        
-                        if function_name == "send_message":
-                            try:
-                                result = await self.send_message(agent_name=function_args["agent_name"], task=function_args["task"])
-                                output = json.dumps(result.model_dump() if hasattr(result, 'model_dump') else str(result))
-
-                            except Exception as e:
-                                output = json.dumps({"error": str(e)})
-                        else:
-                            output = json.dumps({"error": f"Unknown function: {function_name}"})
-                        
-                        tool_outputs.append({"tool_call_id": tool_call.id,  "output": output})
+                    # Delegations to different remote agents are independent, so send them at once
+                    tool_outputs = await self._dispatch_tool_calls(tool_calls)
                 
                     # Submit the tool outputs
                     self.agents_client.runs.submit_tool_outputs(
                         thread_id=self.current_thread.id, run_id=run.id, tool_outputs=tool_outputs
                     )
 
+            tokens_in = self.tool_output_stats["tokens_in"] - tokens_before[0]
+            tokens_out = self.tool_output_stats["tokens_out"] - tokens_before[1]
+            if tokens_in:
+                print(f"Tool outputs this run compacted from about {tokens_in} to {tokens_out} tokens; "
+                      f"{self.tool_output_stats['tokens_in'] - self.tool_output_stats['tokens_out']} tokens saved so far")
+
             if run.status == "failed":
                 error_info = f"Run error: {run.last_error}"
                 print(error_info)
                 return f"Error processing request: {error_info}"
 
-            # Return the response
-            messages = self.agents_client.messages.list(thread_id=self.current_thread.id, order=ListSortOrder.DESCENDING)
+            # Return the response, asking only for the newest message of this run
+            messages = self.agents_client.messages.list(
+                thread_id=self.current_thread.id, run_id=run.id, order=ListSortOrder.DESCENDING, limit=1
+            )
             for msg in messages:
                 if msg.role == MessageRole.AGENT and msg.text_messages:
                     last_text = msg.text_messages[-1]
@@ -41,6 +41,11 @@ async def handle_message(request: Request):
     
     return {"response": response}
 
+@app.get("/tool-output/stats")
+async def tool_output_stats():
+    # Bytes and estimated tokens of remote agent results, before and after compaction
+    return routing_agent.tool_output_stats if routing_agent else {}
+
 @app.get("/health")
 async def health_check():
     return {"status": "Routing agent is running!"}
@@ -7,11 +7,19 @@ import time
 import signal
 import httpx
 import os
+import shutil
+import tempfile
 import threading
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Servers share Azure tokens through a file only this user can read, removed on exit
+token_cache_dir = None
+if os.getenv("SHARE_TOKEN_CACHE", "true").lower() == "true" and not os.getenv("AZURE_TOKEN_CACHE_PATH"):
+    token_cache_dir = tempfile.mkdtemp(prefix="a2a-tokens-")
+    os.environ["AZURE_TOKEN_CACHE_PATH"] = os.path.join(token_cache_dir, "tokens.json")
+
 server_url = os.environ["SERVER_URL"]
 servers = [
     {
@@ -115,6 +123,8 @@ async def main():
                     process.wait(timeout=5)
                 except subprocess.TimeoutExpired:
                     process.kill()
+        if token_cache_dir:
+            shutil.rmtree(token_cache_dir, ignore_errors=True)
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -2,7 +2,7 @@
 
 import os
 from azure.ai.agents import AgentsClient
-from azure.identity import DefaultAzureCredential
+from credentials import shared_credential
 from azure.ai.agents.models import Agent, ListSortOrder, MessageRole
 
 class TitleAgent:
@@ -43,7 +43,7 @@ class TitleAgent:
             return [f'Error: {run.last_error}']
 
         # Get response messages
-        messages = self.client.messages.list(thread_id=thread.id, order=ListSortOrder.DESCENDING)
+        messages = self.client.messages.list(thread_id=thread.id, run_id=run.id, order=ListSortOrder.DESCENDING, limit=1)
         responses = []
         for msg in messages:
             # Only get the latest assistant response
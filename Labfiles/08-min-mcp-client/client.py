@@ -1,22 +1,34 @@
 from contextlib import AsyncExitStack
 import asyncio
+import importlib.util
 import sys
 from mcp.client.streamable_http import streamablehttp_client
+from mcp.shared.memory import create_connected_server_and_client_session
 from mcp import ClientSession
 
 # 🚀 Minimal MCP Client Class
 # Handles connecting to an MCP server, managing session,
 # and exposing simple methods for tools, prompts, and resources.
 class MCPClient:
-    def __init__(self, url: str):
+    def __init__(self, url: str = None, server=None):
         # The MCP server URL (example: "http://127.0.0.1:8000/mcp/")
         self.url = url
+        # Or a FastMCP server object to run in-process, over memory streams instead of HTTP
+        self.server = server
         # AsyncExitStack allows us to manage multiple async context managers cleanly
         self.stack = AsyncExitStack()
         # Will hold our active MCP session
         self._session = None
 
     async def __aenter__(self):
+        if self.server is not None:
+            # Same MCP session (handshake included), with the server in this process
+            low_level = getattr(self.server, "_mcp_server", self.server)
+            self._session = await self.stack.enter_async_context(
+                create_connected_server_and_client_session(low_level)
+            )
+            return self
+
         # Open a connection to the MCP server (read + write streams)
         read, write, _ = await self.stack.enter_async_context(
             streamablehttp_client(self.url)
@@ -52,15 +64,29 @@ class MCPClient:
         return await self._session.read_resource(uri)
 
 
+# 📦 Load a FastMCP server object from a server.py file (without running it)
+def load_server(path: str):
+    spec = importlib.util.spec_from_file_location("mcp_server", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.mcp
+
+
 # ✅ Example usage of the MCP client
 async def main():
     if len(sys.argv) < 2:
-        print("Usage: python mcp_client.py <MCP_SERVER_URL>")
+        print("Usage: python mcp_client.py <MCP_SERVER_URL | path/to/server.py>")
         sys.exit(1)
 
-    mcp_server_url = sys.argv[1]
+    target = sys.argv[1]
+
+    # A .py path runs that server in-process; anything else is a server URL
+    if target.endswith(".py"):
+        client = MCPClient(server=load_server(target))
+    else:
+        client = MCPClient(target)
 
-    async with MCPClient(mcp_server_url) as client:
+    async with client:
         tools = await client.tool_list()
         print(f"{len(tools)} tools are available!\n")
         for tool in tools:
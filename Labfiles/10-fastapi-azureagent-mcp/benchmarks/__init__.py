@@ -0,0 +1,26 @@
+"""
+Benchmarks for the Task Manager app. Run each module from the project root:
+    python -m benchmarks.<module> --help
+
+Importing src.app builds the app, which opens tasks.db in the working
+directory, so scripts call enter_work_dir() first in main() and import
+src.app after it; their scratch files go in that directory too.
+"""
+
+import os
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+# Where the benchmark was launched from, for resolving relative output paths
+LAUNCH_DIR = os.getcwd()
+
+
+def enter_work_dir() -> str:
+    """Make a fresh scratch directory the working directory and return it."""
+    path = tempfile.mkdtemp(prefix="task-bench-")
+    os.chdir(path)
+    return path
@@ -0,0 +1,180 @@
+"""
+Chat latency under overload without and with admission control.
+
+The LangGraph agent is replaced by CapacityLimitedAgent, which models a
+model deployment with a fixed number of concurrent runs: each reply holds
+one of --capacity slots for --service-ms, further calls queue upstream, and
+past --upstream-queue waiting calls the upstream fails them, as a rate
+limited deployment would.
+
+Requests arrive open-loop, as a Poisson process at --load times the
+upstream's capacity, for --duration seconds. --heavy-share of them come
+from one busy session, the rest from many light sessions. Modes:
+- off  : CHAT_MAX_CONCURRENT=0, every request goes straight to the agent
+- fifo : admission control in arrival order
+- fair : admission control with queued sessions taking turns
+
+Per mode the report has the requests answered 200, 429 and 5xx, latency of
+the admitted (200) requests overall and for the light sessions, and the
+queue wait the app reports at /api/chat/admission.
+
+Run from the project root:
+    python -m benchmarks.bench_admission --capacity 8 --service-ms 200 --load 1.5 --duration 10
+"""
+
+import os
+import time
+import random
+import asyncio
+import argparse
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from benchmarks import enter_work_dir
+from benchmarks.load_test import ServerThread, free_port
+from benchmarks.stats import summarize
+from benchmarks.stubs import StubFoundryAgent
+from src.models import ChatMessage, ChatStreamEvent, ChatStreamEventType, Role
+from src.services import TaskService
+
+
+class UpstreamOverloaded(Exception):
+    pass
+
+
+class CapacityLimitedAgent:
+    """An agent whose upstream runs capacity calls at once and fails calls past max_pending waiting."""
+
+    def __init__(self, capacity: int, service_time: float, max_pending: int):
+        self.slots = asyncio.Semaphore(capacity)
+        self.service_time = service_time
+        self.max_pending = max_pending
+        self.pending = 0
+
+    async def process_message(self, message: str, session_id: Optional[str] = None) -> ChatMessage:
+        if self.pending >= self.max_pending:
+            raise UpstreamOverloaded("upstream queue is full")
+        self.pending += 1
+        waiting = True
+        try:
+            async with self.slots:
+                self.pending -= 1
+                waiting = False
+                await asyncio.sleep(self.service_time)
+        finally:
+            if waiting:
+                self.pending -= 1
+        return ChatMessage(role=Role.ASSISTANT, content=f"Reply to {message!r}.")
+
+    async def stream_message(self, message: str, session_id: Optional[str] = None) -> AsyncIterator[ChatStreamEvent]:
+        reply = await self.process_message(message, session_id)
+        yield ChatStreamEvent(type=ChatStreamEventType.TOKEN, content=reply.content)
+
+    async def aclose(self):
+        pass
+
+
+async def drive(base_url: str, args) -> Dict[str, object]:
+    rng = random.Random(0)
+    rate = args.load * args.capacity / (args.service_ms / 1000)
+    statuses: Dict[int, int] = {}
+    admitted: List[float] = []
+    light: List[float] = []
+
+    async def send(client: httpx.AsyncClient, session_id: str):
+        start = time.perf_counter()
+        try:
+            response = await client.post("/api/chat/langgraph", json={"message": "What is due?", "sessionId": session_id})
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 599
+        elapsed = (time.perf_counter() - start) * 1000
+        statuses[status] = statuses.get(status, 0) + 1
+        if status == 200:
+            admitted.append(elapsed)
+            if session_id != "heavy":
+                light.append(elapsed)
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=256)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        while (await client.get("/ready")).status_code != 200:
+            await asyncio.sleep(0.05)
+
+        requests = []
+        deadline = time.perf_counter() + args.duration
+        while time.perf_counter() < deadline:
+            session_id = "heavy" if rng.random() < args.heavy_share else f"light-{rng.randrange(1000)}"
+            requests.append(asyncio.create_task(send(client, session_id)))
+            await asyncio.sleep(rng.expovariate(rate))
+        await asyncio.gather(*requests)
+        admission = (await client.get("/api/chat/admission")).json()["langgraph"]
+
+    return {
+        "sent": len(requests),
+        "ok": statuses.get(200, 0),
+        "rejected": statuses.get(429, 0),
+        "failed": sum(count for status, count in statuses.items() if status >= 500),
+        "latency": summarize(admitted) if admitted else None,
+        "light": summarize(light) if light else None,
+        "admission": admission,
+    }
+
+
+def run_mode(mode: str, args) -> Dict[str, object]:
+    os.environ["CHAT_MAX_CONCURRENT"] = "0" if mode == "off" else str(args.capacity)
+    os.environ["CHAT_MAX_QUEUE"] = str(args.max_queue)
+    os.environ["CHAT_MAX_WAIT_SECONDS"] = str(args.max_wait)
+    os.environ["CHAT_FAIR_SESSIONS"] = "true" if mode == "fair" else "false"
+
+    from src.app import TaskManagerApp
+
+    task_service = TaskService(f"admission-{mode}.db")
+    task_manager = TaskManagerApp(
+        task_service=task_service,
+        langgraph_agent=CapacityLimitedAgent(args.capacity, args.service_ms / 1000, args.upstream_queue),
+        foundry_agent_factory=StubFoundryAgent.factory()
+    )
+    port = free_port()
+    server = ServerThread(task_manager.get_app(), port, 0.05)
+    server.start()
+    try:
+        server.wait_started()
+        return asyncio.run(drive(f"http://127.0.0.1:{port}", args))
+    finally:
+        server.server.should_exit = True
+        server.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--capacity", type=int, default=8, help="concurrent upstream runs, also CHAT_MAX_CONCURRENT")
+    parser.add_argument("--service-ms", type=float, default=200.0, help="time each upstream run takes")
+    parser.add_argument("--upstream-queue", type=int, default=200, help="calls waiting upstream before it fails them")
+    parser.add_argument("--load", type=float, default=1.5, help="arrival rate as a multiple of the upstream capacity")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of arrivals per mode")
+    parser.add_argument("--heavy-share", type=float, default=0.5, help="share of requests from the one busy session")
+    parser.add_argument("--max-queue", type=int, default=16, help="CHAT_MAX_QUEUE")
+    parser.add_argument("--max-wait", type=float, default=1.0, help="CHAT_MAX_WAIT_SECONDS")
+    parser.add_argument("--modes", nargs="+", default=["off", "fifo", "fair"], choices=["off", "fifo", "fair"])
+    args = parser.parse_args()
+    enter_work_dir()
+
+    rate = args.load * args.capacity / (args.service_ms / 1000)
+    print(f"{rate:.0f} requests/s against an upstream of {args.capacity} x {args.service_ms:.0f} ms for {args.duration:.0f}s")
+    print(f"{'mode':>5} {'sent':>6} {'200':>6} {'429':>6} {'5xx':>6} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'light p95':>10} {'wait p95':>9}")
+    for mode in args.modes:
+        result = run_mode(mode, args)
+        latency = result["latency"] or {}
+        light = result["light"] or {}
+        wait = result["admission"]["waitMs"]["p95"] if mode != "off" else None
+        print(
+            f"{mode:>5} {result['sent']:>6} {result['ok']:>6} {result['rejected']:>6} {result['failed']:>6} "
+            f"{latency.get('p50', 0):>8.0f} {latency.get('p95', 0):>8.0f} {latency.get('p99', 0):>8.0f} "
+            f"{light.get('p95', 0):>10.0f} {wait if wait is not None else '-':>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
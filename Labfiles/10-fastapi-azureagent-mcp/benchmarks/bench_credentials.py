@@ -0,0 +1,130 @@
+"""
+Cold start and first-request latency with per-agent credentials and with the
+shared, caching credential.
+
+SimulatedAzureCredential stands in for DefaultAzureCredential signed in
+through the Azure CLI: its first token waits --probe-ms while the chain is
+probed, and every token fetch waits --token-ms, the CLI subprocess.
+
+In-process, as the app starts: the Foundry agent needs a token for its
+project while it starts, and the LangGraph agent needs one for Azure OpenAI
+on the first chat request.
+- per-agent : each agent builds its own credential behind the SDK's bearer
+              token policy (the old behaviour)
+- shared    : one CachedCredential; the LangGraph token is prefetched while
+              the app starts
+
+Across processes, --processes servers start one after another, as the
+A2A lab's run_all.py starts them, and each needs a token for the same scope,
+without and with a shared token cache file.
+
+Run from the project root:
+    python -m benchmarks.bench_credentials --probe-ms 800 --token-ms 400 --processes 3
+"""
+
+import os
+import time
+import argparse
+import threading
+import multiprocessing
+from typing import Optional
+
+from azure.core.credentials import AccessToken
+from azure.identity import get_bearer_token_provider
+
+from benchmarks import enter_work_dir
+from src.agents.credentials import AI_PROJECT_SCOPE, COGNITIVE_SERVICES_SCOPE, CachedCredential
+
+
+class SimulatedAzureCredential:
+    """DefaultAzureCredential with the Azure CLI: probes once, then pays for every token."""
+
+    def __init__(self, probe_seconds: float, token_seconds: float, lifetime: float = 3600.0):
+        self.probe_seconds = probe_seconds
+        self.token_seconds = token_seconds
+        self.lifetime = lifetime
+        self.probed = False
+        self.fetches = 0
+        self._lock = threading.Lock()
+
+    def get_token(self, *scopes: str, **kwargs) -> AccessToken:
+        with self._lock:
+            if not self.probed:
+                time.sleep(self.probe_seconds)
+                self.probed = True
+        time.sleep(self.token_seconds)
+        self.fetches += 1
+        return AccessToken(f"token-{os.getpid()}-{self.fetches}", int(time.time() + self.lifetime))
+
+
+def in_process(mode: str, args) -> dict:
+    probe, token = args.probe_ms / 1000, args.token_ms / 1000
+    start = time.perf_counter()
+    if mode == "per-agent":
+        foundry_credential = SimulatedAzureCredential(probe, token)
+        langgraph_credential = SimulatedAzureCredential(probe, token)
+        langgraph_provider = get_bearer_token_provider(langgraph_credential, COGNITIVE_SERVICES_SCOPE)
+        credentials = [foundry_credential, langgraph_credential]
+    else:
+        shared = CachedCredential(SimulatedAzureCredential(probe, token))
+        shared.prefetch(COGNITIVE_SERVICES_SCOPE)
+        foundry_credential = shared
+        langgraph_provider = lambda: shared.get_token(COGNITIVE_SERVICES_SCOPE).token
+        credentials = [shared.credential]
+
+    # The Foundry agent is created while the app starts
+    foundry_credential.get_token(AI_PROJECT_SCOPE)
+    startup = time.perf_counter() - start
+
+    # The first chat request arrives shortly after
+    time.sleep(args.request_after_ms / 1000)
+    request_start = time.perf_counter()
+    langgraph_provider()
+    first_request = time.perf_counter() - request_start
+    return {"startup": startup, "first_request": first_request, "fetches": sum(c.fetches for c in credentials)}
+
+
+def sibling(cache_path: Optional[str], args, results):
+    """One agent server: builds its credential and waits for its first token."""
+    credential = CachedCredential(SimulatedAzureCredential(args.probe_ms / 1000, args.token_ms / 1000), cache_path=cache_path)
+    start = time.perf_counter()
+    credential.get_token(AI_PROJECT_SCOPE)
+    results.put((time.perf_counter() - start, credential.fetches))
+
+
+def across_processes(shared_file: bool, args) -> list:
+    cache_path = os.path.abspath("tokens.json") if shared_file else None
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    timings = []
+    for _ in range(args.processes):
+        process = context.Process(target=sibling, args=(cache_path, args, results))
+        process.start()
+        timings.append(results.get())
+        process.join()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--probe-ms", type=float, default=800.0, help="credential chain probe on first use")
+    parser.add_argument("--token-ms", type=float, default=400.0, help="cost of each token fetch")
+    parser.add_argument("--request-after-ms", type=float, default=500.0, help="time from startup to the first chat request")
+    parser.add_argument("--processes", type=int, default=3, help="sibling server processes")
+    args = parser.parse_args()
+    enter_work_dir()
+
+    print(f"{'in-process':>12} {'startup ms':>11} {'first request ms':>17} {'fetches':>8}")
+    for mode in ("per-agent", "shared"):
+        result = in_process(mode, args)
+        print(f"{mode:>12} {result['startup'] * 1000:>11.0f} {result['first_request'] * 1000:>17.1f} {result['fetches']:>8}")
+
+    print(f"\n{'processes':>12} " + " ".join(f"{f'server {i + 1} ms':>12}" for i in range(args.processes)) + f" {'fetches':>8}")
+    for shared_file in (False, True):
+        timings = across_processes(shared_file, args)
+        label = "shared file" if shared_file else "separate"
+        print(f"{label:>12} " + " ".join(f"{seconds * 1000:>12.1f}" for seconds, _ in timings) + f" {sum(f for _, f in timings):>8}")
+
+
+if __name__ == "__main__":
+    main()
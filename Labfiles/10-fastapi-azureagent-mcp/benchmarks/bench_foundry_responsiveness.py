@@ -0,0 +1,85 @@
+"""
+Event-loop responsiveness while Foundry chats are in flight.
+
+Runs several FoundryTaskAgent.process_message calls at once against a
+simulated Agents service whose SDK calls block like real HTTP round trips,
+and meanwhile keeps reading tasks on the same event loop. If the run loop
+blocked the event loop, the reads would stall for whole SDK calls and the
+chats would finish one after another instead of together.
+
+Run from the project root:
+    python -m benchmarks.bench_foundry_responsiveness --chats 8 --run-seconds 2
+"""
+
+import time
+import asyncio
+import argparse
+from types import SimpleNamespace
+
+from benchmarks import enter_work_dir
+from benchmarks.stats import summarize, probe_loop_lag
+from benchmarks.stubs import SimulatedAgentsService
+from src.agents import FoundryTaskAgent
+from src.models import TaskCreateRequest
+from src.services import TaskService
+
+
+def simulated_tools():
+    async def getInventory(**kwargs):
+        """Get the current inventory."""
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(content=[SimpleNamespace(text="12 items in stock")])
+
+    return {"getInventory": getInventory}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chats", type=int, default=8, help="concurrent Foundry chats")
+    parser.add_argument("--run-seconds", type=float, default=2.0, help="simulated run duration")
+    parser.add_argument("--api-latency-ms", type=float, default=50.0, help="simulated SDK round trip")
+    parser.add_argument("--probe-interval", type=float, default=5.0, help="lag probe interval in ms")
+    args = parser.parse_args()
+    enter_work_dir()
+
+    service = SimulatedAgentsService(args.api_latency_ms / 1000, args.run_seconds, tool_name="getInventory")
+    agent = FoundryTaskAgent(simulated_tools(), project_client=service)
+    tasks = TaskService("responsiveness.db")
+    await tasks.add_tasks([TaskCreateRequest(title=f"Task {i}") for i in range(200)])
+
+    stop = asyncio.Event()
+    lag_samples: list = []
+    read_latencies: list = []
+
+    async def reader():
+        while not stop.is_set():
+            start = time.perf_counter()
+            await tasks.get_tasks_page(limit=50)
+            read_latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.01)
+
+    async def chat(i: int) -> float:
+        start = time.perf_counter()
+        await agent.process_message(f"Message {i}")
+        return time.perf_counter() - start
+
+    probe = asyncio.create_task(probe_loop_lag(stop, args.probe_interval / 1000, lag_samples))
+    background = asyncio.create_task(reader())
+    start = time.perf_counter()
+    chat_seconds = await asyncio.gather(*(chat(i) for i in range(args.chats)))
+    wall = time.perf_counter() - start
+    stop.set()
+    await asyncio.gather(probe, background)
+    await tasks.close()
+
+    lag = summarize([s * 1000 for s in lag_samples])
+    reads = summarize([s * 1000 for s in read_latencies])
+    chats = summarize(chat_seconds)
+    print(f"{args.chats} chats of ~{args.run_seconds:.1f}s each finished in {wall:.2f}s ({service.calls} SDK calls)")
+    print(f"chat latency s   : p50 {chats['p50']:.2f}  max {chats['max']:.2f}")
+    print(f"loop lag ms      : p50 {lag['p50']:.2f}  p99 {lag['p99']:.2f}  max {lag['max']:.2f}")
+    print(f"task read ms     : p50 {reads['p50']:.2f}  p99 {reads['p99']:.2f}  max {reads['max']:.2f}  ({len(read_latencies)} reads)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,234 @@
+"""
+Where the time goes in a LangGraphTaskAgent turn, with no network.
+
+Runs --sessions concurrent chat sessions of --turns turns each through a
+real LangGraphTaskAgent and TaskService, with ScriptedChatModel in place of
+Azure OpenAI. Sessions cycle through adding, searching and listing tasks,
+and the script answers each with one tool call and a reply. Reported per
+turn:
+- model      : time in the model, i.e. the script plus --model-latency
+- tools      : time in the task tools, including the TaskService
+- checkpoint : time reading and writing conversation state
+- overhead   : the rest of the turn, spent in the graph itself
+and the traced memory held per session, measured in a second pass.
+
+--script replays a script instead, e.g. one saved with --record, which runs
+the sessions one at a time against Azure OpenAI (AZURE_OPENAI_ENDPOINT and
+AZURE_OPENAI_DEPLOYMENT_NAME) and saves what the model did.
+
+Run from the project root:
+    python -m benchmarks.bench_langgraph_agent --sessions 200 --turns 6 --concurrency 32
+"""
+
+import os
+import time
+import sqlite3
+import asyncio
+import argparse
+import tracemalloc
+from typing import Any, Dict, List
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler
+
+from benchmarks import LAUNCH_DIR, enter_work_dir
+from benchmarks.stats import summarize
+from benchmarks.stubs import ScriptedChatModel, ScriptRecorder
+from src.agents import LangGraphTaskAgent
+from src.agents.langgraph_task_agent import azure_chat_model
+from src.services import TaskService
+
+DEFAULT_SCRIPT = [
+    {
+        "match": r"^Add a task to (?P<title>.+)$",
+        "steps": [
+            {"tool_calls": [{"name": "createTask", "args": {"title": "{title}"}}]},
+            {"content": "I added \"{title}\" to your tasks."},
+        ],
+    },
+    {
+        "match": r"^Find tasks about (?P<query>\w+)",
+        "steps": [
+            {"tool_calls": [{"name": "searchTasks", "args": {"query": "{query}"}}]},
+            {"content": "Those are the tasks about {query}."},
+        ],
+    },
+    {
+        "match": r"^List my open tasks",
+        "steps": [
+            {"tool_calls": [{"name": "getTasks", "args": {"isComplete": False, "limit": 20}}]},
+            {"content": "Those are your open tasks."},
+        ],
+    },
+]
+
+SUBJECTS = ["groceries", "invoices", "garden", "report", "travel", "dentist", "taxes", "car"]
+
+
+def session_messages(session: int, turns: int) -> List[str]:
+    messages = []
+    for turn in range(turns):
+        subject = SUBJECTS[(session + turn) % len(SUBJECTS)]
+        messages.append([
+            f"Add a task to sort out the {subject} (session {session}, turn {turn})",
+            f"Find tasks about {subject}",
+            "List my open tasks",
+        ][turn % 3])
+    return messages
+
+
+class Timings(AsyncCallbackHandler):
+    """Collects how long each model and tool call of the graph takes."""
+
+    def __init__(self):
+        self.started: Dict[UUID, float] = {}
+        self.model: List[float] = []
+        self.tools: List[float] = []
+
+    def _end(self, run_id: UUID, samples: List[float]):
+        start = self.started.pop(run_id, None)
+        if start is not None:
+            samples.append(time.perf_counter() - start)
+
+    async def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID, **kwargs: Any):
+        self.started[run_id] = time.perf_counter()
+
+    async def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id, self.model)
+
+    async def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any):
+        self.started[run_id] = time.perf_counter()
+
+    async def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id, self.tools)
+
+    async def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id, self.tools)
+
+
+def time_checkpointer(saver, samples: List[float]):
+    """Time the checkpointer's state reads and writes, as the graph calls them."""
+    for name in ("aget_tuple", "aput", "aput_writes"):
+        async def timed(*args, _method=getattr(saver, name), **kwargs):
+            start = time.perf_counter()
+            try:
+                return await _method(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - start)
+        setattr(saver, name, timed)
+
+
+def build_agent(args, run: str):
+    os.environ["LANGGRAPH_CHECKPOINTER"] = args.checkpointer
+    os.environ["LANGGRAPH_MAX_SESSIONS"] = str(args.sessions + 1)
+    os.environ["LANGGRAPH_COMPACTION_INTERVAL_SECONDS"] = "0"
+    run_dir = os.path.abspath(run)
+    os.makedirs(run_dir, exist_ok=True)
+    task_service = TaskService(os.path.join(run_dir, "tasks.db"), backend=args.backend)
+
+    if args.record:
+        llm = ScriptRecorder(model=azure_chat_model())
+    elif args.script:
+        llm = ScriptedChatModel.from_file(os.path.join(LAUNCH_DIR, args.script), latency=args.model_latency / 1000)
+    else:
+        llm = ScriptedChatModel(script=DEFAULT_SCRIPT, latency=args.model_latency / 1000)
+    return LangGraphTaskAgent(task_service, llm=llm), task_service, run_dir
+
+
+async def run_sessions(agent: LangGraphTaskAgent, args, durations: List[float]):
+    limit = asyncio.Semaphore(1 if args.record else args.concurrency)
+
+    async def session(i: int):
+        async with limit:
+            for message in session_messages(i, args.turns):
+                start = time.perf_counter()
+                await agent.process_message(message, session_id=f"session-{i}")
+                durations.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(session(i) for i in range(args.sessions)))
+
+
+async def measure_time(args):
+    agent, task_service, run_dir = build_agent(args, "timing")
+    timings = Timings()
+    agent.agent = agent.agent.with_config(callbacks=[timings])
+    checkpoints: List[float] = []
+    time_checkpointer(agent.memory, checkpoints)
+
+    durations: List[float] = []
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    await run_sessions(agent, args, durations)
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+
+    turns = len(durations)
+    total = sum(durations)
+    parts = {"model": sum(timings.model), "tools": sum(timings.tools), "checkpoint": sum(checkpoints)}
+    latency = summarize(durations)
+    print(
+        f"{turns} turns in {elapsed:.2f}s ({turns / elapsed:.0f} turns/s),"
+        f" latency p50 {latency['p50'] * 1000:.1f} ms, p95 {latency['p95'] * 1000:.1f} ms"
+    )
+    print(f"\nper turn            ms   calls")
+    print(f"  {'turn':<14} {total / turns * 1000:>7.2f}")
+    print(f"  {'model':<14} {parts['model'] / turns * 1000:>7.2f} {len(timings.model) / turns:>7.1f}")
+    print(f"  {'tools':<14} {parts['tools'] / turns * 1000:>7.2f} {len(timings.tools) / turns:>7.1f}")
+    print(f"  {'checkpoint':<14} {parts['checkpoint'] / turns * 1000:>7.2f} {len(checkpoints) / turns:>7.1f}")
+    print(f"  {'overhead':<14} {(total - sum(parts.values())) / turns * 1000:>7.2f}")
+    print(f"  {'cpu':<14} {cpu / turns * 1000:>7.2f}")
+    if args.concurrency > 1 and not args.record:
+        print("  (with concurrent sessions, times include waiting for the event loop)")
+
+    if args.record:
+        agent.llm.save(os.path.join(LAUNCH_DIR, args.record))
+        print(f"\nRecorded {len(agent.llm.turns)} turns to {args.record}")
+    await agent.aclose()
+    await task_service.close()
+
+
+async def measure_memory(args):
+    tracemalloc.start()
+    agent, task_service, run_dir = build_agent(args, "memory")
+    before = tracemalloc.get_traced_memory()[0]
+    await run_sessions(agent, args, [])
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    print(f"\nmemory per session: {held / args.sessions / 1000:.1f} KB traced")
+    if args.checkpointer == "sqlite":
+        await agent.memory.compact()
+        # Pages in use: compaction frees pages for reuse but does not shrink the file
+        conn = sqlite3.connect(os.path.join(run_dir, "checkpoints.db"))
+        pages = conn.execute("PRAGMA page_count").fetchone()[0] - conn.execute("PRAGMA freelist_count").fetchone()[0]
+        size = pages * conn.execute("PRAGMA page_size").fetchone()[0]
+        conn.close()
+        print(f"checkpoints.db per session: {size / args.sessions / 1000:.1f} KB in use")
+    await agent.aclose()
+    await task_service.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=200, help="chat sessions")
+    parser.add_argument("--turns", type=int, default=6, help="turns per session")
+    parser.add_argument("--concurrency", type=int, default=32, help="sessions in flight at once")
+    parser.add_argument("--checkpointer", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--backend", default="sqlite", help="TaskService storage backend")
+    parser.add_argument("--model-latency", type=float, default=0.0, help="simulated ms per model call")
+    parser.add_argument("--script", help="replay this script file instead of the built-in one")
+    parser.add_argument("--record", help="run against Azure OpenAI and save the script to this file")
+    parser.add_argument("--no-memory", action="store_true", help="skip the memory pass")
+    args = parser.parse_args()
+    enter_work_dir()
+
+    if args.record and azure_chat_model() is None:
+        parser.error("--record needs AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_DEPLOYMENT_NAME")
+
+    await measure_time(args)
+    if not args.no_memory and not args.record:
+        await measure_memory(args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+"""
+Prompt tokens per turn in one long LangGraph conversation, with and without
+the conversation window.
+
+Runs --turns turns in a single session through a real LangGraphTaskAgent.
+The model stand-in lists a page of tasks with getTasks every --tool-every
+turns and answers with a reply of --reply-words words; it records the
+estimated tokens of every prompt it is sent:
+- full   : LANGGRAPH_HISTORY_MAX_TOKENS=0, the whole thread on every call
+- window : the newest turns within --max-tokens, older ones summarized
+
+Run from the project root:
+    python -m benchmarks.bench_langgraph_history --turns 200 --max-tokens 4000
+"""
+
+import os
+import time
+import asyncio
+import argparse
+from typing import Any, List
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from benchmarks import enter_work_dir
+from benchmarks.stubs import ReplyChatModel
+from src.agents import LangGraphTaskAgent
+from src.agents.conversation_window import message_tokens
+from src.services import TaskService
+
+
+class RecordingChatModel(ReplyChatModel):
+    """Lists tasks on every tool_every-th turn, then replies; records prompt sizes."""
+
+    tool_every: int = 3
+    prompts: List[int] = []
+    summary_prompts: List[int] = []
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        tokens = sum(message_tokens(m) for m in messages)
+        if run_manager and "conversation_summary" in (run_manager.tags or []):
+            self.summary_prompts.append(tokens)
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=f"Summary of {len(messages[-1].content)} chars."))])
+
+        self.prompts.append(tokens)
+        turn = sum(isinstance(m, HumanMessage) for m in messages)
+        if isinstance(messages[-1], HumanMessage) and turn % self.tool_every == 0:
+            tool_call = {"name": "getTasks", "args": {"limit": 20}, "id": f"call_{len(self.prompts)}"}
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content="", tool_calls=[tool_call]))])
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+
+async def run_mode(mode: str, args) -> RecordingChatModel:
+    os.environ["LANGGRAPH_CHECKPOINTER"] = "memory"
+    os.environ["LANGGRAPH_HISTORY_MAX_TOKENS"] = "0" if mode == "full" else str(args.max_tokens)
+    task_service = TaskService(f"{mode}-tasks.db", backend="memory")
+    for i in range(40):
+        await task_service.add_task(f"Task {i} with a reasonably descriptive title", i % 2 == 0)
+
+    llm = RecordingChatModel(reply=" ".join(["word"] * args.reply_words), tool_every=args.tool_every, prompts=[], summary_prompts=[])
+    agent = LangGraphTaskAgent(task_service, llm=llm)
+    start = time.perf_counter()
+    for i in range(args.turns):
+        await agent.process_message(f"Message {i}: please keep track of item {i} for me.", session_id="long-session")
+    elapsed = time.perf_counter() - start
+
+    summaries = agent.window.summaries if agent.window else 0
+    print(
+        f"{mode}: {args.turns} turns in {elapsed:.1f}s, {len(llm.prompts)} model calls,"
+        f" {summaries} summaries ({sum(llm.summary_prompts)} summary prompt tokens)"
+    )
+    await agent.aclose()
+    return llm
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=200, help="turns in the conversation")
+    parser.add_argument("--max-tokens", type=int, default=4000, help="history budget for the window mode")
+    parser.add_argument("--tool-every", type=int, default=3, help="list tasks every n turns")
+    parser.add_argument("--reply-words", type=int, default=60, help="words per assistant reply")
+    args = parser.parse_args()
+    enter_work_dir()
+
+    results = {mode: await run_mode(mode, args) for mode in ("full", "window")}
+
+    print(f"\nprompt tokens per model call")
+    print(f"{'call':>6} " + " ".join(f"{mode:>8}" for mode in results))
+    calls = min(len(llm.prompts) for llm in results.values())
+    for i in sorted({0, calls // 4, calls // 2, 3 * calls // 4, calls - 1}):
+        print(f"{i + 1:>6} " + " ".join(f"{llm.prompts[i]:>8}" for llm in results.values()))
+    print(f"{'max':>6} " + " ".join(f"{max(llm.prompts):>8}" for llm in results.values()))
+    print(f"{'total':>6} " + " ".join(f"{sum(llm.prompts) + sum(llm.summary_prompts):>8}" for llm in results.values()))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+"""
+Memory held by LangGraph conversation state as the number of chat sessions grows.
+
+Runs one turn in each of --sessions distinct sessions through a real
+LangGraphTaskAgent, with ReplyChatModel in place of Azure OpenAI, and samples
+traced Python memory as it goes:
+- unbounded : in-memory checkpointer that never forgets a session (the old behaviour)
+- memory    : in-memory checkpointer, idle sessions evicted beyond --max-sessions
+- sqlite    : SQLiteCheckpointer, state on disk and pruned by compaction
+
+With sqlite, a second agent on the same database (another worker) then
+continues one of the sessions.
+
+Run from the project root:
+    python -m benchmarks.bench_langgraph_sessions --sessions 10000 --max-sessions 1000
+"""
+
+import os
+import time
+import asyncio
+import argparse
+import tracemalloc
+
+from benchmarks import enter_work_dir
+from benchmarks.stubs import ReplyChatModel
+from src.agents import LangGraphTaskAgent
+from src.services import TaskService
+
+
+def build_agent(mode: str, db_path: str, max_sessions: int, sessions: int) -> LangGraphTaskAgent:
+    os.environ["LANGGRAPH_CHECKPOINTER"] = "sqlite" if mode == "sqlite" else "memory"
+    os.environ["LANGGRAPH_MAX_SESSIONS"] = str(sessions + 1 if mode == "unbounded" else max_sessions)
+    # Compaction is driven by the benchmark, between samples
+    os.environ["LANGGRAPH_COMPACTION_INTERVAL_SECONDS"] = "0"
+    return LangGraphTaskAgent(TaskService(db_path, backend="memory"), llm=ReplyChatModel())
+
+
+async def run_mode(mode: str, args) -> list:
+    db_path = f"{mode}-tasks.db"
+    agent = build_agent(mode, db_path, args.max_sessions, args.sessions)
+    limit = asyncio.Semaphore(args.concurrency)
+
+    async def turn(i: int):
+        async with limit:
+            await agent.process_message(f"Remember the number {i}", session_id=f"session-{i}")
+
+    samples = []
+    step = max(1, args.sessions // 10)
+    tracemalloc.start()
+    start = time.perf_counter()
+    for done in range(0, args.sessions, step):
+        await asyncio.gather(*(turn(i) for i in range(done, min(done + step, args.sessions))))
+        if mode == "sqlite":
+            await agent.memory.compact()
+        samples.append((min(done + step, args.sessions), tracemalloc.get_traced_memory()[0]))
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+
+    print(f"{mode}: {args.sessions} sessions in {elapsed:.1f}s, {len(agent.sessions)} sessions tracked in memory")
+    if mode == "sqlite":
+        print(f"  {await agent.memory.stats()}")
+        print(f"  checkpoints.db {os.path.getsize('checkpoints.db') / 1e6:.1f} MB")
+
+        # Another worker on the same database picks up the most recent session
+        other = build_agent(mode, db_path, args.max_sessions, args.sessions)
+        last = f"session-{args.sessions - 1}"
+        await other.process_message("What was the number?", session_id=last)
+        thread_id = await other.memory.thread_for_session(last)
+        state = await other.agent.aget_state({"configurable": {"thread_id": thread_id}})
+        print(f"  second worker continued {last}: {len(state.values['messages'])} messages in its thread")
+        await other.aclose()
+    await agent.aclose()
+    return samples
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10000, help="distinct chat sessions, one turn each")
+    parser.add_argument("--max-sessions", type=int, default=1000, help="session limit for the bounded modes")
+    parser.add_argument("--concurrency", type=int, default=16, help="turns in flight at once")
+    parser.add_argument("--modes", nargs="+", default=["unbounded", "memory", "sqlite"], help="checkpointers to compare")
+    args = parser.parse_args()
+    enter_work_dir()
+
+    results = {mode: await run_mode(mode, args) for mode in args.modes}
+
+    print(f"\ntraced memory MB after n sessions")
+    print(f"{'sessions':>9} " + " ".join(f"{mode:>10}" for mode in results))
+    for row in zip(*results.values()):
+        print(f"{row[0][0]:>9} " + " ".join(f"{mem / 1e6:>10.1f}" for _, mem in row))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
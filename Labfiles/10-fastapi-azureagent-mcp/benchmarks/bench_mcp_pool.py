@@ -0,0 +1,94 @@
+"""
+Tool call throughput of the MCP session pool as it grows.
+
+Sends concurrent calls to a blocking tool on benchmarks/mcp_bench_server.py
+through MCPSessionPool. A pool of one is the old single-session setup, where
+calls queue behind each other; throughput should scale with the pool size
+up to the concurrency.
+
+Then crashes one server and checks the pool respawns it and keeps serving.
+
+Run from the project root:
+    python -m benchmarks.bench_mcp_pool --sizes 1 2 4 --concurrency 8
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+from mcp import StdioServerParameters
+
+from benchmarks import PROJECT_ROOT
+from src.agents.mcp_pool import MCPSessionPool
+
+SERVER_PARAMS = StdioServerParameters(
+    command=sys.executable,
+    args=[os.path.join(PROJECT_ROOT, "benchmarks", "mcp_bench_server.py")],
+)
+
+
+async def throughput(size: int, concurrency: int, calls: int, work_ms: float) -> dict:
+    pool = MCPSessionPool(SERVER_PARAMS, size=size, health_interval=0)
+    await pool.start()
+    try:
+        queue = asyncio.Queue()
+        for _ in range(calls):
+            queue.put_nowait(None)
+
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                result = await pool.call_tool("work", {"ms": work_ms})
+                assert not result.isError
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - start
+        return {"size": size, "wall": wall, "calls_per_s": calls / wall, "per_session": [s["calls"] for s in pool.stats()]}
+    finally:
+        await pool.aclose()
+
+
+async def respawn_check():
+    pool = MCPSessionPool(SERVER_PARAMS, size=2, health_interval=0)
+    await pool.start()
+    try:
+        try:
+            await pool.call_tool("crash", {})
+        except Exception:
+            pass
+        # Until the respawn finishes, calls go to the surviving session
+        for _ in range(4):
+            assert not (await pool.call_tool("work", {"ms": 1})).isError
+        await pool.check_health()
+        await asyncio.sleep(0)
+        while not all(s["healthy"] for s in pool.stats()):
+            await asyncio.sleep(0.1)
+        return pool.stats()
+    finally:
+        await pool.aclose()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 4], help="pool sizes to try")
+    parser.add_argument("--concurrency", type=int, default=8, help="calls in flight at once")
+    parser.add_argument("--calls", type=int, default=64, help="calls per pool size")
+    parser.add_argument("--work-ms", type=float, default=50.0, help="time each tool call blocks its server")
+    args = parser.parse_args()
+
+    results = [await throughput(size, args.concurrency, args.calls, args.work_ms) for size in args.sizes]
+
+    print(f"\n{args.calls} calls of {args.work_ms:.0f} ms, {args.concurrency} in flight")
+    print(f"{'size':>5} {'wall ms':>9} {'calls/s':>9}  calls per session")
+    for r in results:
+        print(f"{r['size']:>5} {r['wall'] * 1000:>9.0f} {r['calls_per_s']:>9.1f}  {r['per_session']}")
+
+    stats = await respawn_check()
+    print("\nAfter crashing a server:", stats)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+"""
+Startup time and per-call latency of a Python MCP server, over stdio and in-process.
+
+Both transports go through MCPSessionPool with one session, as
+connect_to_server uses them:
+- stdio      : spawn the server script and talk over its pipes
+- in-process : load the FastMCP module once and talk over memory streams
+
+Startup is pool start plus the first list_tools; calls are sequential, so
+the numbers are per-call overhead rather than throughput.
+
+Run from the project root:
+    python -m benchmarks.bench_mcp_transport
+    python -m benchmarks.bench_mcp_transport \\
+        --server ../03d-use-local-mcp-server-tools/Python/server.py --tool get_inventory_levels --args "{}"
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+from mcp import StdioServerParameters
+
+from benchmarks import LAUNCH_DIR, PROJECT_ROOT
+from benchmarks.stats import summarize
+from src.agents.mcp_pool import MCPSessionPool
+from src.agents.inprocess_mcp import load_fastmcp_server
+
+
+async def measure(server, starts: int, calls: int, tool: str, arguments: dict) -> dict:
+    startup = []
+    for _ in range(starts):
+        start = time.perf_counter()
+        pool = MCPSessionPool(server, size=1, health_interval=0)
+        await pool.start()
+        await pool.list_tools()
+        startup.append(time.perf_counter() - start)
+        await pool.aclose()
+
+    pool = MCPSessionPool(server, size=1, health_interval=0)
+    await pool.start()
+    try:
+        latencies = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            result = await pool.call_tool(tool, arguments)
+            latencies.append(time.perf_counter() - start)
+            assert not result.isError, result
+        return {"startup": summarize(startup), "call": summarize(latencies)}
+    finally:
+        await pool.aclose()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", default=os.path.join(PROJECT_ROOT, "benchmarks", "mcp_bench_server.py"), help="FastMCP server script")
+    parser.add_argument("--tool", default="work", help="tool to call")
+    parser.add_argument("--args", default='{"ms": 0}', help="tool arguments as JSON")
+    parser.add_argument("--starts", type=int, default=5, help="startups to time per transport")
+    parser.add_argument("--calls", type=int, default=200, help="calls to time per transport")
+    args = parser.parse_args()
+
+    path = os.path.join(LAUNCH_DIR, args.server)
+    arguments = json.loads(args.args)
+    transports = {
+        "stdio": StdioServerParameters(command=sys.executable, args=[path]),
+        "in-process": load_fastmcp_server(path),
+    }
+
+    results = {name: await measure(server, args.starts, args.calls, args.tool, arguments) for name, server in transports.items()}
+
+    print(f"\n{os.path.basename(path)} {args.tool}, {args.starts} startups, {args.calls} calls")
+    print(f"{'transport':>11} {'start p50 ms':>13} {'call p50 ms':>12} {'call p95 ms':>12} {'call p99 ms':>12}")
+    for name, r in results.items():
+        print(
+            f"{name:>11} {r['startup']['p50'] * 1000:>13.1f} {r['call']['p50'] * 1000:>12.3f}"
+            f" {r['call']['p95'] * 1000:>12.3f} {r['call']['p99'] * 1000:>12.3f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
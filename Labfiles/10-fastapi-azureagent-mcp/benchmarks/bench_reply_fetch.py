@@ -0,0 +1,85 @@
+"""
+Cost of fetching a run's reply as the conversation thread grows.
+
+Compares three ways to find the assistant's reply after a run, against a
+simulated Agents service where every page is a round trip and transfer
+time grows with the messages returned:
+- full thread   : list the whole thread oldest first and take the last reply
+- newest page   : list newest first and stop at the first assistant message
+- run filtered  : FoundryTaskAgent's lookup, only the run's newest message
+
+Run from the project root:
+    python -m benchmarks.bench_reply_fetch --lengths 10 100 1000
+"""
+
+import time
+import argparse
+import statistics
+
+from benchmarks.stubs import SimulatedAgentsService
+from src.agents import FoundryTaskAgent
+
+
+def seed_thread(service: SimulatedAgentsService, length: int):
+    """A thread of alternating user and assistant messages; returns it and the last run ID."""
+    thread_id = service._create_thread().id
+    run_id = None
+    for i in range(0, length, 2):
+        service._create_message(thread_id, "user", f"Question {i}")
+        run_id = f"run_{i}"
+        reply = service._create_message(thread_id, "assistant", f"Answer {i} " + "x" * 400)
+        reply.run_id = run_id
+    return thread_id, run_id
+
+
+def full_thread(service: SimulatedAgentsService, thread_id: str, run_id: str):
+    reply = None
+    for message in service.agents.messages.list(thread_id=thread_id, order="asc"):
+        if message.role == "assistant":
+            reply = message
+    return reply
+
+
+def newest_page(service: SimulatedAgentsService, thread_id: str, run_id: str):
+    for message in service.agents.messages.list(thread_id=thread_id):
+        if message.role == "assistant":
+            return message
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 100, 1000], help="messages in the thread")
+    parser.add_argument("--repeat", type=int, default=5, help="fetches per strategy and length")
+    parser.add_argument("--api-latency-ms", type=float, default=20.0, help="simulated round trip per page")
+    parser.add_argument("--message-cost-ms", type=float, default=0.05, help="simulated transfer time per message")
+    args = parser.parse_args()
+
+    service = SimulatedAgentsService(args.api_latency_ms / 1000, message_cost=args.message_cost_ms / 1000)
+    agent = FoundryTaskAgent({}, project_client=service)
+    strategies = {
+        "full thread": full_thread,
+        "newest page": newest_page,
+        "run filtered": lambda service, thread_id, run_id: agent._run_reply_text(thread_id, run_id),
+    }
+
+    print(f"{'messages':>9} " + " ".join(f"{name + ' ms':>16}" for name in strategies) + f" {'calls/fetch':>12}")
+    for length in args.lengths:
+        thread_id, run_id = seed_thread(service, length)
+        row, calls = [], []
+        for fetch in strategies.values():
+            timings = []
+            for _ in range(args.repeat):
+                before = service.calls
+                start = time.perf_counter()
+                reply = fetch(service, thread_id, run_id)
+                timings.append(time.perf_counter() - start)
+                calls.append(service.calls - before)
+                assert reply is not None
+            row.append(statistics.median(timings) * 1000)
+        per_strategy_calls = "/".join(str(calls[i * args.repeat]) for i in range(len(strategies)))
+        print(f"{length:>9} " + " ".join(f"{ms:>16.1f}" for ms in row) + f" {per_strategy_calls:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Event-loop latency benchmark for the TaskService storage backends.
+
+Runs a mixed read/write workload against each backend while a probe
+coroutine measures how late the event loop wakes it up. Lag on the probe is
+what every other request on the same worker would feel.
+
+Run from the project root:
+    python -m benchmarks.bench_storage_backends --callers 32 --duration 3
+"""
+
+import time
+import random
+import asyncio
+import argparse
+import statistics
+
+from benchmarks import enter_work_dir
+from benchmarks.stats import percentile, probe_loop_lag
+from src.models import TaskCreateRequest
+from src.services import TaskService
+
+BACKENDS = ["sqlite", "aiosqlite", "memory"]
+
+
+async def run_backend(backend: str, args) -> dict:
+    db_path = f"{backend}.db"
+    group_commit_window = args.group_commit_ms / 1000 if backend == "sqlite" and args.group_commit_ms else None
+    service = TaskService(db_path, backend=backend, group_commit_window=group_commit_window)
+    await service.add_tasks([TaskCreateRequest(title=f"Task {i}") for i in range(args.tasks)])
+
+    rng = random.Random(42)
+    stop = asyncio.Event()
+    lag_samples: list = []
+    op_count = 0
+
+    async def caller():
+        nonlocal op_count
+        while not stop.is_set():
+            roll = rng.random()
+            task_id = rng.randint(1, args.tasks)
+            if roll < args.write_ratio:
+                await service.update_task(task_id, is_complete=rng.random() < 0.5)
+            elif roll < 0.9:
+                await service.get_task_by_id(task_id)
+            else:
+                await service.get_tasks_page(after_id=task_id, limit=50)
+            op_count += 1
+            # The memory backend never suspends, so yield to keep the probe running
+            await asyncio.sleep(0)
+
+    probe = asyncio.create_task(probe_loop_lag(stop, args.probe_interval / 1000, lag_samples))
+    callers = [asyncio.create_task(caller()) for _ in range(args.callers)]
+    start = time.perf_counter()
+    await asyncio.sleep(args.duration)
+    stop.set()
+    await asyncio.gather(probe, *callers)
+    elapsed = time.perf_counter() - start
+    storage_stats = service.storage_stats()
+    await service.close()
+
+    lag_ms = [s * 1000 for s in lag_samples]
+    return {
+        "backend": backend,
+        "ops_per_sec": op_count / elapsed,
+        "lag_p50_ms": statistics.median(lag_ms),
+        "lag_p99_ms": percentile(lag_ms, 99),
+        "lag_max_ms": max(lag_ms),
+        "storage": storage_stats,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=BACKENDS, choices=BACKENDS)
+    parser.add_argument("--tasks", type=int, default=1000, help="rows to seed")
+    parser.add_argument("--callers", type=int, default=32, help="concurrent callers")
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per backend")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="fraction of operations that write")
+    parser.add_argument("--group-commit-ms", type=float, default=0, help="group commit window for the sqlite backend")
+    parser.add_argument("--probe-interval", type=float, default=5.0, help="lag probe interval in ms")
+    args = parser.parse_args()
+    enter_work_dir()
+
+    print(f"{'backend':>10} {'ops/s':>10} {'lag p50 ms':>11} {'lag p99 ms':>11} {'lag max ms':>11}")
+    for backend in args.backends:
+        r = await run_backend(backend, args)
+        print(
+            f"{r['backend']:>10} {r['ops_per_sec']:>10.0f} {r['lag_p50_ms']:>11.2f}"
+            f" {r['lag_p99_ms']:>11.2f} {r['lag_max_ms']:>11.2f}"
+        )
+        if r["storage"].get("groupCommit"):
+            print(f"{'':>10} group commit: {r['storage']['groupCommit']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
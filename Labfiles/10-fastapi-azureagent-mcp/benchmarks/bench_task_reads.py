@@ -0,0 +1,100 @@
+"""
+Read throughput benchmark for TaskService.
+
+Compares the pooled WAL engine against the previous connect-per-call,
+single-worker implementation at 1, 8 and 64 concurrent callers.
+
+Run from the project root:
+    python -m benchmarks.bench_task_reads --tasks 500 --duration 3
+"""
+
+import os
+import time
+import sqlite3
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import enter_work_dir
+from src.models import TaskItem
+from src.services import TaskService
+
+
+class LegacyTaskService:
+    """The previous implementation: a new connection per call on one worker thread."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    async def get_all_tasks(self):
+        def get_tasks():
+            conn = sqlite3.connect(self.db_path)
+            rows = conn.execute("SELECT * FROM tasks ORDER BY id").fetchall()
+            conn.close()
+            return [TaskItem(id=r[0], title=r[1], isComplete=bool(r[2])) for r in rows]
+
+        return await asyncio.get_running_loop().run_in_executor(self.executor, get_tasks)
+
+    async def get_task_by_id(self, task_id: int):
+        def get_task():
+            conn = sqlite3.connect(self.db_path)
+            row = conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+            conn.close()
+            return TaskItem(id=row[0], title=row[1], isComplete=bool(row[2])) if row else None
+
+        return await asyncio.get_running_loop().run_in_executor(self.executor, get_task)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+async def measure(service, concurrency: int, duration: float, task_count: int) -> float:
+    """Return completed reads per second with `concurrency` callers looping for `duration`."""
+    deadline = time.perf_counter() + duration
+    completed = 0
+
+    async def caller(worker: int):
+        nonlocal completed
+        i = worker
+        while time.perf_counter() < deadline:
+            # Mix of point lookups and full listings, like the UI plus agent tools
+            if i % 10 == 0:
+                await service.get_all_tasks()
+            else:
+                await service.get_task_by_id(i % task_count + 1)
+            completed += 1
+            i += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(caller(w) for w in range(concurrency)))
+    return completed / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=500, help="rows to seed")
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per measurement")
+    parser.add_argument("--readers", type=int, default=os.cpu_count() or 4, help="pooled reader connections")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 64])
+    args = parser.parse_args()
+    enter_work_dir()
+
+    db_path = "bench.db"
+    pooled = TaskService(db_path, readers=args.readers)
+    for i in range(args.tasks):
+        await pooled.add_task(f"Task {i}", i % 3 == 0)
+    legacy = LegacyTaskService(db_path)
+
+    print(f"{'callers':>8} {'legacy reads/s':>16} {'pooled reads/s':>16} {'speedup':>8}")
+    for concurrency in args.concurrency:
+        legacy_rate = await measure(legacy, concurrency, args.duration, args.tasks)
+        pooled_rate = await measure(pooled, concurrency, args.duration, args.tasks)
+        print(f"{concurrency:>8} {legacy_rate:>16.0f} {pooled_rate:>16.0f} {pooled_rate / legacy_rate:>7.2f}x")
+
+    legacy.close()
+    await pooled.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
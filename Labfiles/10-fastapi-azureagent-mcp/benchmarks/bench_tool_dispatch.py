@@ -0,0 +1,54 @@
+"""
+Wall time of one multi-tool run step under different concurrency limits.
+
+Dispatches a step of simulated MCP tool calls with mixed latencies through
+dispatch_tool_calls. A limit of 1 is the old one-after-another behaviour;
+with enough headroom the step should take about as long as its slowest call.
+
+Run from the project root:
+    python -m benchmarks.bench_tool_dispatch --calls 6 --limits 1 2 4 8
+"""
+
+import json
+import time
+import random
+import asyncio
+import argparse
+from types import SimpleNamespace
+
+import benchmarks  # noqa: F401  (puts the project root on sys.path)
+from src.agents.tool_dispatch import dispatch_tool_calls
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=6, help="tool calls in the step")
+    parser.add_argument("--limits", type=int, nargs="+", default=[1, 2, 4, 8], help="concurrency limits to try")
+    parser.add_argument("--min-ms", type=float, default=50.0, help="fastest simulated tool call")
+    parser.add_argument("--max-ms", type=float, default=300.0, help="slowest simulated tool call")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    latencies = [rng.uniform(args.min_ms, args.max_ms) / 1000 for _ in range(args.calls)]
+    tool_calls = [
+        SimpleNamespace(id=f"call_{i}", function=SimpleNamespace(name="get_inventory_levels", arguments=json.dumps({"i": i})))
+        for i in range(args.calls)
+    ]
+
+    async def run_tool_call(tool_call) -> dict:
+        i = json.loads(tool_call.function.arguments)["i"]
+        await asyncio.sleep(latencies[i])
+        return {"tool_call_id": tool_call.id, "output": f"result {i}"}
+
+    print(f"{args.calls} calls: sum {sum(latencies) * 1000:.0f} ms, slowest {max(latencies) * 1000:.0f} ms")
+    print(f"{'limit':>6} {'wall ms':>9}")
+    for limit in args.limits:
+        start = time.perf_counter()
+        outputs = await dispatch_tool_calls(tool_calls, run_tool_call, asyncio.Semaphore(limit))
+        wall = time.perf_counter() - start
+        assert [o["tool_call_id"] for o in outputs] == [c.id for c in tool_calls]
+        print(f"{limit:>6} {wall * 1000:>9.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
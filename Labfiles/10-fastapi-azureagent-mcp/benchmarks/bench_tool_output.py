@@ -0,0 +1,71 @@
+"""
+Size of tool outputs submitted to runs, before and after compaction.
+
+Builds tool results shaped like the MCP server's (pretty-printed JSON, as
+FastMCP returns it) and plain text, runs them through ToolOutputCompactor
+and reports bytes, estimated tokens and the time compaction takes. Every
+submitted output is re-read by the model on each later run step, so the
+savings are also shown multiplied by --later-steps.
+
+Run from the project root:
+    python -m benchmarks.bench_tool_output --budget 2000 --later-steps 5
+"""
+
+import json
+import time
+import random
+import argparse
+
+import benchmarks  # noqa: F401  (puts the project root on sys.path)
+from src.agents.tool_output import ToolOutputCompactor, estimate_tokens
+
+
+def sample_outputs(rng: random.Random) -> dict:
+    products = [f"Product {i:04d}" for i in range(2000)]
+    orders = [
+        {
+            "id": i,
+            "product": rng.choice(products),
+            "quantity": rng.randint(1, 50),
+            "status": rng.choice(["open", "shipped", "delivered"]),
+            "notes": " ".join(rng.choice(["fragile", "gift", "express", "bulk", "repeat"]) for _ in range(40)),
+            "history": [{"at": f"2025-01-{d:02d}", "event": "updated"} for d in range(1, 11)],
+        }
+        for i in range(300)
+    ]
+    return {
+        "get_inventory_levels (small)": json.dumps({p: rng.randint(0, 50) for p in products[:10]}, indent=2),
+        "get_inventory_levels (2000 products)": json.dumps({p: rng.randint(0, 50) for p in products}, indent=2),
+        "get_orders (300 records)": json.dumps({"orders": orders, "total": len(orders)}, indent=2),
+        "read_log (text)": "\n".join(f"2025-01-01T00:00:{i % 60:02d} INFO request {i} handled" for i in range(3000)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=int, default=2000, help="token budget per tool output")
+    parser.add_argument("--later-steps", type=int, default=5, help="run steps that re-read each output")
+    args = parser.parse_args()
+
+    compactor = ToolOutputCompactor(
+        default_budget=args.budget,
+        fields={"get_orders (300 records)": ["id", "product", "quantity", "status", "orders", "total"]}
+    )
+
+    print(f"{'output':>38} {'bytes in':>9} {'bytes out':>10} {'tokens in':>10} {'tokens out':>11} {'ms':>7}")
+    for name, text in sample_outputs(random.Random(7)).items():
+        start = time.perf_counter()
+        result = compactor.compact(name, text)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:>38} {len(text.encode()):>9} {len(result.encode()):>10}"
+            f" {estimate_tokens(text):>10} {estimate_tokens(result):>11} {elapsed * 1000:>7.2f}"
+        )
+
+    stats = compactor.stats()
+    print(f"\nSaved {stats['bytesSaved']} bytes, {stats['tokensSaved']} tokens per submission")
+    print(f"Over {args.later_steps} later steps: {stats['tokensSaved'] * args.later_steps} tokens not re-read")
+
+
+if __name__ == "__main__":
+    main()
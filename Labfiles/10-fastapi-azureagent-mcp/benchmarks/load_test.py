@@ -0,0 +1,242 @@
+"""
+HTTP load test for the Task Manager API with stubbed agents.
+
+Starts TaskManagerApp in-process under uvicorn, on its own thread and event
+loop, with network-free LangGraph and Foundry agents (see benchmarks.stubs).
+Each route is then driven in turn by concurrent httpx clients for a fixed
+duration, while a probe on the server loop records event-loop lag.
+
+Per route the report has request and error counts, throughput, latency
+percentiles and the server loop lag during that phase, as JSON. Streaming
+chat routes also report time to first token.
+
+Run from the project root:
+    python -m benchmarks.load_test --concurrency 16 --duration 5 --output results.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import threading
+from typing import Callable, Dict, List, Tuple
+
+import httpx
+import uvicorn
+
+from benchmarks import LAUNCH_DIR, enter_work_dir
+from benchmarks.stats import summarize
+from benchmarks.stubs import StubLangGraphAgent, StubFoundryAgent
+from src.services import TaskService
+
+SEARCH_WORDS = ["report", "review", "deploy", "invoice", "meeting", "backup"]
+
+
+def build_requests(task_count: int) -> Dict[str, Callable[[random.Random], Tuple[str, str, dict]]]:
+    """Route name -> function returning (method, path, request kwargs) for one request."""
+    return {
+        "GET /tasks": lambda rng: ("GET", "/api/tasks", {"params": {"afterId": rng.randint(0, task_count), "limit": 50}}),
+        "GET /tasks/{id}": lambda rng: ("GET", f"/api/tasks/{rng.randint(1, task_count)}", {}),
+        "GET /tasks/search": lambda rng: ("GET", "/api/tasks/search", {"params": {"q": rng.choice(SEARCH_WORDS)}}),
+        "PATCH /tasks/{id}": lambda rng: (
+            "PATCH", f"/api/tasks/{rng.randint(1, task_count)}", {"json": {"isComplete": rng.random() < 0.5}}
+        ),
+        "POST /tasks/batch": lambda rng: ("POST", "/api/tasks/batch", {"json": {
+            "update": [{"id": rng.randint(1, task_count), "isComplete": rng.random() < 0.5} for _ in range(10)]
+        }}),
+        "POST /chat/langgraph": lambda rng: ("POST", "/api/chat/langgraph", {"json": {"message": "What is on my list?"}}),
+        "POST /chat/foundry": lambda rng: ("POST", "/api/chat/foundry", {"json": {"message": "What is on my list?"}}),
+        "POST /chat/langgraph/stream": lambda rng: (
+            "POST", "/api/chat/langgraph/stream", {"json": {"message": "What is on my list?"}}
+        ),
+        "POST /chat/foundry/stream": lambda rng: (
+            "POST", "/api/chat/foundry/stream", {"json": {"message": "What is on my list?"}}
+        ),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class ServerThread(threading.Thread):
+    """Runs a uvicorn server and a loop-lag probe on a dedicated event loop."""
+
+    def __init__(self, app, port: int, probe_interval: float):
+        super().__init__(daemon=True)
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self.probe_interval = probe_interval
+        # (wake-up time, lag) pairs, both in seconds on the perf_counter clock
+        self.lag_samples: List[Tuple[float, float]] = []
+
+    async def _probe(self):
+        while not self.server.should_exit:
+            start = time.perf_counter()
+            await asyncio.sleep(self.probe_interval)
+            now = time.perf_counter()
+            self.lag_samples.append((now, now - start - self.probe_interval))
+
+    async def _serve(self):
+        probe = asyncio.create_task(self._probe())
+        await self.server.serve()
+        await probe
+
+    def run(self):
+        asyncio.run(self._serve())
+
+    def wait_started(self, timeout: float = 10.0):
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if not self.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("uvicorn did not start")
+            time.sleep(0.02)
+
+    def lag_between(self, start: float, end: float) -> List[float]:
+        return [lag for at, lag in self.lag_samples if start <= at <= end]
+
+
+async def time_to_first_token(client: httpx.AsyncClient, method: str, path: str, start: float, **kwargs) -> Tuple[int, float]:
+    """Read a chat event stream to the end; returns the status and when the first token event arrived."""
+    first_token = None
+    async with client.stream(method, path, **kwargs) as response:
+        async for line in response.aiter_lines():
+            if first_token is None and line == "event: token":
+                first_token = time.perf_counter() - start
+    return response.status_code, first_token
+
+
+async def run_phase(client: httpx.AsyncClient, make_request, args) -> Tuple[List[float], List[float], int, int, float]:
+    """
+    Drive one route with args.concurrency callers; returns latencies, times to
+    first token (streaming routes only), requests, errors and elapsed time.
+    """
+    latencies: List[float] = []
+    ttfts: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + args.duration
+
+    async def caller(seed: int):
+        nonlocal errors
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            method, path, kwargs = make_request(rng)
+            start = time.perf_counter()
+            try:
+                if path.endswith("/stream"):
+                    status, ttft = await time_to_first_token(client, method, path, start, **kwargs)
+                    if ttft is not None:
+                        ttfts.append(ttft)
+                else:
+                    status = (await client.request(method, path, **kwargs)).status_code
+                if status >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(caller(seed) for seed in range(args.concurrency)))
+    return latencies, ttfts, len(latencies), errors, time.perf_counter() - start
+
+
+async def run_load_test(args, server: ServerThread, base_url: str) -> dict:
+    requests = build_requests(args.tasks)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        seed_rng = random.Random(0)
+        for offset in range(0, args.tasks, 500):
+            titles = [
+                {"title": f"{seed_rng.choice(SEARCH_WORDS)} task {i}"}
+                for i in range(offset, min(offset + 500, args.tasks))
+            ]
+            (await client.post("/api/tasks/batch", json={"create": titles})).raise_for_status()
+
+        # The agents start in the background; chat routes answer 503 until they have
+        while (await client.get("/ready")).status_code != 200:
+            await asyncio.sleep(0.05)
+
+        results = {}
+        for route in args.routes:
+            print(f"Running {route} ...", file=sys.stderr)
+            phase_start = time.perf_counter()
+            latencies, ttfts, count, errors, elapsed = await run_phase(client, requests[route], args)
+            lag = server.lag_between(phase_start, time.perf_counter())
+            results[route] = {
+                "requests": count,
+                "errors": errors,
+                "throughput_rps": count / elapsed,
+                "latency_ms": summarize([s * 1000 for s in latencies]),
+                "loop_lag_ms": summarize([s * 1000 for s in lag]),
+            }
+            if ttfts:
+                results[route]["ttft_ms"] = summarize([s * 1000 for s in ttfts])
+    return results
+
+
+def main():
+    routes = list(build_requests(1))
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--routes", nargs="+", default=routes, choices=routes, metavar="ROUTE",
+                        help=f"routes to load, quoted (default: all of {routes})")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent client callers")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per route")
+    parser.add_argument("--tasks", type=int, default=1000, help="tasks to seed")
+    parser.add_argument("--backend", default="sqlite", choices=["sqlite", "aiosqlite", "memory"])
+    parser.add_argument("--no-cache", action="store_true", help="disable the task read cache")
+    parser.add_argument("--agent-latency-ms", type=float, default=50.0, help="simulated model latency of the stub agents")
+    parser.add_argument("--probe-interval", type=float, default=5.0, help="loop lag probe interval in ms")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+    enter_work_dir()
+    from src.app import TaskManagerApp
+
+    task_service = TaskService(
+        f"load-{args.backend}.db",
+        cache=not args.no_cache,
+        backend=args.backend
+    )
+    agent_latency = args.agent_latency_ms / 1000
+    task_manager = TaskManagerApp(
+        task_service=task_service,
+        langgraph_agent=StubLangGraphAgent(task_service, agent_latency),
+        foundry_agent_factory=StubFoundryAgent.factory(agent_latency)
+    )
+
+    port = free_port()
+    server = ServerThread(task_manager.get_app(), port, args.probe_interval / 1000)
+    server.start()
+    try:
+        server.wait_started()
+        results = asyncio.run(run_load_test(args, server, f"http://127.0.0.1:{port}"))
+    finally:
+        server.server.should_exit = True
+        server.join()
+
+    report = {
+        "config": {
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "tasks": args.tasks,
+            "backend": args.backend,
+            "cache": not args.no_cache,
+            "agent_latency_ms": args.agent_latency_ms,
+        },
+        "routes": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(os.path.join(LAUNCH_DIR, args.output), "w") as f:
+            f.write(output + "\n")
+        print(f"Wrote {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Minimal stdio MCP server for the MCP benchmarks.
+
+Its tools block for a given time, like a server doing synchronous work, so
+one server process answers one call at a time.
+"""
+
+import os
+import sys
+import time
+
+from mcp.server.fastmcp import FastMCP
+
+mcp = FastMCP("bench-server", log_level="WARNING")
+
+
+@mcp.tool()
+def work(ms: float = 50.0) -> str:
+    """Block for ms milliseconds and report which process answered."""
+    time.sleep(ms / 1000)
+    return f"done by {os.getpid()}"
+
+
+@mcp.tool()
+def crash() -> str:
+    """Exit the server process, to exercise respawning."""
+    sys.stdout.flush()
+    os._exit(1)
+
+
+if __name__ == "__main__":
+    mcp.run()
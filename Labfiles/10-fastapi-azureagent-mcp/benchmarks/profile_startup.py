@@ -0,0 +1,143 @@
+"""
+Import-time profile and cold start of the Task Manager app.
+
+Import time: runs `python -X importtime` on importing the app (what uvicorn
+does) and on importing the agent modules as well, which the app now defers
+to its background startup. The summary and the raw -X importtime output of
+both are written to --output.
+
+Cold start: launches the app under uvicorn --runs times and polls until the
+task routes answer and until GET /ready reports the agents started. Azure
+settings are blanked and the Foundry agent's MCP tools come from the
+in-process benchmark server, so no network is needed.
+
+Run from the project root:
+    python -m benchmarks.profile_startup --runs 3 --output import_profile.txt
+
+The report depends on the machine and installed packages, so it is
+generated on demand rather than kept in the repository.
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+from typing import List, Optional, Tuple
+
+import httpx
+
+from benchmarks import LAUNCH_DIR, PROJECT_ROOT, enter_work_dir
+
+PROFILES = {
+    "app": "import src.app",
+    "app + agents": "import src.app, src.agents.langgraph_task_agent, src.agents.foundry_task_agent",
+}
+
+
+def child_env() -> dict:
+    return {
+        **os.environ,
+        "PYTHONPATH": PROJECT_ROOT,
+        # Set, so the project's .env does not fill them in
+        "AZURE_OPENAI_ENDPOINT": "",
+        "AZURE_AI_FOUNDRY_PROJECT_ENDPOINT": "",
+        "MCP_SERVER_MODULE": os.path.join(PROJECT_ROOT, "benchmarks", "mcp_bench_server.py"),
+    }
+
+
+def import_profile(statement: str) -> Tuple[float, List[Tuple[int, int, str]], str]:
+    """Wall time of a fresh interpreter running statement, with its -X importtime rows."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=child_env(), capture_output=True, text=True, check=True
+    )
+    elapsed = time.perf_counter() - start
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name[1:].rstrip()))
+    return elapsed, rows, result.stderr
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def cold_start(timeout: float) -> Tuple[Optional[float], Optional[float], dict]:
+    """Seconds from launch until the task routes answer, and until /ready is 200."""
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.app:app", "--port", str(port), "--log-level", "warning"],
+        env=child_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    tasks_after = ready_after = None
+    report = {}
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1.0) as client:
+            while ready_after is None and time.perf_counter() - start < timeout:
+                try:
+                    if tasks_after is None and client.get("/api/tasks", params={"limit": 1}).status_code == 200:
+                        tasks_after = time.perf_counter() - start
+                    if tasks_after is not None:
+                        response = client.get("/ready")
+                        if response.status_code == 200:
+                            ready_after = time.perf_counter() - start
+                            report = response.json()
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.005)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return tasks_after, ready_after, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="cold starts to take the median of")
+    parser.add_argument("--top", type=int, default=15, help="slowest imports listed per profile")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for a cold start")
+    parser.add_argument("--output", default="import_profile.txt", help="file the import profiles are written to")
+    args = parser.parse_args()
+    enter_work_dir()
+
+    lines = []
+    raw = []
+    for label, statement in PROFILES.items():
+        elapsed, rows, stderr = import_profile(statement)
+        top_level = sum(cumulative for _, cumulative, name in rows if not name.startswith(" "))
+        lines.append(f"{label}: {statement}")
+        lines.append(f"  interpreter wall time {elapsed * 1000:.0f} ms, imports {top_level / 1000:.0f} ms, {len(rows)} modules")
+        lines.append(f"  {'cumulative ms':>13} {'self ms':>8}  module")
+        for self_us, cumulative_us, name in sorted(rows, key=lambda row: -row[1])[:args.top]:
+            lines.append(f"  {cumulative_us / 1000:>13.1f} {self_us / 1000:>8.1f}  {name.strip()}")
+        lines.append("")
+        raw.append(f"# {label}: python -X importtime -c \"{statement}\"\n{stderr}")
+
+    starts = [cold_start(args.timeout) for _ in range(args.runs)]
+    tasks = [t for t, _, _ in starts if t is not None]
+    ready = [r for _, r, _ in starts if r is not None]
+    lines.append(f"cold start under uvicorn, median of {args.runs}")
+    lines.append(f"  task routes answering  {statistics.median(tasks) * 1000:>7.0f} ms" if tasks else "  task routes did not answer")
+    lines.append(f"  /ready                 {statistics.median(ready) * 1000:>7.0f} ms" if ready else "  /ready was not reached")
+    for name, agent in starts[-1][2].get("agents", {}).items():
+        lines.append(f"    {name:<10} {agent['status']:<8} {agent['seconds'] * 1000:>7.0f} ms in the background")
+
+    summary = "\n".join(lines)
+    print(summary)
+    with open(os.path.join(LAUNCH_DIR, args.output), "w") as f:
+        f.write(summary + "\n\n" + "\n".join(raw))
+    print(f"\nImport profiles written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
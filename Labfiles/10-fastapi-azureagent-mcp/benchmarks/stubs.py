@@ -0,0 +1,396 @@
+"""
+Network-free stand-ins for the chat agents, so the app can be load-tested
+without Azure OpenAI, Azure AI Foundry or an MCP server.
+"""
+
+import re
+import json
+import time
+import asyncio
+import itertools
+import threading
+from types import SimpleNamespace
+from contextlib import AsyncExitStack, nullcontext
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.models import ChatMessage, ChatStreamEvent, ChatStreamEventType, Role
+from src.services import TaskService
+
+
+async def stream_tokens(text: str, duration: float) -> AsyncIterator[ChatStreamEvent]:
+    """Yield text word by word, spread evenly over duration seconds."""
+    words = text.split(" ")
+    for i, word in enumerate(words):
+        await asyncio.sleep(duration / len(words))
+        yield ChatStreamEvent(type=ChatStreamEventType.TOKEN, content=word if i == 0 else " " + word)
+
+
+class ReplyChatModel(BaseChatModel):
+    """Chat model that answers every prompt with the same text and never calls tools."""
+
+    reply: str = "Noted."
+
+    @property
+    def _llm_type(self) -> str:
+        return "reply-stub"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ReplyChatModel":
+        return self
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        return self._generate(messages, stop, run_manager, **kwargs)
+
+
+def _map_strings(value: Any, fn) -> Any:
+    """Apply fn to every string in a script value."""
+    if isinstance(value, str):
+        return fn(value)
+    if isinstance(value, dict):
+        return {k: _map_strings(v, fn) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_map_strings(v, fn) for v in value]
+    return value
+
+
+def _current_turn(messages: List[BaseMessage]) -> tuple:
+    """The latest user message and the number of model replies since it."""
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], HumanMessage):
+            return str(messages[i].content), sum(isinstance(m, AIMessage) for m in messages[i + 1:])
+    return "", 0
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Chat model that plays back a tool-call script, so the real LangGraph
+    agent can run with no network.
+
+    A script is a list of turns, {"match": regex, "steps": [...]}. The first
+    turn whose pattern matches the user's message is played, one step per
+    model call within the turn:
+    - {"tool_calls": [{"name": ..., "args": {...}}]} calls tools
+    - {"content": "..."} replies and ends the turn
+    Strings in a step are formatted with the pattern's named groups. Messages
+    no turn matches, and calls past a turn's last step, get default_reply.
+    Every call first waits latency seconds, the model's response time.
+    """
+
+    script: List[Dict[str, Any]]
+    latency: float = 0.0
+    default_reply: str = "Done."
+    calls: int = 0
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs: Any) -> "ScriptedChatModel":
+        """Load a script saved by ScriptRecorder, or written by hand in the same format."""
+        with open(path) as f:
+            return cls(script=json.load(f)["turns"], **kwargs)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-stub"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ScriptedChatModel":
+        return self
+
+    def _reply(self, messages: List[BaseMessage]) -> AIMessage:
+        self.calls += 1
+        text, step_index = _current_turn(messages)
+        for turn in self.script:
+            match = re.search(turn["match"], text)
+            if match is None:
+                continue
+            if step_index >= len(turn["steps"]):
+                break
+            step = _map_strings(turn["steps"][step_index], lambda text: text.format_map(match.groupdict()))
+            if step.get("tool_calls"):
+                tool_calls = [
+                    {"name": call["name"], "args": call.get("args", {}), "id": f"call_{self.calls}_{i}"}
+                    for i, call in enumerate(step["tool_calls"])
+                ]
+                return AIMessage(content=step.get("content", ""), tool_calls=tool_calls)
+            return AIMessage(content=step.get("content", ""))
+        return AIMessage(content=self.default_reply)
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+
+class ScriptRecorder(BaseChatModel):
+    """
+    Wraps a real chat model and records what it does in each turn as a
+    ScriptedChatModel script, so conversations captured once against Azure
+    OpenAI can be replayed offline. Each turn matches its exact user message.
+    Only calls with tools bound are recorded, leaving out history summaries.
+    """
+
+    model: Any
+    bound: Any = None
+    turns: List[Dict[str, Any]] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "script-recorder"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ScriptRecorder":
+        # A shallow copy, so both record into the same turns
+        return self.model_copy(update={"bound": self.model.bind_tools(tools, **kwargs)})
+
+    def _record(self, messages: List[BaseMessage], message: AIMessage) -> ChatResult:
+        if self.bound is not None:
+            text, step_index = _current_turn(messages)
+            if step_index == 0 or not self.turns:
+                self.turns.append({"match": f"^{re.escape(text)}$", "steps": []})
+            step: Dict[str, Any] = {"content": message.content}
+            if message.tool_calls:
+                step["tool_calls"] = [{"name": call["name"], "args": call["args"]} for call in message.tool_calls]
+            # Recorded text is literal, not a template
+            self.turns[-1]["steps"].append(_map_strings(step, lambda text: text.replace("{", "{{").replace("}", "}}")))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        return self._record(messages, (self.bound or self.model).invoke(messages, stop=stop))
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        return self._record(messages, await (self.bound or self.model).ainvoke(messages, stop=stop))
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump({"turns": self.turns}, f, indent=2)
+
+
+class StubLangGraphAgent:
+    """
+    Mimics LangGraphTaskAgent: waits for a simulated model latency, reads
+    one page of tasks the way the getTasks tool would, and replies.
+    """
+
+    def __init__(self, task_service: TaskService, model_latency: float = 0.0):
+        self.task_service = task_service
+        self.model_latency = model_latency
+
+    async def process_message(self, message: str, session_id: Optional[str] = None) -> ChatMessage:
+        await asyncio.sleep(self.model_latency)
+        page = await self.task_service.get_tasks_page(limit=20)
+        return ChatMessage(
+            role=Role.ASSISTANT,
+            content=f"Stub reply to {message!r}: {len(page.items)} tasks on the first page."
+        )
+
+    async def stream_message(self, message: str, session_id: Optional[str] = None) -> AsyncIterator[ChatStreamEvent]:
+        # Half the latency before the tool call, the rest spread over the tokens
+        await asyncio.sleep(self.model_latency / 2)
+        yield ChatStreamEvent(type=ChatStreamEventType.TOOL_START, tool="getTasks")
+        page = await self.task_service.get_tasks_page(limit=20)
+        yield ChatStreamEvent(type=ChatStreamEventType.TOOL_END, tool="getTasks", content=f"{len(page.items)} tasks")
+        async for event in stream_tokens(f"Stub reply: {len(page.items)} tasks on the first page.", self.model_latency / 2):
+            yield event
+
+    async def aclose(self):
+        pass
+
+
+class StubFoundryAgent:
+    """Mimics FoundryTaskAgent with a fixed simulated run latency."""
+
+    def __init__(self, run_latency: float = 0.0):
+        self.run_latency = run_latency
+        self.project_client = None
+        self.agent_id = None
+        self.tool_cache = None
+        self.output_compactor = None
+
+    async def process_message(self, message: str, session_id: Optional[str] = None) -> ChatMessage:
+        await asyncio.sleep(self.run_latency)
+        return ChatMessage(role=Role.ASSISTANT, content=f"Stub Foundry reply to {message!r}.")
+
+    async def stream_message(self, message: str, session_id: Optional[str] = None) -> AsyncIterator[ChatStreamEvent]:
+        await asyncio.sleep(self.run_latency / 2)
+        async for event in stream_tokens(f"Stub Foundry reply to {message!r}.", self.run_latency / 2):
+            yield event
+
+    async def cleanup(self):
+        pass
+
+    @classmethod
+    def factory(cls, run_latency: float = 0.0):
+        """A TaskManagerApp foundry_agent_factory that builds this stub."""
+        async def create(exit_stack: AsyncExitStack):
+            return cls(run_latency)
+
+        return create
+
+
+class SimulatedAgentsService:
+    """
+    In-process stand-in for an AIProjectClient, driven synchronously like the
+    real SDK: every call blocks for api_latency seconds, as an HTTP round trip
+    would, and listing messages costs message_cost seconds per message
+    returned. A run first asks for one call of tool_name, if given, then
+    completes run_seconds after it was created.
+
+    As on the service, a thread takes no new message or run while a run on
+    it is active, and a cancelled run stops at once. Streamed runs send
+    their reply word by word over run_seconds; they do not call tools.
+    """
+
+    def __init__(
+        self,
+        api_latency: float = 0.05,
+        run_seconds: float = 1.0,
+        tool_name: Optional[str] = None,
+        message_cost: float = 0.0
+    ):
+        self.api_latency = api_latency
+        self.message_cost = message_cost
+        self.run_seconds = run_seconds
+        self.tool_name = tool_name
+        self.calls = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._runs: Dict[str, dict] = {}
+        self._messages: Dict[str, list] = {}
+        self.cancelled_runs: List[str] = []
+        self.agents = SimpleNamespace(
+            create_agent=self._call(lambda **kwargs: SimpleNamespace(id=self._new_id("asst"))),
+            delete_agent=self._call(lambda agent_id: None),
+            enable_auto_function_calls=lambda tools: None,
+            threads=SimpleNamespace(create=self._call(self._create_thread), delete=self._call(self._delete_thread)),
+            messages=SimpleNamespace(create=self._call(self._create_message), list=self._call(self._list_messages)),
+            runs=SimpleNamespace(
+                create=self._call(self._create_run),
+                get=self._call(self._get_run),
+                submit_tool_outputs=self._call(self._submit_tool_outputs),
+                stream=self._call(self._stream_run),
+                cancel=self._call(self._cancel_run)
+            )
+        )
+
+    def _call(self, fn):
+        def blocking(*args, **kwargs):
+            time.sleep(self.api_latency)
+            with self._lock:
+                self.calls += 1
+                return fn(*args, **kwargs)
+        return blocking
+
+    def _new_id(self, prefix: str) -> str:
+        return f"{prefix}_{next(self._ids)}"
+
+    def _create_thread(self, **kwargs):
+        thread_id = self._new_id("thread")
+        self._messages[thread_id] = []
+        return SimpleNamespace(id=thread_id)
+
+    def _delete_thread(self, thread_id: str):
+        self._messages.pop(thread_id, None)
+
+    def _active(self, state: dict) -> bool:
+        if state.get("cancelled") or "reply" in state:
+            return False
+        return not state["tool_done"] or time.perf_counter() - state["created"] < self.run_seconds
+
+    def _check_idle(self, thread_id: str):
+        for run_id, state in self._runs.items():
+            if state["thread_id"] == thread_id and self._active(state):
+                raise RuntimeError(f"Thread {thread_id} already has an active run {run_id}")
+
+    def _create_message(self, thread_id: str, role: str, content: str):
+        if role == "user":
+            self._check_idle(thread_id)
+        message = SimpleNamespace(
+            id=self._new_id("msg"),
+            role=role,
+            run_id=None,
+            content=[SimpleNamespace(text=SimpleNamespace(value=content))]
+        )
+        self._messages[thread_id].append(message)
+        return message
+
+    def _list_messages(self, thread_id: str, run_id: Optional[str] = None, limit: Optional[int] = None, order: str = "desc"):
+        """Lazily paged, like ItemPaged: each page is another round trip, sized by limit."""
+        messages = [m for m in self._messages[thread_id] if run_id is None or m.run_id == run_id]
+        if order == "desc":
+            messages = messages[::-1]
+        page_size = limit or 20
+        for start in range(0, len(messages), page_size):
+            page = messages[start:start + page_size]
+            if start:
+                time.sleep(self.api_latency)
+                with self._lock:
+                    self.calls += 1
+            # Transfer time grows with the messages returned
+            time.sleep(self.message_cost * len(page))
+            yield from page
+
+    def _create_run(self, thread_id: str, agent_id: str, **kwargs):
+        self._check_idle(thread_id)
+        run_id = self._new_id("run")
+        self._runs[run_id] = {"thread_id": thread_id, "created": time.perf_counter(), "tool_done": self.tool_name is None}
+        return SimpleNamespace(id=run_id, status="queued", required_action=None, last_error=None)
+
+    def _get_run(self, thread_id: str, run_id: str):
+        state = self._runs[run_id]
+        if state.get("cancelled"):
+            return SimpleNamespace(id=run_id, status="cancelled", required_action=None, last_error=None)
+        if not state["tool_done"]:
+            tool_call = SimpleNamespace(id=f"call_{run_id}", function=SimpleNamespace(name=self.tool_name, arguments="{}"))
+            required_action = SimpleNamespace(submit_tool_outputs=SimpleNamespace(tool_calls=[tool_call]))
+            return SimpleNamespace(id=run_id, status="requires_action", required_action=required_action, last_error=None)
+        if time.perf_counter() - state["created"] < self.run_seconds:
+            return SimpleNamespace(id=run_id, status="in_progress", required_action=None, last_error=None)
+        if "reply" not in state:
+            state["reply"] = self._create_message(thread_id, "assistant", f"Simulated reply for {run_id}")
+            state["reply"].run_id = run_id
+        return SimpleNamespace(id=run_id, status="completed", required_action=None, last_error=None)
+
+    def _submit_tool_outputs(self, thread_id: str, run_id: str, tool_outputs: list):
+        self._runs[run_id]["tool_done"] = True
+
+    def _cancel_run(self, thread_id: str, run_id: str):
+        self._runs[run_id]["cancelled"] = True
+        self.cancelled_runs.append(run_id)
+        return SimpleNamespace(id=run_id, status="cancelling", required_action=None, last_error=None)
+
+    def _stream_run(self, thread_id: str, agent_id: str, event_handler, **kwargs):
+        run_id = self._create_run(thread_id, agent_id).id
+        state = self._runs[run_id]
+        state["tool_done"] = True
+
+        def frame(event_type: str, data: dict) -> bytes:
+            return f"event: {event_type}\ndata: {json.dumps(data)}\n\n".encode()
+
+        def events():
+            run = {"id": run_id, "object": "thread.run", "thread_id": thread_id}
+            yield frame("thread.run.created", {**run, "status": "queued"})
+            words = f"Simulated reply for {run_id}".split(" ")
+            for i, word in enumerate(words):
+                time.sleep(self.run_seconds / len(words))
+                if state.get("cancelled"):
+                    yield frame("thread.run.cancelled", {**run, "status": "cancelled"})
+                    return
+                text = word if i == 0 else " " + word
+                yield frame("thread.message.delta", {
+                    "id": f"msg_{run_id}", "object": "thread.message.delta",
+                    "delta": {"content": [{"index": 0, "type": "text", "text": {"value": text}}]}
+                })
+            with self._lock:
+                state["reply"] = self._create_message(thread_id, "assistant", " ".join(words))
+                state["reply"].run_id = run_id
+            yield frame("thread.run.completed", {**run, "status": "completed"})
+            yield b"event: done\ndata: [DONE]\n\n"
+
+        event_handler.initialize(events(), None)
+        return nullcontext(event_handler)
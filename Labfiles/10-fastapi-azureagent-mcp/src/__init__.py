@@ -4,10 +4,24 @@ Task Manager FastAPI Application
 A Python FastAPI app that integrates with both Azure AI Foundry Agents and LangGraph Agents.
 """
 
+import importlib
+
 from .models import *
 from .services import *
-from .agents import *
-from .routes import *
-from .app import app
+
+# The agents, routes and app are imported on first use, so importing the package stays cheap
+_LAZY_MODULES = {
+    "LangGraphTaskAgent": ".agents",
+    "FoundryTaskAgent": ".agents",
+    "create_api_routes": ".routes",
+    "app": ".app",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_MODULES:
+        return getattr(importlib.import_module(_LAZY_MODULES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __version__ = "1.0.0"
@@ -1,4 +1,15 @@
-from .langgraph_task_agent import LangGraphTaskAgent
-from .foundry_task_agent import FoundryTaskAgent
+import importlib
+
+# Each agent pulls in its SDKs (LangChain and LangGraph, Azure AI, MCP), so it is imported on first use
+_AGENT_MODULES = {
+    "LangGraphTaskAgent": ".langgraph_task_agent",
+    "FoundryTaskAgent": ".foundry_task_agent",
+}
 
 __all__ = ["LangGraphTaskAgent", "FoundryTaskAgent"]
+
+
+def __getattr__(name: str):
+    if name in _AGENT_MODULES:
+        return getattr(importlib.import_module(_AGENT_MODULES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
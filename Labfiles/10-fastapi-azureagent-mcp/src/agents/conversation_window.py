@@ -0,0 +1,134 @@
+import json
+from typing import Any, Dict, List, Optional
+from typing_extensions import NotRequired
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AnyMessage, HumanMessage, SystemMessage, ToolMessage
+from langgraph.prebuilt.chat_agent_executor import AgentState
+from .tool_output import estimate_tokens
+
+# Per-message framing the chat API adds on top of the content
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a conversation between a user and a task management assistant. "
+    "Update the summary with the new messages. Keep task IDs, titles and decisions, and anything the user "
+    "asked to remember. Reply with the summary only, in at most {words} words."
+)
+
+
+class ConversationState(AgentState):
+    """Agent state plus the rolling summary of the turns that left the window."""
+    summary: NotRequired[str]
+    # Leading messages already folded into the summary
+    summarized_count: NotRequired[int]
+
+
+def message_tokens(message: AnyMessage) -> int:
+    """Estimated prompt tokens of one message, tool call arguments included."""
+    content = message.content if isinstance(message.content, str) else json.dumps(message.content)
+    tokens = estimate_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+    for tool_call in getattr(message, "tool_calls", None) or []:
+        tokens += estimate_tokens(tool_call["name"] + json.dumps(tool_call["args"]))
+    return tokens
+
+
+class ConversationWindow:
+    """
+    Keeps the prompt of a long conversation within a token budget.
+
+    Used as the ReAct graph's pre_model_hook; the full history stays in the
+    checkpoint, only what is sent to the model is cut down:
+    - Tool outputs from earlier turns are shortened, since their results
+      have already been answered from
+    - The newest whole turns that fit in max_tokens are sent; a turn is
+      never split, so tool calls keep their outputs
+    - Older turns are folded into a rolling summary, kept in the checkpoint
+      and extended only with the messages that newly left the window; each
+      time, the window shrinks to half the budget, so the summary is only
+      updated every few turns
+
+    The current turn is always sent whole, even if it alone is over budget.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 4000,
+        summarizer: Optional[BaseChatModel] = None,
+        stale_tool_chars: int = 200,
+        max_summary_tokens: int = 400
+    ):
+        self.max_tokens = max_tokens
+        self.summarizer = summarizer
+        self.stale_tool_chars = stale_tool_chars
+        self.max_summary_tokens = max_summary_tokens
+        self.summaries = 0
+
+    def _shorten_tool_output(self, message: ToolMessage) -> ToolMessage:
+        content = message.content if isinstance(message.content, str) else json.dumps(message.content)
+        if len(content) <= self.stale_tool_chars:
+            return message
+        return message.model_copy(update={
+            "content": f"{content[:self.stale_tool_chars]}... [earlier tool output, {len(content) - self.stale_tool_chars} more chars omitted]"
+        })
+
+    def _window_start(self, messages: List[AnyMessage], turn_starts: List[int], summarized_count: int, budget: int) -> int:
+        """Index of the first message to send: the start of the oldest turn that still fits in budget."""
+        start = turn_starts[-1] if turn_starts else 0
+        used = sum(message_tokens(m) for m in messages[start:])
+        for turn_start in reversed(turn_starts[:-1]):
+            if turn_start < summarized_count:
+                break
+            turn = sum(message_tokens(m) for m in messages[turn_start:start])
+            if used + turn > budget:
+                break
+            used += turn
+            start = turn_start
+        return max(start, summarized_count)
+
+    async def _summarize(self, summary: Optional[str], messages: List[AnyMessage]) -> Optional[str]:
+        lines = [f"Summary so far: {summary}"] if summary else []
+        for message in messages:
+            if isinstance(message, ToolMessage):
+                lines.append(f"Tool {message.name}: {str(message.content)[:self.stale_tool_chars]}")
+            elif message.content:
+                lines.append(f"{'User' if message.type == 'human' else 'Assistant'}: {message.content}")
+        prompt = [
+            SystemMessage(SUMMARY_INSTRUCTIONS.format(words=self.max_summary_tokens * 3 // 4)),
+            HumanMessage("\n".join(lines)),
+        ]
+        try:
+            result = await self.summarizer.ainvoke(prompt, config={"tags": ["conversation_summary"]})
+        except Exception as e:
+            # Without a new summary the dropped turns are just left out
+            print(f"Failed to summarize conversation history: {e}")
+            return summary
+        self.summaries += 1
+        text = str(result.content)
+        return text[:self.max_summary_tokens * 4]
+
+    async def pre_model_hook(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        messages: List[AnyMessage] = state["messages"]
+        summary = state.get("summary")
+        summarized_count = state.get("summarized_count", 0)
+        update: Dict[str, Any] = {}
+
+        turn_starts = [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+        current_turn = turn_starts[-1] if turn_starts else 0
+        # Messages already in the summary are never sent, so they are left as they are
+        prompt = messages[:summarized_count] + [
+            self._shorten_tool_output(m) if isinstance(m, ToolMessage) and i < current_turn else m
+            for i, m in enumerate(messages[summarized_count:], start=summarized_count)
+        ]
+
+        start = self._window_start(prompt, turn_starts, summarized_count, self.max_tokens)
+        if start > summarized_count and self.summarizer is not None:
+            start = self._window_start(prompt, turn_starts, summarized_count, self.max_tokens // 2)
+            summary = await self._summarize(summary, prompt[summarized_count:start])
+            update["summary"] = summary
+            update["summarized_count"] = start
+
+        window = prompt[start:]
+        if summary:
+            window = [SystemMessage(f"Summary of the earlier conversation: {summary}")] + window
+        update["llm_input_messages"] = window
+        return update
@@ -0,0 +1,250 @@
+import os
+import json
+import time
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from azure.core.credentials import AccessToken, TokenCredential
+from azure.identity import DefaultAzureCredential
+
+COGNITIVE_SERVICES_SCOPE = "https://cognitiveservices.azure.com/.default"
+AI_PROJECT_SCOPE = "https://ai.azure.com/.default"
+
+_shared: Optional["CachedCredential"] = None
+_shared_lock = threading.Lock()
+
+
+class CachedCredential:
+    """
+    A TokenCredential that caches tokens per scope, shared by every client in the process.
+
+    Lab 06's credentials.py carries a copy of this class: each lab is run from
+    its own directory with its own requirements, so neither can import the
+    other's. Keep the two copies identical when changing either.
+
+    DefaultAzureCredential probes its chain of sources on first use and, with
+    the Azure CLI source, starts a subprocess for every token; each agent
+    building its own credential repeats both. This wrapper:
+    - Returns a cached token until refresh_margin seconds before it expires,
+      or a quarter of its lifetime for tokens that live less than 4 margins
+    - Refreshes tokens in a background thread from twice that margin, so
+      requests do not wait for a token once one has been fetched
+    - Can fetch tokens ahead of first use with prefetch
+    - With cache_path, shares tokens with other processes through a file
+      readable only by the current user; tokens are bearer secrets, so this
+      is off by default
+    Calls with claims or tenant_id bypass the cache.
+    """
+
+    def __init__(
+        self,
+        credential: Optional[TokenCredential] = None,
+        refresh_margin: float = 300.0,
+        cache_path: Optional[str] = None
+    ):
+        self.credential = credential or DefaultAzureCredential()
+        self.refresh_margin = refresh_margin
+        self.cache_path = cache_path
+        self._tokens: Dict[Tuple[str, ...], AccessToken] = {}
+        self._lifetimes: Dict[Tuple[str, ...], float] = {}
+        self._fetch_locks: Dict[Tuple[str, ...], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._wake = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+        self.hits = 0
+        self.fetches = 0
+        self.file_hits = 0
+        self.refreshes = 0
+        self.fetch_seconds = 0.0
+        self._load()
+
+    def get_token(self, *scopes: str, claims: Optional[str] = None, tenant_id: Optional[str] = None, **kwargs: Any) -> AccessToken:
+        if claims or tenant_id:
+            return self.credential.get_token(*scopes, claims=claims, tenant_id=tenant_id, **kwargs)
+
+        token = self.cached_token(*scopes)
+        if token is not None:
+            self.hits += 1
+            return token
+        return self._fetch(scopes, kwargs)
+
+    def cached_token(self, *scopes: str) -> Optional[AccessToken]:
+        """The cached token for scopes if it is not yet due for refresh, without fetching."""
+        token = self._tokens.get(scopes)
+        if token is not None and token.expires_on - time.time() > self._margin(scopes):
+            return token
+        return None
+
+    def _margin(self, scopes: Tuple[str, ...]) -> float:
+        """The refresh margin for scopes' token, at most a quarter of its lifetime."""
+        return min(self.refresh_margin, self._lifetimes.get(scopes, float("inf")) / 4)
+
+    def _store(self, scopes: Tuple[str, ...], token: AccessToken):
+        self._tokens[scopes] = token
+        # A token from the file may be part way through its life, which gives a shorter margin
+        self._lifetimes[scopes] = token.expires_on - time.time()
+
+    def prefetch(self, *scopes: str):
+        """Fetch a token for scopes in the background, ahead of the first request that needs it."""
+        if self.cached_token(*scopes) is None:
+            threading.Thread(target=self._prefetch, args=(scopes,), daemon=True).start()
+
+    def _prefetch(self, scopes: Tuple[str, ...]):
+        try:
+            self._fetch(scopes, {})
+        except Exception as e:
+            # The full message lists every source in the chain; the request that needs the token raises it again
+            print(f"Failed to prefetch token for {' '.join(scopes)}: {str(e).splitlines()[0]}")
+
+    def _fetch(self, scopes: Tuple[str, ...], kwargs: Dict[str, Any], refresh: bool = False) -> AccessToken:
+        with self._lock:
+            fetch_lock = self._fetch_locks.setdefault(scopes, threading.Lock())
+        # One fetch per scope at a time; callers that waited get its result
+        with fetch_lock:
+            if not refresh:
+                token = self.cached_token(*scopes)
+                if token is not None:
+                    return token
+                token = self._load_scope(scopes)
+                if token is not None:
+                    self.file_hits += 1
+                    return token
+
+            start = time.perf_counter()
+            try:
+                token = self.credential.get_token(*scopes, **kwargs)
+            except Exception:
+                # Keep serving a token that has not actually expired yet
+                current = self._tokens.get(scopes)
+                if current is not None and current.expires_on > time.time():
+                    print(f"Token refresh for {' '.join(scopes)} failed, using the current token")
+                    return current
+                raise
+            self.fetch_seconds += time.perf_counter() - start
+            self.fetches += 1
+            self._store(scopes, token)
+            self._save()
+            # The refresher's own fetches must not wake it, or it never waits
+            if not refresh:
+                self._start_refresher()
+            return token
+
+    def _start_refresher(self):
+        if self._refresher is None:
+            self._refresher = threading.Thread(target=self._refresh_loop, name="token-refresh", daemon=True)
+            self._refresher.start()
+        self._wake.set()
+
+    def _refresh_loop(self):
+        while not self._closed.is_set():
+            self._wake.clear()
+            now = time.time()
+            due = {scopes: token.expires_on - 2 * self._margin(scopes) for scopes, token in list(self._tokens.items())}
+            for scopes, refresh_at in due.items():
+                if refresh_at <= now:
+                    try:
+                        self._fetch(scopes, {}, refresh=True)
+                        self.refreshes += 1
+                    except Exception as e:
+                        print(f"Background token refresh for {' '.join(scopes)} failed: {e}")
+            # Wait for the next token to come due, retrying failures after a minute
+            now = time.time()
+            next_due = min((t.expires_on - 2 * self._margin(s) for s, t in list(self._tokens.items())), default=now + 3600)
+            self._wake.wait(max(60.0 if next_due <= now else next_due - now, 1.0))
+
+    def _read_file(self) -> Dict[str, dict]:
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _load(self):
+        if not self.cache_path:
+            return
+        for key, entry in self._read_file().items():
+            self._store(tuple(key.split(" ")), AccessToken(entry["token"], int(entry["expires_on"])))
+        if self._tokens:
+            self._start_refresher()
+
+    def _load_scope(self, scopes: Tuple[str, ...]) -> Optional[AccessToken]:
+        """A token for scopes saved by another process since this one last looked."""
+        if not self.cache_path:
+            return None
+        entry = self._read_file().get(" ".join(scopes))
+        if entry is None:
+            return None
+        token = AccessToken(entry["token"], int(entry["expires_on"]))
+        current = self._tokens.get(scopes)
+        if current is None or token.expires_on > current.expires_on:
+            self._store(scopes, token)
+        return self.cached_token(*scopes)
+
+    def _save(self):
+        if not self.cache_path:
+            return
+        entries = self._read_file()
+        now = time.time()
+        entries = {key: entry for key, entry in entries.items() if entry["expires_on"] > now}
+        for scopes, token in self._tokens.items():
+            entries[" ".join(scopes)] = {"token": token.token, "expires_on": token.expires_on}
+        # Written whole and renamed into place, so other processes never read half a file
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "fetches": self.fetches,
+            "fileHits": self.file_hits,
+            "refreshes": self.refreshes,
+            "fetchSeconds": round(self.fetch_seconds, 3),
+            "scopes": [" ".join(scopes) for scopes in self._tokens],
+        }
+
+    def close(self):
+        self._closed.set()
+        self._wake.set()
+        close = getattr(self.credential, "close", None)
+        if close is not None:
+            close()
+
+
+def shared_credential() -> CachedCredential:
+    """
+    The process-wide CachedCredential, created on first use.
+
+    - AZURE_TOKEN_REFRESH_MARGIN_SECONDS: Time before expiry a token is no longer used (default 300)
+    - AZURE_TOKEN_CACHE_PATH: File to share tokens with other processes through (default none)
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = CachedCredential(
+                refresh_margin=float(os.getenv("AZURE_TOKEN_REFRESH_MARGIN_SECONDS", "300")),
+                cache_path=os.getenv("AZURE_TOKEN_CACHE_PATH") or None
+            )
+        return _shared
+
+
+def bearer_token_provider(credential: CachedCredential, scope: str) -> Callable[[], str]:
+    """A token provider for OpenAI clients, answered from the credential's cache."""
+    def provider() -> str:
+        return credential.get_token(scope).token
+
+    return provider
+
+
+def async_bearer_token_provider(credential: CachedCredential, scope: str) -> Callable[[], Awaitable[str]]:
+    """Like bearer_token_provider, but fetching off the event loop when the cache is cold."""
+    async def provider() -> str:
+        token = credential.cached_token(scope)
+        if token is None:
+            token = await asyncio.to_thread(credential.get_token, scope)
+        return token.token
+
+    return provider
@@ -1,50 +1,82 @@
-import os, time
+import os
 import json
-from contextlib import AsyncExitStack
-from typing import Optional
-from mcp import ClientSession, StdioServerParameters
+import asyncio
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack, ExitStack, asynccontextmanager
+from typing import AsyncIterator, List, Optional
+from mcp import StdioServerParameters
 from mcp.types import Tool
-from mcp.client.stdio import stdio_client
-from azure.identity import DefaultAzureCredential
 from azure.ai.projects import AIProjectClient
-from azure.ai.agents.models import FunctionTool
-from ..models import ChatMessage, Role
+from azure.ai.agents.models import AgentEventHandler, FunctionTool, ListSortOrder, MessageDeltaChunk, ThreadRun
+from ..models import ChatMessage, ChatStreamEvent, ChatStreamEventType, Role
+from .session_threads import SessionThreads
+from .tool_dispatch import dispatch_tool_calls
+from .tool_cache import ToolResultCache, tool_cache_ttls
+from .mcp_pool import MCPSessionPool
+from .inprocess_mcp import load_fastmcp_server
+from .tool_output import ToolOutputCompactor, tool_output_compactor
+from .credentials import AI_PROJECT_SCOPE, shared_credential
 
 async def connect_to_server(exit_stack: AsyncExitStack):
 
-    server_params = StdioServerParameters(
-        command="C:\\develop\\open-source\\azure-ai-agents-dotnet\\MiniMCPServer\\bin\\Release\\net8.0\\MiniMCPServer.exe",
-        args=[],
-        env=None
-    )
-
-    # Start the MCP server
-    stdio_transport = await exit_stack.enter_async_context(stdio_client(server_params))
-    stdio, write = stdio_transport
+    server_module = os.getenv("MCP_SERVER_MODULE")
+    if server_module:
+        # A Python FastMCP server runs in this process, without spawn or pipe overhead
+        server = load_fastmcp_server(server_module)
+        default_pool_size = "1"
+    else:
+        server = StdioServerParameters(
+            command="C:\\develop\\open-source\\azure-ai-agents-dotnet\\MiniMCPServer\\bin\\Release\\net8.0\\MiniMCPServer.exe",
+            args=[],
+            env=None
+        )
+        default_pool_size = "2"
 
-    # Create an MCP client session
-    session = await exit_stack.enter_async_context(ClientSession(stdio, write))
-    await session.initialize()
+    # Start a pool of MCP servers so concurrent tool calls are not queued on one session
+    pool = MCPSessionPool(
+        server,
+        size=int(os.getenv("MCP_POOL_SIZE", default_pool_size)),
+        health_interval=float(os.getenv("MCP_HEALTH_INTERVAL_SECONDS", "30"))
+    )
+    exit_stack.push_async_callback(pool.aclose)
+    await pool.start()
 
     # List available tools
-    response = await session.list_tools()
+    response = await pool.list_tools()
     tools = response.tools  
 
     # Build a function for each tool
     def make_tool_func(tool_name):
         async def tool_func(**kwargs):
-            result = await session.call_tool(tool_name, kwargs)
+            result = await pool.call_tool(tool_name, kwargs)
             return result
         
         tool_func.__name__ = tool_name
         return tool_func  
 
-    functions_dict = {tool.name: make_tool_func(tool.name) for tool in tools}
+    # Results of read-only tools are cached for a while
+    tool_cache = ToolResultCache(max_entries=int(os.getenv("MCP_TOOL_CACHE_SIZE", "256")))
+    ttls = tool_cache_ttls(tools)
+    functions_dict = {tool.name: tool_cache.wrap(tool.name, make_tool_func(tool.name), ttls.get(tool.name)) for tool in tools}
     # mcp_function_tool = FunctionTool(functions=list(functions_dict.values())) 
 
-    print("\nConnected to server with tools:", [tool.name for tool in tools]) 
-    return functions_dict
+    print(f"\nConnected to {len(pool.stats())} servers with tools:", [tool.name for tool in tools]) 
+    print("Caching tool results:", ttls)
+    return functions_dict, tool_cache
+
+
 
+class _ManualToolEventHandler(AgentEventHandler):
+    """
+    Run stream handler that leaves tool calls to the caller.
+    
+    The SDK would otherwise execute function tools itself, synchronously,
+    which cannot await the MCP session.
+    """
+
+    def initialize(self, response_iterator, submit_tool_outputs):
+        super().initialize(response_iterator, lambda run, handler, submit_with_error: [])
 
 
 class FoundryTaskAgent:
@@ -53,36 +85,76 @@ class FoundryTaskAgent:
     
     This agent:
     - Initializes connection to Azure AI Foundry using environment variables
-    - Manages agent session and conversation thread
+    - Keeps one conversation thread per chat session, evicting idle sessions
     - Sends user messages to agent and retrieves responses
+    - Runs the tool calls of a run step concurrently
     - Handles errors and configuration issues gracefully
     
     Environment variables required:
     - AZURE_AI_FOUNDRY_PROJECT_ENDPOINT: The endpoint URL for the Azure AI Foundry project
     - AZURE_AI_FOUNDRY_AGENT_ID: The identifier of the agent to use
+    
+    Optional environment variables:
+    - FOUNDRY_MAX_SESSIONS: Sessions to keep threads for (default 1000)
+    - FOUNDRY_SESSION_TTL_SECONDS: Idle time before a session's thread is deleted (default 3600)
+    - FOUNDRY_MAX_CONCURRENT_TOOL_CALLS: Tool calls run at once across all runs (default 4)
+    - MCP_TOOL_CACHE_SIZE, MCP_TOOL_CACHE_TTLS, MCP_TOOL_CACHE_DEFAULT_TTL: Read-only tool result cache
+    - TOOL_OUTPUT_TOKEN_BUDGET, TOOL_OUTPUT_BUDGETS, TOOL_OUTPUT_FIELDS: Tool output compaction
+    - MCP_SERVER_MODULE: Path of a Python FastMCP server to run in-process instead of over stdio
+    - MCP_POOL_SIZE: MCP server sessions to spread tool calls over (default 2, or 1 in-process)
+    - MCP_HEALTH_INTERVAL_SECONDS: Time between MCP server health checks (default 30)
+    - FOUNDRY_STREAM_THREADS: Threads reading run streams (default FOUNDRY_CHAT_MAX_CONCURRENT,
+      the chat admission limit, or 32 without one)
+    
+    A project_client can be passed in instead, e.g. a simulated service for benchmarks.
     """
     
-    def __init__(self, functions_dict):
+    # Run polling starts fast, for short runs, and backs off for long ones
+    POLL_INITIAL_INTERVAL = 0.25
+    POLL_MAX_INTERVAL = 2.0
+    POLL_BACKOFF = 1.5
+    
+    def __init__(
+        self,
+        functions_dict,
+        project_client: Optional[AIProjectClient] = None,
+        tool_cache: Optional[ToolResultCache] = None,
+        output_compactor: Optional[ToolOutputCompactor] = None
+    ):
         mcpTools = FunctionTool(functions=list(functions_dict.values()))
         self.tools = mcpTools
         self.functions_dict = functions_dict
+        self.tool_cache = tool_cache
+        # Tool outputs stay in the thread and are re-read on every later step, so keep them small
+        self.output_compactor = output_compactor or tool_output_compactor()
         self.project_client = None
-        self.thread_id = None
         self.agent_id = None
+        self.sessions = SessionThreads(
+            max_sessions=int(os.getenv("FOUNDRY_MAX_SESSIONS", "1000")),
+            ttl=float(os.getenv("FOUNDRY_SESSION_TTL_SECONDS", "3600"))
+        )
+        # Shared by every run, so concurrent chats cannot flood the MCP server
+        self.tool_limit = asyncio.Semaphore(int(os.getenv("FOUNDRY_MAX_CONCURRENT_TOOL_CALLS", "4")))
+        # A stream's reads block for as long as the model writes, so they get their own
+        # threads, one per admitted chat, and cannot hold up the default executor
+        self.stream_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("FOUNDRY_STREAM_THREADS") or self._chat_max_concurrent()),
+            thread_name_prefix="foundry-stream"
+        )
 
         # Initialize the agent
         endpoint = os.getenv("AZURE_AI_FOUNDRY_PROJECT_ENDPOINT")
         model_deployment = os.getenv("MODEL_DEPLOYMENT_NAME")
 
-        if not endpoint or not model_deployment:
+        if project_client is None and (not endpoint or not model_deployment):
             print("Azure AI Foundry configuration missing. Set AZURE_AI_FOUNDRY_PROJECT_ENDPOINT and AZURE_AI_FOUNDRY_AGENT_ID")
             return  
         
         try:
             # Create the project client using Azure credentials
-            self.project_client = AIProjectClient(
+            self.project_client = project_client or AIProjectClient(
                 endpoint=endpoint,
-                credential=DefaultAzureCredential()
+                credential=shared_credential()
             )
 
             # Create the agent
@@ -103,10 +175,7 @@ class FoundryTaskAgent:
             # Enable auto function calling
             self.project_client.agents.enable_auto_function_calls(tools=mcpTools)
 
-            # Create a thread for this session
-            thread = self.project_client.agents.threads.create()
-            self.thread_id = thread.id
-            print(f"Created thread: {self.thread_id}")
+            # Conversation threads are created per chat session, on first use
             print("Azure AI Foundry Task Agent initialized successfully")
             
         except ImportError as e:
@@ -114,115 +183,144 @@ class FoundryTaskAgent:
         except Exception as e:
             print(f"Failed to initialize Azure AI Foundry agent: {e}")        
     
-    async def process_message(self, message: str) -> ChatMessage:
+    async def _run_tool_call(self, tool_call) -> dict:
+        """Invoke the MCP tool a run asked for and return its tool output entry."""
+        # Retrieve the matching function tool
+        function_name = tool_call.function.name
+        args_json = tool_call.function.arguments
+        kwargs = json.loads(args_json)
+        required_function = self.functions_dict.get(function_name)
+        
+        print("function call name:", function_name)
+        print("function call args:", args_json, kwargs)
+
+        # Invoke the function
+        output = await required_function(**kwargs)
+
+        print("function output:", output)
+
+        # Return the output text, within the tool's token budget
+        return {
+            "tool_call_id": tool_call.id,
+            "output": self.output_compactor.compact(function_name, output.content[0].text),
+        }
+    
+    def _run_reply_text(self, thread_id: str, run_id: str) -> Optional[str]:
+        """Text of the last assistant message the run produced, or None if there is none."""
+        # Ask only for the run's own newest message, so the cost does not grow with the thread
+        messages = self.project_client.agents.messages.list(
+            thread_id=thread_id,
+            run_id=run_id,
+            order=ListSortOrder.DESCENDING,
+            limit=1
+        )
+        
+        for msg in messages:
+            if msg.role == "assistant":
+                # Extract text content from the message
+                content = ""
+                if hasattr(msg, 'content') and msg.content:
+                    for content_item in msg.content:
+                        if hasattr(content_item, 'text') and hasattr(content_item.text, 'value'):
+                            print("Found text content:", content_item.text.value)
+                            content += content_item.text.value
+                        elif hasattr(content_item, 'value'):
+                            print("Found generic content:", content_item.value)
+                            content += str(content_item.value)
+                return content
+        return None
+    
+    async def process_message(self, message: str, session_id: Optional[str] = None) -> ChatMessage:
         """
         Process a user message and return the assistant's response.
         
         Args:
             message: The user's message
+            session_id: Optional session ID for conversation continuity
             
         Returns:
             ChatMessage object containing the assistant's response
         """
-        if not self.project_client or not self.thread_id:
+        if not self.project_client or not self.agent_id:
             return ChatMessage(
                 role=Role.ASSISTANT,
                 content="Azure AI Foundry agent is not properly configured. Please check your settings."
             )
         
+        agents = self.project_client.agents
         try:
-            # Create the message in the thread
-            message_obj = self.project_client.agents.messages.create(
-                thread_id=self.thread_id,
-                role="user",
-                content=message
-            )
-            print(f"Created message, ID: {message_obj.id}")
-            
-            # Create and process the run
-            run = self.project_client.agents.runs.create(
-                thread_id=self.thread_id,
-                agent_id=self.agent_id
-            )
-
-            while run.status in ["queued", "in_progress", "requires_action"]:
-                time.sleep(1)
-                run = self.project_client.agents.runs.get(thread_id=self.thread_id, run_id=run.id)
-                tool_outputs = []
-
-                if run.status == "requires_action":
-
-                    print("status:  requires_action")
-
-                    tool_calls = run.required_action.submit_tool_outputs.tool_calls
-
-                    for tool_call in tool_calls:
+            async with self._session_thread(session_id) as thread_id:
+                # Every SDK call blocks on HTTP, so it runs on a worker thread
+                # to keep the event loop free for other requests
+                message_obj = await asyncio.to_thread(
+                    agents.messages.create,
+                    thread_id=thread_id,
+                    role="user",
+                    content=message
+                )
+                print(f"Created message, ID: {message_obj.id}")
+                
+                # Create and process the run
+                run = await asyncio.to_thread(
+                    agents.runs.create,
+                    thread_id=thread_id,
+                    agent_id=self.agent_id
+                )
 
-                        # Retrieve the matching function tool
-                        function_name = tool_call.function.name
-                        args_json = tool_call.function.arguments
-                        kwargs = json.loads(args_json)
-                        required_function = self.functions_dict.get(function_name)
-                        
-                        print("function call name:", function_name)
-                        print("function call args:", args_json, kwargs)
+                poll_interval = self.POLL_INITIAL_INTERVAL
+                try:
+                    while run.status in ["queued", "in_progress", "requires_action"]:
+                        await asyncio.sleep(poll_interval)
+                        poll_interval = min(poll_interval * self.POLL_BACKOFF, self.POLL_MAX_INTERVAL)
+                        run = await asyncio.to_thread(agents.runs.get, thread_id=thread_id, run_id=run.id)
 
-                        # Invoke the function
-                        output = await required_function(**kwargs)
+                        if run.status == "requires_action":
 
-                        print("function output:", output)
+                            print("status:  requires_action")
 
-                        # Append the output text
-                        tool_outputs.append({
-                            "tool_call_id": tool_call.id,
-                            "output": output.content[0].text,
-                        })
-                    
-                    # Submit the tool call output
-                    self.project_client.agents.runs.submit_tool_outputs(thread_id=self.thread_id, run_id=run.id, tool_outputs=tool_outputs)
+                            tool_calls = run.required_action.submit_tool_outputs.tool_calls
+                            tool_outputs = await dispatch_tool_calls(tool_calls, self._run_tool_call, self.tool_limit)
+                            
+                            # Submit the tool call output
+                            await asyncio.to_thread(
+                                agents.runs.submit_tool_outputs,
+                                thread_id=thread_id,
+                                run_id=run.id,
+                                tool_outputs=tool_outputs
+                            )
+                            # The run picks up straight after its tool outputs, so poll quickly again
+                            poll_interval = self.POLL_INITIAL_INTERVAL
+                except asyncio.CancelledError:
+                    # The caller went away; stop the run so the session's next message can use the thread
+                    await self._cancel_run(thread_id, run.id)
+                    raise
 
-            print(f"Run finished with status:  {run.status}")
-            
-            if run.status == "failed":
-                print(f"Run failed: {run.last_error}")
-                return ChatMessage(
-                    role=Role.ASSISTANT,
-                    content="I encountered an error processing your request. Please try again."
-                )
-            
-            if run.status == "completed":
-                # Fetch the latest messages from the thread
-                messages = self.project_client.agents.messages.list(thread_id=self.thread_id)
+                print(f"Run finished with status:  {run.status}")
                 
-                # Find the latest assistant message
-                for msg in messages:
-                    if msg.role == "assistant":
-                        # Extract text content from the message
-                        content = ""
-                        if hasattr(msg, 'content') and msg.content:
-                            for content_item in msg.content:
-                                if hasattr(content_item, 'text') and hasattr(content_item.text, 'value'):
-                                    print("Found text content:", content_item.text.value)
-                                    content += content_item.text.value
-                                elif hasattr(content_item, 'value'):
-                                    print("Found generic content:", content_item.value)
-                                    content += str(content_item.value)
-                        
+                if run.status == "failed":
+                    print(f"Run failed: {run.last_error}")
+                    return ChatMessage(
+                        role=Role.ASSISTANT,
+                        content="I encountered an error processing your request. Please try again."
+                    )
+                
+                if run.status == "completed":
+                    content = await asyncio.to_thread(self._run_reply_text, thread_id, run.id)
+                    if content is None:
                         return ChatMessage(
                             role=Role.ASSISTANT,
-                            content=content if content else "I received your message but couldn't generate a response."
+                            content="I processed your request but couldn't find a response."
                         )
-                
-                return ChatMessage(
-                    role=Role.ASSISTANT,
-                    content="I processed your request but couldn't find a response."
-                )
-            else:
-                return ChatMessage(
-                    role=Role.ASSISTANT,
-                    content=f"I encountered an issue processing your request. Status: {run.status}"
-                )
-                
+                    return ChatMessage(
+                        role=Role.ASSISTANT,
+                        content=content if content else "I received your message but couldn't generate a response."
+                    )
+                else:
+                    return ChatMessage(
+                        role=Role.ASSISTANT,
+                        content=f"I encountered an issue processing your request. Status: {run.status}"
+                    )
+                    
         except Exception as e:
             print(f"Error processing message with Azure AI Foundry: {e}")
             import traceback
@@ -232,12 +330,194 @@ class FoundryTaskAgent:
                 content="I apologize, but I encountered an error processing your request."
             )
     
+    async def stream_message(self, message: str, session_id: Optional[str] = None) -> AsyncIterator[ChatStreamEvent]:
+        """
+        Process a user message with a streaming run, yielding text deltas and
+        tool progress as they arrive.
+        
+        The Agents SDK stream is synchronous, so each blocking read runs on
+        one of the stream_executor threads; tool calls run on the event loop,
+        where the MCP session lives, and their outputs are submitted onto the
+        same stream.
+        
+        Args:
+            message: The user's message
+            session_id: Optional session ID for conversation continuity
+            
+        Yields:
+            TOKEN, TOOL_START and TOOL_END events, or a single ERROR event
+        """
+        if not self.project_client or not self.agent_id:
+            yield ChatStreamEvent(
+                type=ChatStreamEventType.ERROR,
+                content="Azure AI Foundry agent is not properly configured. Please check your settings."
+            )
+            return
+        
+        agents = self.project_client.agents
+        try:
+            async with self._session_thread(session_id) as thread_id:
+                await asyncio.to_thread(agents.messages.create, thread_id=thread_id, role="user", content=message)
+                
+                handler = _ManualToolEventHandler()
+                run_id = None
+                # The blocking call in progress; its thread finishes it even if this generator is cancelled
+                pending = self._in_stream_thread(
+                    agents.runs.stream,
+                    thread_id=thread_id,
+                    agent_id=self.agent_id,
+                    event_handler=handler
+                )
+                with ExitStack() as opened:
+                    try:
+                        opened.enter_context(await asyncio.shield(pending))
+                        while True:
+                            pending = self._in_stream_thread(next, handler, None)
+                            item = await asyncio.shield(pending)
+                            if item is None:
+                                break
+                            _, data, _ = item
+                            if isinstance(data, ThreadRun):
+                                run_id = data.id
+                            
+                            if isinstance(data, MessageDeltaChunk):
+                                if data.text:
+                                    yield ChatStreamEvent(type=ChatStreamEventType.TOKEN, content=data.text)
+                            elif isinstance(data, ThreadRun) and data.status == "requires_action":
+                                tool_calls = data.required_action.submit_tool_outputs.tool_calls
+                                for tool_call in tool_calls:
+                                    yield ChatStreamEvent(type=ChatStreamEventType.TOOL_START, tool=tool_call.function.name)
+                                tool_outputs = await dispatch_tool_calls(tool_calls, self._run_tool_call, self.tool_limit)
+                                for tool_call, tool_output in zip(tool_calls, tool_outputs):
+                                    yield ChatStreamEvent(
+                                        type=ChatStreamEventType.TOOL_END,
+                                        tool=tool_call.function.name,
+                                        content=tool_output["output"]
+                                    )
+                                # The continuation is chained onto the handler we are reading from
+                                pending = self._in_stream_thread(
+                                    agents.runs.submit_tool_outputs_stream,
+                                    thread_id=thread_id,
+                                    run_id=data.id,
+                                    tool_outputs=tool_outputs,
+                                    event_handler=handler
+                                )
+                                await asyncio.shield(pending)
+                            elif isinstance(data, ThreadRun) and data.status in ["failed", "cancelled", "expired"]:
+                                print(f"Run finished with status:  {data.status} {data.last_error}")
+                                yield ChatStreamEvent(
+                                    type=ChatStreamEventType.ERROR,
+                                    content="I encountered an error processing your request. Please try again."
+                                )
+                    except (GeneratorExit, asyncio.CancelledError):
+                        # The client went away mid-run; stop the run before the
+                        # session's thread is released, or its next message fails
+                        if run_id is None:
+                            run_id = await self._read_run_id(pending, handler, opened)
+                        if run_id is not None:
+                            await self._cancel_run(thread_id, run_id)
+                        raise
+                            
+        except Exception as e:
+            print(f"Error streaming message with Azure AI Foundry: {e}")
+            yield ChatStreamEvent(
+                type=ChatStreamEventType.ERROR,
+                content="I apologize, but I encountered an error processing your request."
+            )
+    
+    @staticmethod
+    def _chat_max_concurrent() -> int:
+        """The Foundry chat admission limit (see admission_controller), or 32 if chats are not limited."""
+        limit = int(os.getenv("FOUNDRY_CHAT_MAX_CONCURRENT") or os.getenv("CHAT_MAX_CONCURRENT", "8"))
+        return limit or 32
+    
+    def _in_stream_thread(self, fn, *args, **kwargs) -> asyncio.Future:
+        """Run a blocking call of a run stream on the stream readers, apart from the default executor."""
+        return asyncio.get_running_loop().run_in_executor(self.stream_executor, partial(fn, *args, **kwargs))
+    
+    async def _read_run_id(self, pending: asyncio.Future, handler: "_ManualToolEventHandler", opened: ExitStack) -> Optional[str]:
+        """
+        The ID of a run whose stream was given up before its first run event.
+        
+        Finishes the stream call in progress, then reads on until the run
+        event, which the service sends first; None if the stream fails first.
+        """
+        try:
+            item = await pending
+            if item is not None and not isinstance(item, tuple):
+                # The stream itself, still opening when the caller went away
+                handler = opened.enter_context(item)
+                item = await self._in_stream_thread(next, handler, None)
+            while item is not None:
+                if isinstance(item[1], ThreadRun):
+                    return item[1].id
+                item = await self._in_stream_thread(next, handler, None)
+        except Exception as e:
+            print(f"Failed to find the run of an abandoned stream: {e}")
+        return None
+    
+    async def _cancel_run(self, thread_id: str, run_id: str):
+        """Cancel a run and wait until it has stopped, logging rather than raising failures."""
+        agents = self.project_client.agents
+        try:
+            run = await asyncio.to_thread(agents.runs.cancel, thread_id=thread_id, run_id=run_id)
+            poll_interval = self.POLL_INITIAL_INTERVAL
+            while run.status in ["queued", "in_progress", "requires_action", "cancelling"]:
+                await asyncio.sleep(poll_interval)
+                poll_interval = min(poll_interval * self.POLL_BACKOFF, self.POLL_MAX_INTERVAL)
+                run = await asyncio.to_thread(agents.runs.get, thread_id=thread_id, run_id=run_id)
+            print(f"Cancelled run {run_id}: {run.status}")
+        except Exception as e:
+            print(f"Failed to cancel run {run_id}: {e}")
+    
+    async def _delete_threads(self, thread_ids: List[str]):
+        """Delete conversation threads on the service, logging rather than raising failures."""
+        async def delete(thread_id: str):
+            try:
+                await asyncio.to_thread(self.project_client.agents.threads.delete, thread_id)
+                print(f"Deleted thread: {thread_id}")
+            except Exception as e:
+                print(f"Failed to delete thread {thread_id}: {e}")
+        
+        await asyncio.gather(*(delete(thread_id) for thread_id in thread_ids))
+    
+    @asynccontextmanager
+    async def _session_thread(self, session_id: Optional[str]) -> AsyncIterator[str]:
+        """
+        Hold the session's thread for one run.
+        
+        A thread allows one active run at a time, so runs in the same session
+        wait for each other. Without a session ID the message gets a
+        throwaway thread, deleted after the run.
+        """
+        agents = self.project_client.agents
+        if session_id is None:
+            thread = await asyncio.to_thread(agents.threads.create)
+            try:
+                yield thread.id
+            finally:
+                await self._delete_threads([thread.id])
+            return
+        
+        async with self.sessions.get(session_id).hold() as session:
+            if session.thread_id is None:
+                thread = await asyncio.to_thread(agents.threads.create)
+                session.thread_id = thread.id
+                print(f"Created thread {thread.id} for session {session_id}")
+            yield session.thread_id
+        await self._delete_threads(self.sessions.evict())
+    
     async def cleanup(self):
-        """Cleanup method for session management (no-op for Azure AI Foundry)."""
-        # Azure AI Foundry handles cleanup automatically
-        pass
+        """Delete the conversation threads of every session and stop the stream readers."""
+        if self.project_client:
+            await self._delete_threads(self.sessions.clear())
+        self.stream_executor.shutdown(wait=False, cancel_futures=True)
 
     @classmethod
     async def create(cls, exit_stack: AsyncExitStack):
-        functionDics = await connect_to_server(exit_stack)
-        return cls(functionDics)
+        # The project's token is fetched while the MCP servers start
+        if os.getenv("AZURE_AI_FOUNDRY_PROJECT_ENDPOINT"):
+            shared_credential().prefetch(AI_PROJECT_SCOPE)
+        functionDics, tool_cache = await connect_to_server(exit_stack)
+        # Creating the Azure agent makes blocking SDK calls
+        return await asyncio.to_thread(cls, functionDics, tool_cache=tool_cache)
@@ -0,0 +1,59 @@
+import os
+import sys
+import anyio
+import importlib.util
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Tuple
+from mcp.shared.memory import create_client_server_memory_streams
+
+
+def load_fastmcp_server(path: str, attr: str = "mcp") -> Any:
+    """
+    Import a FastMCP server module from a file and return its server object.
+
+    The module is imported, not run, so its `if __name__ == "__main__"`
+    block does not start a transport.
+    """
+    path = os.path.abspath(path)
+    name = f"_mcp_server_{os.path.splitext(os.path.basename(path))[0]}"
+    if name in sys.modules:
+        return getattr(sys.modules[name], attr)
+
+    spec = importlib.util.spec_from_file_location(name, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load MCP server from {path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return getattr(module, attr)
+
+
+@asynccontextmanager
+async def inprocess_client(server: Any) -> AsyncIterator[Tuple[Any, Any]]:
+    """
+    Run an MCP server in this process and yield the client's (read, write) streams.
+
+    A drop-in for stdio_client: wrap the streams in a ClientSession as usual,
+    and the session goes through the same initialize handshake and messages,
+    over memory streams instead of a subprocess and its pipes.
+
+    - Works with mcp's FastMCP, the standalone fastmcp package, or a low-level Server
+    - Tools run on this event loop, so a tool that blocks stalls the app;
+      keep blocking servers on stdio
+    """
+    low_level = getattr(server, "_mcp_server", server)
+
+    async with create_client_server_memory_streams() as (client_streams, server_streams):
+        server_read, server_write = server_streams
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(
+                lambda: low_level.run(server_read, server_write, low_level.create_initialization_options())
+            )
+            try:
+                yield client_streams
+            finally:
+                tg.cancel_scope.cancel()
@@ -1,14 +1,19 @@
 import os
 import uuid
-from typing import Optional, Dict, Any
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Dict, Any
 from langchain_openai import AzureChatOpenAI
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
+from langchain_core.language_models import BaseChatModel
 from langgraph.prebuilt import create_react_agent
 from langgraph.checkpoint.memory import InMemorySaver
 from langchain_core.tools import tool
 from pydantic import BaseModel, Field
 from ..services import TaskService
-from ..models import ChatMessage, Role
+from ..models import ChatMessage, ChatStreamEvent, ChatStreamEventType, Role, TaskCreateRequest, TaskBatchUpdate
+from .session_threads import SessionThreads
+from .sqlite_checkpointer import SQLiteCheckpointer
+from .conversation_window import ConversationState, ConversationWindow
+from .credentials import COGNITIVE_SERVICES_SCOPE, async_bearer_token_provider, bearer_token_provider, shared_credential
 
 
 class CreateTaskInput(BaseModel):
@@ -16,6 +21,18 @@ class CreateTaskInput(BaseModel):
     isComplete: bool = Field(default=False, description="Whether the task is complete")
 
 
+class GetTasksInput(BaseModel):
+    afterId: Optional[int] = Field(default=None, description="Continuation cursor returned by a previous getTasks call")
+    limit: int = Field(default=20, ge=1, le=100, description="Maximum number of tasks to return")
+    isComplete: Optional[bool] = Field(default=None, description="Only return tasks with this completion status")
+    titleContains: Optional[str] = Field(default=None, description="Only return tasks whose title contains this text")
+
+
+class SearchTasksInput(BaseModel):
+    query: str = Field(description="Words to look for in task titles")
+    limit: int = Field(default=10, ge=1, le=50, description="Maximum number of matches to return")
+
+
 class GetTaskInput(BaseModel):
     id: int = Field(description="The ID of the task to retrieve")
 
@@ -30,6 +47,37 @@ class DeleteTaskInput(BaseModel):
     id: int = Field(description="The ID of the task to delete")
 
 
+class CreateTasksInput(BaseModel):
+    tasks: List[CreateTaskInput] = Field(description="The tasks to create")
+
+
+class UpdateTasksInput(BaseModel):
+    tasks: List[UpdateTaskInput] = Field(description="The task updates to apply")
+
+
+class DeleteTasksInput(BaseModel):
+    ids: List[int] = Field(description="The IDs of the tasks to delete")
+
+
+def azure_chat_model() -> Optional[AzureChatOpenAI]:
+    """The Azure OpenAI chat model configured by AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_DEPLOYMENT_NAME, if set."""
+    endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
+    deployment_name = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME")
+    if not endpoint or not deployment_name:
+        return None
+    
+    # The token is fetched while the app starts, not on the first chat request
+    credential = shared_credential()
+    credential.prefetch(COGNITIVE_SERVICES_SCOPE)
+    return AzureChatOpenAI(
+        azure_endpoint=endpoint,
+        azure_deployment=deployment_name,
+        azure_ad_token_provider=bearer_token_provider(credential, COGNITIVE_SERVICES_SCOPE),
+        azure_ad_async_token_provider=async_bearer_token_provider(credential, COGNITIVE_SERVICES_SCOPE),
+        api_version="2024-10-21"
+    )
+
+
 class LangGraphTaskAgent:
     """
     LangGraph-based agent for task management chat.
@@ -37,53 +85,86 @@ class LangGraphTaskAgent:
     This agent sets up:
     - Azure OpenAI client using environment variables
     - Pre-built ReAct agent with CRUD tools for task management
-    - Memory management for conversation state
+    - Memory management for conversation state, bounded per session
+    
+    Optional environment variables:
+    - LANGGRAPH_CHECKPOINTER: memory (default) or sqlite, to persist conversations
+      and sessions in checkpoints.db next to the tasks database, shared by workers
+    - LANGGRAPH_MAX_SESSIONS: Sessions to keep conversations for (default 1000)
+    - LANGGRAPH_SESSION_TTL_SECONDS: Idle time before a session's conversation is deleted (default 3600)
+    - LANGGRAPH_MAX_CHECKPOINTS_PER_THREAD: Checkpoints kept per conversation with sqlite (default 5)
+    - LANGGRAPH_COMPACTION_INTERVAL_SECONDS: Time between sqlite compactions (default 300)
+    - LANGGRAPH_HISTORY_MAX_TOKENS: Prompt budget for conversation history (default 4000, 0 sends it all)
+    - LANGGRAPH_HISTORY_SUMMARY: Summarize turns that leave the window (default true)
+    - LANGGRAPH_STALE_TOOL_OUTPUT_CHARS: Length earlier turns' tool outputs are cut to (default 200)
+    
+    An llm can be passed in instead, e.g. a scripted model for benchmarks.
     """
     
-    def __init__(self, task_service: TaskService):
+    def __init__(self, task_service: TaskService, llm: Optional[BaseChatModel] = None):
         self.task_service = task_service
         self.llm = None
         self.agent = None
-        self.memory = InMemorySaver()
-        self.session_ids: Dict[str, str] = {}
+        self.window: Optional[ConversationWindow] = None
+        max_sessions = int(os.getenv("LANGGRAPH_MAX_SESSIONS", "1000"))
+        session_ttl = float(os.getenv("LANGGRAPH_SESSION_TTL_SECONDS", "3600"))
+        # Runs of one session are serialized; in memory mode this also maps sessions to threads
+        self.sessions = SessionThreads(max_sessions=max_sessions, ttl=session_ttl)
+        
+        if os.getenv("LANGGRAPH_CHECKPOINTER", "memory").lower() == "sqlite":
+            db_dir = os.path.dirname(os.path.abspath(getattr(task_service, "db_path", "tasks.db")))
+            self.memory = SQLiteCheckpointer(
+                os.path.join(db_dir, "checkpoints.db"),
+                max_threads=max_sessions,
+                ttl=session_ttl,
+                max_checkpoints=int(os.getenv("LANGGRAPH_MAX_CHECKPOINTS_PER_THREAD", "5")),
+                compaction_interval=float(os.getenv("LANGGRAPH_COMPACTION_INTERVAL_SECONDS", "300"))
+            )
+        else:
+            self.memory = InMemorySaver()
         
         try:
-            endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
-            deployment_name = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME")
-            
-            if not endpoint or not deployment_name:
+            self.llm = llm if llm is not None else azure_chat_model()
+            if self.llm is None:
                 print("Azure OpenAI configuration missing for LangGraph agent")
                 return
             
-            # Initialize Azure OpenAI client
-            credential = DefaultAzureCredential()
-            azure_ad_token_provider = get_bearer_token_provider(
-                credential, "https://cognitiveservices.azure.com/.default"
-            )
-            
-            self.llm = AzureChatOpenAI(
-                azure_endpoint=endpoint,
-                azure_deployment=deployment_name,
-                azure_ad_token_provider=azure_ad_token_provider,
-                api_version="2024-10-21"
-            )
-            
-            # Define tools
-            tools = [
-                self._create_task_tool(),
-                self._get_tasks_tool(),
-                self._get_task_tool(),
-                self._update_task_tool(),
-                self._delete_task_tool()
-            ]
-            
-            # Create the agent
-            self.agent = create_react_agent(self.llm, tools, checkpointer=self.memory)
+            # Create the agent, sending the model a bounded window of long conversations
+            history_max_tokens = int(os.getenv("LANGGRAPH_HISTORY_MAX_TOKENS", "4000"))
+            if history_max_tokens:
+                self.window = ConversationWindow(
+                    max_tokens=history_max_tokens,
+                    summarizer=self.llm if os.getenv("LANGGRAPH_HISTORY_SUMMARY", "true").lower() == "true" else None,
+                    stale_tool_chars=int(os.getenv("LANGGRAPH_STALE_TOOL_OUTPUT_CHARS", "200"))
+                )
+                self.agent = create_react_agent(
+                    self.llm,
+                    self._tools(),
+                    checkpointer=self.memory,
+                    pre_model_hook=self.window.pre_model_hook,
+                    state_schema=ConversationState
+                )
+            else:
+                self.agent = create_react_agent(self.llm, self._tools(), checkpointer=self.memory)
             print("LangGraph Task Agent initialized successfully")
             
         except Exception as e:
             print(f"Failed to initialize LangGraph agent: {e}")
     
+    def _tools(self):
+        """The task management tools given to the model."""
+        return [
+            self._create_task_tool(),
+            self._get_tasks_tool(),
+            self._search_tasks_tool(),
+            self._get_task_tool(),
+            self._update_task_tool(),
+            self._delete_task_tool(),
+            self._create_tasks_tool(),
+            self._update_tasks_tool(),
+            self._delete_tasks_tool()
+        ]
+    
     def _create_task_tool(self):
         @tool("createTask", args_schema=CreateTaskInput)
         async def create_task(title: str, isComplete: bool = False) -> str:
@@ -94,21 +175,45 @@ class LangGraphTaskAgent:
         return create_task
     
     def _get_tasks_tool(self):
-        @tool("getTasks")
-        async def get_tasks() -> str:
-            """Get all tasks"""
-            tasks = await self.task_service.get_all_tasks()
-            if not tasks:
+        @tool("getTasks", args_schema=GetTasksInput)
+        async def get_tasks(
+            afterId: Optional[int] = None,
+            limit: int = 20,
+            isComplete: Optional[bool] = None,
+            titleContains: Optional[str] = None
+        ) -> str:
+            """Get tasks one page at a time, optionally filtered by status or title"""
+            page = await self.task_service.get_tasks_page(afterId, limit, isComplete, titleContains)
+            if not page.items:
                 return 'No tasks found.'
             
             task_list = '\n'.join([
                 f'- {t.id}: {t.title} ({"Complete" if t.isComplete else "Incomplete"})'
-                for t in tasks
+                for t in page.items
             ])
-            return f'Found {len(tasks)} tasks:\n{task_list}'
+            result = f'Found {len(page.items)} tasks:\n{task_list}'
+            if page.nextAfterId is not None:
+                result += f'\nMore tasks available. Call getTasks with afterId={page.nextAfterId} to continue.'
+            return result
         
         return get_tasks
     
+    def _search_tasks_tool(self):
+        @tool("searchTasks", args_schema=SearchTasksInput)
+        async def search_tasks(query: str, limit: int = 10) -> str:
+            """Find tasks by words in their title. Prefer this over listing every task with getTasks."""
+            tasks = await self.task_service.search_tasks(query, limit)
+            if not tasks:
+                return f'No tasks match "{query}".'
+            
+            task_list = '\n'.join([
+                f'- {t.id}: {t.title} ({"Complete" if t.isComplete else "Incomplete"})'
+                for t in tasks
+            ])
+            return f'Found {len(tasks)} matching tasks:\n{task_list}'
+        
+        return search_tasks
+    
     def _get_task_tool(self):
         @tool("getTask", args_schema=GetTaskInput)
         async def get_task(id: int) -> str:
@@ -144,6 +249,82 @@ class LangGraphTaskAgent:
         
         return delete_task
     
+    def _create_tasks_tool(self):
+        @tool("createTasks", args_schema=CreateTasksInput)
+        async def create_tasks(tasks: List[CreateTaskInput]) -> str:
+            """Create several tasks at once. Prefer this over repeated createTask calls."""
+            created = await self.task_service.add_tasks([
+                TaskCreateRequest(title=t.title, isComplete=t.isComplete) for t in tasks
+            ])
+            task_list = '\n'.join([f'- {t.id}: {t.title}' for t in created])
+            return f'Created {len(created)} tasks:\n{task_list}'
+        
+        return create_tasks
+    
+    def _update_tasks_tool(self):
+        @tool("updateTasks", args_schema=UpdateTasksInput)
+        async def update_tasks(tasks: List[UpdateTaskInput]) -> str:
+            """Update several tasks at once. Prefer this over repeated updateTask calls."""
+            updated = await self.task_service.update_tasks([
+                TaskBatchUpdate(id=t.id, title=t.title, isComplete=t.isComplete) for t in tasks
+            ])
+            missing = [t.id for t in tasks if t.id not in updated]
+            result = f'Updated {len(updated)} tasks.'
+            if missing:
+                result += f' Not found: {", ".join(map(str, missing))}.'
+            return result
+        
+        return update_tasks
+    
+    def _delete_tasks_tool(self):
+        @tool("deleteTasks", args_schema=DeleteTasksInput)
+        async def delete_tasks(ids: List[int]) -> str:
+            """Delete several tasks at once. Prefer this over repeated deleteTask calls."""
+            deleted = await self.task_service.delete_tasks(ids)
+            missing = [i for i in ids if i not in deleted]
+            result = f'Deleted {len(deleted)} tasks.'
+            if missing:
+                result += f' Not found: {", ".join(map(str, missing))}.'
+            return result
+        
+        return delete_tasks
+    
+    @asynccontextmanager
+    async def _thread_config(self, session_id: Optional[str]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Hold the session's conversation thread for one turn and yield its agent config.
+        
+        Turns in the same session wait for each other. Without a session ID
+        the message gets a throwaway thread, deleted after the turn.
+        """
+        if not session_id:
+            thread_id = str(uuid.uuid4())
+            try:
+                yield {"configurable": {"thread_id": thread_id}}
+            finally:
+                await self.memory.adelete_thread(thread_id)
+            return
+        
+        persistent = isinstance(self.memory, SQLiteCheckpointer)
+        async with self.sessions.get(session_id).hold() as session:
+            if persistent:
+                # The session map lives in the database, where other workers see it
+                session.thread_id = await self.memory.thread_for_session(session_id)
+            elif session.thread_id is None:
+                session.thread_id = str(uuid.uuid4())
+            yield {"configurable": {"thread_id": session.thread_id}}
+        
+        evicted = self.sessions.evict()
+        if not persistent:
+            # The database prunes its own threads; in memory they go with their session
+            for thread_id in evicted:
+                await self.memory.adelete_thread(thread_id)
+    
+    async def aclose(self):
+        """Stop background compaction and close the checkpoint database, if any."""
+        if isinstance(self.memory, SQLiteCheckpointer):
+            await self.memory.aclose()
+    
     async def process_message(self, message: str, session_id: Optional[str] = None) -> ChatMessage:
         """
         Process a user message and return the assistant's response.
@@ -162,23 +343,12 @@ class LangGraphTaskAgent:
             )
         
         try:
-            # Use provided session_id or generate a new one
-            if session_id:
-                thread_id = self.session_ids.get(session_id)
-                if not thread_id:
-                    thread_id = str(uuid.uuid4())
-                    self.session_ids[session_id] = thread_id
-            else:
-                thread_id = str(uuid.uuid4())
-            
-            # Create config for the agent
-            config = {"configurable": {"thread_id": thread_id}}
-            
             # Process the message
-            result = await self.agent.ainvoke(
-                {"messages": [("user", message)]},
-                config=config
-            )
+            async with self._thread_config(session_id) as config:
+                result = await self.agent.ainvoke(
+                    {"messages": [("user", message)]},
+                    config=config
+                )
             
             # Extract the assistant's response
             assistant_messages = [
@@ -202,3 +372,54 @@ class LangGraphTaskAgent:
                 role=Role.ASSISTANT,
                 content="I apologize, but I encountered an error processing your request."
             )
+    
+    async def stream_message(self, message: str, session_id: Optional[str] = None) -> AsyncIterator[ChatStreamEvent]:
+        """
+        Process a user message, yielding model tokens and tool progress as they happen.
+        
+        Args:
+            message: The user's message
+            session_id: Optional session ID for conversation continuity
+            
+        Yields:
+            TOKEN, TOOL_START and TOOL_END events, or a single ERROR event
+        """
+        if not self.agent:
+            yield ChatStreamEvent(
+                type=ChatStreamEventType.ERROR,
+                content="LangGraph agent is not properly configured. Please check your Azure OpenAI settings."
+            )
+            return
+        
+        try:
+            async with self._thread_config(session_id) as config:
+                events = self.agent.astream_events(
+                    {"messages": [("user", message)]},
+                    config=config,
+                    version="v2"
+                )
+                async for event in events:
+                    kind = event["event"]
+                    if kind == "on_chat_model_stream":
+                        # Only the reply; summarizing history also streams from a model
+                        if event["metadata"].get("langgraph_node") != "agent":
+                            continue
+                        # Chunks that only carry tool-call arguments have no text
+                        text = event["data"]["chunk"].content
+                        if text:
+                            yield ChatStreamEvent(type=ChatStreamEventType.TOKEN, content=text)
+                    elif kind == "on_tool_start":
+                        yield ChatStreamEvent(type=ChatStreamEventType.TOOL_START, tool=event["name"])
+                    elif kind == "on_tool_end":
+                        output = event["data"].get("output")
+                        yield ChatStreamEvent(
+                            type=ChatStreamEventType.TOOL_END,
+                            tool=event["name"],
+                            content=str(getattr(output, "content", output))
+                        )
+        except Exception as e:
+            print(f"Error streaming message with LangGraph agent: {e}")
+            yield ChatStreamEvent(
+                type=ChatStreamEventType.ERROR,
+                content="I apologize, but I encountered an error processing your request."
+            )
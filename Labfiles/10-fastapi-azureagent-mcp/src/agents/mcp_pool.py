@@ -0,0 +1,202 @@
+import asyncio
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Union
+from mcp import ClientSession, StdioServerParameters
+from mcp.types import CallToolResult, ListToolsResult
+from mcp.client.stdio import stdio_client
+from .inprocess_mcp import inprocess_client
+
+
+class _PooledSession:
+    """
+    One MCP server and its client session.
+
+    The stdio transport and session are entered and exited inside one
+    long-lived task, as anyio requires, so a session can be respawned from
+    any request without tearing down the others.
+    """
+
+    def __init__(self, index: int, server: Union[StdioServerParameters, Any], call_timeout: float):
+        self.index = index
+        self.server = server
+        self.call_timeout = call_timeout
+        self.session: Optional[ClientSession] = None
+        self.in_flight = 0
+        self.calls = 0
+        self.restarts = 0
+        self.healthy = False
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+
+    async def start(self):
+        self._ready.clear()
+        self._stop.clear()
+        self._error = None
+        self._task = asyncio.create_task(self._run(), name=f"mcp-session-{self.index}")
+        await self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    async def _run(self):
+        try:
+            if isinstance(self.server, StdioServerParameters):
+                transport = stdio_client(self.server)
+            else:
+                transport = inprocess_client(self.server)
+            async with transport as (read, write):
+                async with ClientSession(read, write, read_timeout_seconds=timedelta(seconds=self.call_timeout)) as session:
+                    await session.initialize()
+                    self.session = session
+                    self.healthy = True
+                    self._ready.set()
+                    await self._stop.wait()
+        except BaseException as e:
+            self._error = e
+            if not isinstance(e, asyncio.CancelledError):
+                print(f"MCP session {self.index} ended: {e!r}")
+        finally:
+            self.healthy = False
+            self.session = None
+            self._ready.set()
+
+    async def stop(self):
+        self.healthy = False
+        self._stop.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout=5)
+            except (asyncio.TimeoutError, Exception):
+                self._task.cancel()
+            self._task = None
+
+    async def restart(self):
+        await self.stop()
+        self.restarts += 1
+        await self.start()
+
+
+class MCPSessionPool:
+    """
+    Pool of MCP client sessions, each to its own server process.
+
+    The server is either StdioServerParameters, to spawn processes, or a
+    FastMCP server object to run in this process (see inprocess_client).
+
+    - Tool calls go to the healthy session with the fewest calls in flight
+    - A health check pings every session periodically and respawns the ones
+      that crashed or stopped answering
+    - A call that fails with a transport error marks its session unhealthy
+      and respawns it; the error is still raised, since the call may or may
+      not have run
+
+    Register aclose() on the owning AsyncExitStack so the server processes
+    stop with the app.
+    """
+
+    def __init__(
+        self,
+        server: Union[StdioServerParameters, Any],
+        size: int = 2,
+        health_interval: float = 30.0,
+        call_timeout: float = 60.0
+    ):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self.health_interval = health_interval
+        self._sessions = [_PooledSession(i, server, call_timeout) for i in range(size)]
+        self._health_task: Optional[asyncio.Task] = None
+        self._respawning: Dict[int, asyncio.Task] = {}
+
+    async def start(self):
+        """Start every server process, then the health check."""
+        await asyncio.gather(*(s.start() for s in self._sessions))
+        if self.health_interval:
+            self._health_task = asyncio.create_task(self._health_loop(), name="mcp-pool-health")
+
+    async def aclose(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+        await asyncio.gather(*self._respawning.values(), return_exceptions=True)
+        await asyncio.gather(*(s.stop() for s in self._sessions))
+
+    def _respawn(self, pooled: _PooledSession):
+        """Restart a session in the background, once at a time."""
+        pooled.healthy = False
+        if pooled.index in self._respawning:
+            return
+
+        async def respawn():
+            try:
+                print(f"Respawning MCP session {pooled.index}")
+                await pooled.restart()
+            except Exception as e:
+                print(f"Failed to respawn MCP session {pooled.index}: {e!r}")
+            finally:
+                del self._respawning[pooled.index]
+
+        self._respawning[pooled.index] = asyncio.create_task(respawn())
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await self.check_health()
+
+    async def check_health(self):
+        """Ping every session and respawn those that are down or do not answer."""
+        async def check(pooled: _PooledSession):
+            if pooled.index in self._respawning:
+                return
+            try:
+                if pooled.session is None:
+                    raise RuntimeError("session is not running")
+                await asyncio.wait_for(pooled.session.send_ping(), timeout=5)
+            except Exception as e:
+                print(f"MCP session {pooled.index} failed its health check: {e!r}")
+                self._respawn(pooled)
+
+        await asyncio.gather(*(check(s) for s in self._sessions))
+
+    async def _acquire(self) -> _PooledSession:
+        healthy = [s for s in self._sessions if s.healthy]
+        if not healthy:
+            # Everything is down; wait for the respawns in progress, or start them
+            for pooled in self._sessions:
+                self._respawn(pooled)
+            await asyncio.gather(*self._respawning.values(), return_exceptions=True)
+            healthy = [s for s in self._sessions if s.healthy]
+            if not healthy:
+                raise RuntimeError("No MCP server session is available")
+        return min(healthy, key=lambda s: s.in_flight)
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> CallToolResult:
+        pooled = await self._acquire()
+        pooled.in_flight += 1
+        pooled.calls += 1
+        try:
+            return await pooled.session.call_tool(name, arguments)
+        except Exception as e:
+            # Errors reported by the tool come back as results; exceptions mean the transport broke
+            print(f"MCP session {pooled.index} failed calling {name}: {e!r}")
+            self._respawn(pooled)
+            raise
+        finally:
+            pooled.in_flight -= 1
+
+    async def list_tools(self) -> ListToolsResult:
+        pooled = await self._acquire()
+        return await pooled.session.list_tools()
+
+    def stats(self) -> List[dict]:
+        return [
+            {
+                "index": s.index,
+                "healthy": s.healthy,
+                "inFlight": s.in_flight,
+                "calls": s.calls,
+                "restarts": s.restarts,
+            }
+            for s in self._sessions
+        ]
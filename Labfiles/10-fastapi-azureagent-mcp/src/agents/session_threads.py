@@ -0,0 +1,85 @@
+import time
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+
+class SessionThread:
+    """A chat session's conversation thread, and the lock that serializes its runs."""
+
+    def __init__(self):
+        self.thread_id: Optional[str] = None
+        self.last_used = time.monotonic()
+        # Callers holding or waiting for the lock; the session is not idle until it drops to 0
+        self.users = 0
+        self._lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def hold(self) -> AsyncIterator["SessionThread"]:
+        """Wait for the session's previous run to finish, then hold it for one run."""
+        self.users += 1
+        try:
+            async with self._lock:
+                yield self
+        finally:
+            self.users -= 1
+            self.last_used = time.monotonic()
+
+
+class SessionThreads:
+    """
+    Bounded map of chat session IDs to agent conversation threads.
+
+    Sessions are kept in least-recently-used order:
+    - At most max_sessions are kept; the least recently used go first
+    - Sessions idle for longer than ttl seconds expire
+    - Sessions with a run in progress or waiting are never evicted
+
+    evict() returns the thread IDs it dropped so the caller can delete them
+    on the service.
+    """
+
+    def __init__(self, max_sessions: int = 1000, ttl: float = 3600.0):
+        if max_sessions < 1:
+            raise ValueError("max_sessions must be at least 1")
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: "OrderedDict[str, SessionThread]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> SessionThread:
+        """Return the session's entry, creating it if needed, and mark it most recently used."""
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = SessionThread()
+        else:
+            self._sessions.move_to_end(session_id)
+        session.last_used = time.monotonic()
+        return session
+
+    def evict(self) -> List[str]:
+        """Drop expired and excess idle sessions; returns the thread IDs they held."""
+        now = time.monotonic()
+        excess = len(self._sessions) - self.max_sessions
+        evicted = []
+        # Oldest first, so excess sessions are the least recently used ones
+        for session_id, session in list(self._sessions.items()):
+            expired = now - session.last_used > self.ttl
+            if not expired and excess <= 0:
+                break
+            if session.users:
+                continue
+            del self._sessions[session_id]
+            excess -= 1
+            if session.thread_id:
+                evicted.append(session.thread_id)
+        return evicted
+
+    def clear(self) -> List[str]:
+        """Drop every session; returns the thread IDs they held."""
+        thread_ids = [s.thread_id for s in self._sessions.values() if s.thread_id]
+        self._sessions.clear()
+        return thread_ids
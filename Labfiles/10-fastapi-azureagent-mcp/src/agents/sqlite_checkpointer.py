@@ -0,0 +1,325 @@
+import time
+import uuid
+import asyncio
+import sqlite3
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from ..services.sqlite_engine import SQLiteEngine
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoint_threads (
+    thread_id TEXT PRIMARY KEY,
+    session_id TEXT UNIQUE,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_checkpoint_threads_last_used ON checkpoint_threads (last_used);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS checkpoint_writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value BLOB NOT NULL,
+    task_path TEXT NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+
+class SQLiteCheckpointer(BaseCheckpointSaver[int]):
+    """
+    LangGraph checkpointer persisted in SQLite, with bounded growth.
+
+    Conversation state and the session-to-thread map survive restarts and
+    are shared by every worker using the same database file:
+    - Threads idle for longer than ttl seconds are deleted
+    - Beyond max_threads, the least recently used threads are deleted
+    - Each thread keeps only its newest max_checkpoints checkpoints
+    - A background job applies these limits every compaction_interval seconds
+
+    Only the async checkpointer methods are implemented; the agent uses
+    ainvoke and astream_events.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        max_threads: int = 1000,
+        ttl: float = 3600.0,
+        max_checkpoints: int = 5,
+        compaction_interval: float = 300.0,
+        serde=None
+    ):
+        if max_threads < 1:
+            raise ValueError("max_threads must be at least 1")
+        if max_checkpoints < 1:
+            raise ValueError("max_checkpoints must be at least 1")
+        super().__init__(serde=serde)
+        self.max_threads = max_threads
+        self.ttl = ttl
+        self.max_checkpoints = max_checkpoints
+        self.compaction_interval = compaction_interval
+        self.threads_pruned = 0
+        self.checkpoints_trimmed = 0
+        self._compaction_task: Optional[asyncio.Task] = None
+
+        self.engine = SQLiteEngine(db_path, readers=2)
+        self.engine.write_sync(lambda conn: conn.executescript(SCHEMA))
+
+    def _start_compaction(self):
+        """Start the background compaction job, once, from inside the running loop."""
+        if self._compaction_task is None and self.compaction_interval:
+            self._compaction_task = asyncio.create_task(self._compaction_loop(), name="checkpoint-compaction")
+
+    async def _compaction_loop(self):
+        while True:
+            await asyncio.sleep(self.compaction_interval)
+            try:
+                await self.compact()
+            except Exception as e:
+                print(f"Checkpoint compaction failed: {e}")
+
+    async def thread_for_session(self, session_id: str) -> str:
+        """The session's thread ID, creating the mapping on first use."""
+        self._start_compaction()
+        new_thread_id = str(uuid.uuid4())
+
+        def lookup(conn: sqlite3.Connection) -> str:
+            conn.execute(
+                "INSERT INTO checkpoint_threads (thread_id, session_id, last_used) VALUES (?, ?, ?) "
+                "ON CONFLICT (session_id) DO UPDATE SET last_used = excluded.last_used",
+                (new_thread_id, session_id, time.time())
+            )
+            return conn.execute(
+                "SELECT thread_id FROM checkpoint_threads WHERE session_id = ?", (session_id,)
+            ).fetchone()[0]
+
+        return await self.engine.write(lookup)
+
+    def _row_to_tuple(self, conn: sqlite3.Connection, row: tuple) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_id, type_, checkpoint, metadata_type, metadata = row
+        writes = conn.execute(
+            "SELECT task_id, channel, type, value FROM checkpoint_writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id)
+        ).fetchall()
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            checkpoint=self.serde.loads_typed((type_, checkpoint)),
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id}}
+                if parent_id
+                else None
+            ),
+            pending_writes=[(task_id, channel, self.serde.loads_typed((t, v))) for task_id, channel, t, v in writes],
+        )
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+
+        def get(conn: sqlite3.Connection) -> Optional[CheckpointTuple]:
+            query = "SELECT * FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+            params: List[Any] = [thread_id, checkpoint_ns]
+            if checkpoint_id:
+                query += " AND checkpoint_id = ?"
+                params.append(checkpoint_id)
+            row = conn.execute(query + " ORDER BY checkpoint_id DESC LIMIT 1", params).fetchone()
+            return self._row_to_tuple(conn, row) if row else None
+
+        return await self.engine.read(get)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[CheckpointTuple]:
+        query = "SELECT * FROM checkpoints WHERE 1 = 1"
+        params: List[Any] = []
+        if config:
+            query += " AND thread_id = ?"
+            params.append(config["configurable"]["thread_id"])
+            if config["configurable"].get("checkpoint_ns") is not None:
+                query += " AND checkpoint_ns = ?"
+                params.append(config["configurable"]["checkpoint_ns"])
+            if checkpoint_id := get_checkpoint_id(config):
+                query += " AND checkpoint_id = ?"
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            query += " AND checkpoint_id < ?"
+            params.append(before_id)
+        query += " ORDER BY checkpoint_id DESC"
+
+        def list_tuples(conn: sqlite3.Connection) -> List[CheckpointTuple]:
+            tuples = []
+            for row in conn.execute(query, params).fetchall():
+                if limit is not None and len(tuples) >= limit:
+                    break
+                item = self._row_to_tuple(conn, row)
+                # Metadata is serialized, so filters are applied here
+                if filter and not all(item.metadata.get(k) == v for k, v in filter.items()):
+                    continue
+                tuples.append(item)
+            return tuples
+
+        for item in await self.engine.read(list_tuples):
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        self._start_compaction()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        type_, serialized = self.serde.dumps_typed(checkpoint)
+        metadata_type, serialized_metadata = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+
+        def put(conn: sqlite3.Connection):
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                    type_, serialized, metadata_type, serialized_metadata
+                )
+            )
+            conn.execute(
+                "INSERT INTO checkpoint_threads (thread_id, last_used) VALUES (?, ?) "
+                "ON CONFLICT (thread_id) DO UPDATE SET last_used = excluded.last_used",
+                (thread_id, time.time())
+            )
+
+        await self.engine.write(put)
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, serialized = self.serde.dumps_typed(value)
+            rows.append((thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, idx), channel, type_, serialized, task_path))
+        # Special writes (negative idx) replace earlier ones; regular writes are kept once
+        regular = [row for row in rows if row[4] >= 0]
+        special = [row for row in rows if row[4] < 0]
+
+        def put_writes(conn: sqlite3.Connection):
+            conn.executemany("INSERT OR IGNORE INTO checkpoint_writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", regular)
+            conn.executemany("INSERT OR REPLACE INTO checkpoint_writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", special)
+
+        await self.engine.write(put_writes)
+
+    @staticmethod
+    def _delete_threads(conn: sqlite3.Connection, thread_ids: List[str]):
+        rows = [(thread_id,) for thread_id in thread_ids]
+        conn.executemany("DELETE FROM checkpoint_writes WHERE thread_id = ?", rows)
+        conn.executemany("DELETE FROM checkpoints WHERE thread_id = ?", rows)
+        conn.executemany("DELETE FROM checkpoint_threads WHERE thread_id = ?", rows)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self.engine.write(lambda conn: self._delete_threads(conn, [thread_id]))
+
+    async def compact(self) -> dict:
+        """Delete idle and excess threads and trim old checkpoints; returns what was removed."""
+        expires = time.time() - self.ttl
+
+        def compact_tables(conn: sqlite3.Connection) -> dict:
+            expired = conn.execute(
+                "SELECT thread_id FROM checkpoint_threads WHERE last_used < ?", (expires,)
+            ).fetchall()
+            excess = conn.execute(
+                "SELECT thread_id FROM checkpoint_threads WHERE last_used >= ? "
+                "ORDER BY last_used DESC LIMIT -1 OFFSET ?",
+                (expires, self.max_threads)
+            ).fetchall()
+            thread_ids = [row[0] for row in expired + excess]
+            self._delete_threads(conn, thread_ids)
+
+            trimmed = conn.execute(
+                "DELETE FROM checkpoints WHERE rowid IN ("
+                " SELECT rowid FROM ("
+                "  SELECT rowid, ROW_NUMBER() OVER ("
+                "   PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC"
+                "  ) AS position FROM checkpoints"
+                " ) WHERE position > ?"
+                ")",
+                (self.max_checkpoints,)
+            ).rowcount
+            conn.execute(
+                "DELETE FROM checkpoint_writes WHERE NOT EXISTS ("
+                " SELECT 1 FROM checkpoints c WHERE c.thread_id = checkpoint_writes.thread_id"
+                " AND c.checkpoint_ns = checkpoint_writes.checkpoint_ns"
+                " AND c.checkpoint_id = checkpoint_writes.checkpoint_id"
+                ")"
+            )
+            return {"threadsPruned": len(thread_ids), "checkpointsTrimmed": trimmed}
+
+        result = await self.engine.write(compact_tables)
+        # Give the space back to the main file, so the WAL does not keep growing
+        await self.engine.write(lambda conn: conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall())
+        self.threads_pruned += result["threadsPruned"]
+        self.checkpoints_trimmed += result["checkpointsTrimmed"]
+        return result
+
+    async def stats(self) -> dict:
+        def count(conn: sqlite3.Connection) -> dict:
+            threads, sessions = conn.execute(
+                "SELECT COUNT(*), COUNT(session_id) FROM checkpoint_threads"
+            ).fetchone()
+            checkpoints = conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+            return {"threads": threads, "sessions": sessions, "checkpoints": checkpoints}
+
+        stats = await self.engine.read(count)
+        stats.update({
+            "maxThreads": self.max_threads,
+            "ttlSeconds": self.ttl,
+            "maxCheckpoints": self.max_checkpoints,
+            "threadsPruned": self.threads_pruned,
+            "checkpointsTrimmed": self.checkpoints_trimmed,
+        })
+        return stats
+
+    async def aclose(self):
+        if self._compaction_task is not None:
+            self._compaction_task.cancel()
+            await asyncio.gather(self._compaction_task, return_exceptions=True)
+            self._compaction_task = None
+        await asyncio.to_thread(self.engine.close)
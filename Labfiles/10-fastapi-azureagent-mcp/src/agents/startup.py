@@ -0,0 +1,76 @@
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class AgentStartup:
+    """
+    Starts the chat agents concurrently in the background, so the app can
+    serve task routes while they load.
+
+    Each agent is "starting", then "ready" or "failed"; a failure is kept
+    with its agent instead of stopping the app. Startup is ready once every
+    agent has finished, either way.
+    """
+
+    def __init__(self):
+        self.agents: Dict[str, Any] = {}
+        self.status: Dict[str, str] = {}
+        self.errors: Dict[str, str] = {}
+        self.seconds: Dict[str, float] = {}
+        self.task: Optional[asyncio.Task] = None
+        self.created = time.perf_counter()
+        self.ready_after: Optional[float] = None
+
+    def start(self, builders: Dict[str, Callable[[], Awaitable[Any]]]):
+        """Run each agent's builder concurrently, in a background task."""
+        for name in builders:
+            self.status[name] = "starting"
+        self.task = asyncio.create_task(self._start_all(builders))
+
+    async def _start_all(self, builders: Dict[str, Callable[[], Awaitable[Any]]]):
+        await asyncio.gather(*(self._start(name, build) for name, build in builders.items()))
+        self.ready_after = time.perf_counter() - self.created
+        print(f"Agents started in {self.ready_after:.2f}s: {self.status}")
+
+    async def _start(self, name: str, build: Callable[[], Awaitable[Any]]):
+        start = time.perf_counter()
+        try:
+            self.agents[name] = await build()
+            self.status[name] = "ready"
+        except Exception as e:
+            print(f"Failed to start {name} agent: {e}")
+            self.status[name] = "failed"
+            self.errors[name] = str(e)
+        self.seconds[name] = time.perf_counter() - start
+
+    def get(self, name: str) -> Optional[Any]:
+        """The agent if it has started, else None."""
+        return self.agents.get(name)
+
+    @property
+    def ready(self) -> bool:
+        return self.task is not None and self.task.done()
+
+    def report(self) -> dict:
+        return {
+            "status": "ready" if self.ready else "starting",
+            "readyAfterSeconds": round(self.ready_after, 3) if self.ready_after is not None else None,
+            "agents": {
+                name: {
+                    "status": status,
+                    "seconds": round(self.seconds[name], 3) if name in self.seconds else None,
+                    **({"error": self.errors[name]} if name in self.errors else {}),
+                }
+                for name, status in self.status.items()
+            },
+        }
+
+    async def aclose(self):
+        """Stop agents that are still starting."""
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
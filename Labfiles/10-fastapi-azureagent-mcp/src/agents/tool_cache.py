@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import asyncio
+import functools
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class _LeaderCancelled(Exception):
+    """The caller making a shared in-flight request was cancelled before it finished."""
+
+
+class ToolResultCache:
+    """
+    Size-bounded TTL cache of MCP tool results, keyed by tool name and arguments.
+
+    Only tools wrapped with a TTL are cached, which should be pure reads:
+    - Arguments are canonicalized as sorted JSON, so argument order does not matter
+    - Least recently used entries are evicted beyond max_entries
+    - Concurrent identical calls share one in-flight request; if its caller
+      is cancelled, one of the others makes the request again
+    - Error results are never stored
+    """
+
+    def __init__(self, max_entries: int = 256):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key -> (expiry on the monotonic clock, result)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._ttls: Dict[str, float] = {}
+
+    def wrap(
+        self,
+        tool_name: str,
+        func: Callable[..., Awaitable[Any]],
+        ttl: Optional[float]
+    ) -> Callable[..., Awaitable[Any]]:
+        """Return func with its results cached for ttl seconds; func itself when ttl is None."""
+        if not ttl:
+            return func
+        self._ttls[tool_name] = ttl
+
+        @functools.wraps(func)
+        async def cached(**kwargs):
+            key = (tool_name, json.dumps(kwargs, sort_keys=True, separators=(",", ":"), default=str))
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            while key in self._in_flight:
+                self.hits += 1
+                try:
+                    return await asyncio.shield(self._in_flight[key])
+                except _LeaderCancelled:
+                    # The first caller to get here makes the request instead
+                    self.hits -= 1
+
+            self.misses += 1
+            future = asyncio.get_running_loop().create_future()
+            self._in_flight[key] = future
+            try:
+                result = await func(**kwargs)
+            except asyncio.CancelledError:
+                # Cancelling the future would cancel every caller sharing it
+                future.set_exception(_LeaderCancelled())
+                future.exception()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                # Nobody may be waiting; mark the exception as retrieved
+                future.exception()
+                raise
+            else:
+                future.set_result(result)
+                if not getattr(result, "isError", False):
+                    self._store(key, time.monotonic() + ttl, result)
+                return result
+            finally:
+                del self._in_flight[key]
+
+        return cached
+
+    def _store(self, key: Tuple[str, str], expires: float, result: Any):
+        self._entries[key] = (expires, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+            "maxEntries": self.max_entries,
+            "evictions": self.evictions,
+            "ttls": dict(self._ttls),
+        }
+
+
+def tool_cache_ttls(tools: List[Any]) -> Dict[str, float]:
+    """
+    Per-tool cache TTLs in seconds, from the environment and tool annotations.
+
+    - MCP_TOOL_CACHE_TTLS: Comma-separated name=seconds pairs; 0 disables caching for a tool
+    - MCP_TOOL_CACHE_DEFAULT_TTL: TTL for other tools annotated readOnlyHint (default 30, 0 to disable)
+    """
+    default_ttl = float(os.getenv("MCP_TOOL_CACHE_DEFAULT_TTL", "30"))
+    ttls = {}
+    for tool in tools:
+        annotations = getattr(tool, "annotations", None)
+        if default_ttl and annotations is not None and annotations.readOnlyHint:
+            ttls[tool.name] = default_ttl
+
+    for pair in filter(None, os.getenv("MCP_TOOL_CACHE_TTLS", "").split(",")):
+        name, _, seconds = pair.partition("=")
+        ttls[name.strip()] = float(seconds)
+    return {name: ttl for name, ttl in ttls.items() if ttl > 0}
@@ -0,0 +1,29 @@
+import json
+import asyncio
+from typing import Any, Awaitable, Callable, List
+
+
+async def dispatch_tool_calls(
+    tool_calls: List[Any],
+    run_tool_call: Callable[[Any], Awaitable[dict]],
+    limit: asyncio.Semaphore
+) -> List[dict]:
+    """
+    Run the tool calls of one run step concurrently and return their tool outputs.
+
+    - At most `limit` calls run at once, across every caller sharing the semaphore
+    - Outputs keep the order of tool_calls
+    - A failing call becomes an error output for that call only
+    """
+    async def run_one(tool_call) -> dict:
+        async with limit:
+            try:
+                return await run_tool_call(tool_call)
+            except Exception as e:
+                print(f"Tool call {tool_call.function.name} failed: {e}")
+                return {
+                    "tool_call_id": tool_call.id,
+                    "output": json.dumps({"error": str(e)}),
+                }
+
+    return list(await asyncio.gather(*(run_one(tool_call) for tool_call in tool_calls)))
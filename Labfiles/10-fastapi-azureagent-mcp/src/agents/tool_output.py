@@ -0,0 +1,176 @@
+import os
+import json
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Rough size of a token in UTF-8 bytes, for English text and JSON
+BYTES_PER_TOKEN = 4
+
+# Steps tried in turn on JSON over budget: (items kept per list or object, characters kept per string)
+_COMPACTION_LEVELS: List[Tuple[Optional[int], Optional[int]]] = [
+    (None, 2000),
+    (50, 1000),
+    (20, 500),
+    (10, 200),
+    (5, 100),
+    (3, 60),
+    (1, 40),
+]
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count estimate, without a tokenizer: about one token per four UTF-8 bytes."""
+    return -(-len(text.encode("utf-8")) // BYTES_PER_TOKEN)
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _project(value: Any, fields: Set[str]) -> Any:
+    """Keep only the given keys in objects that have any of them, at any depth."""
+    if isinstance(value, dict):
+        if fields.intersection(value):
+            return {k: _project(v, fields) for k, v in value.items() if k in fields}
+        return {k: _project(v, fields) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_project(item, fields) for item in value]
+    return value
+
+
+def _truncate(value: Any, max_items: Optional[int], max_chars: Optional[int]) -> Any:
+    """Cap lists, objects and strings, leaving a count of what was dropped."""
+    if isinstance(value, dict):
+        items = list(value.items())
+        kept = {k: _truncate(v, max_items, max_chars) for k, v in items[:max_items]}
+        if max_items is not None and len(items) > max_items:
+            kept["_omitted_keys"] = len(items) - max_items
+        return kept
+    if isinstance(value, list):
+        kept = [_truncate(item, max_items, max_chars) for item in value[:max_items]]
+        if max_items is not None and len(value) > max_items:
+            kept.append({"_omitted_items": len(value) - max_items})
+        return kept
+    if isinstance(value, str) and max_chars is not None and len(value) > max_chars:
+        return f"{value[:max_chars]}...[{len(value) - max_chars} more chars]"
+    return value
+
+
+class ToolOutputCompactor:
+    """
+    Keeps tool outputs within a token budget before they are submitted to a run.
+
+    Every output submitted stays in the thread and is re-read by the model on
+    each later step, so large results are cut down first:
+    - JSON is re-serialized without whitespace
+    - Over budget, objects are projected to the tool's configured fields
+    - Then lists, objects and strings are capped step by step, with counts
+      of what was left out, until the output fits
+    - Text that is not JSON, or JSON that still does not fit, is cut at the budget
+    """
+
+    def __init__(
+        self,
+        default_budget: int = 2000,
+        budgets: Optional[Dict[str, int]] = None,
+        fields: Optional[Dict[str, List[str]]] = None
+    ):
+        self.default_budget = default_budget
+        self.budgets = budgets or {}
+        self.fields = {name: set(keys) for name, keys in (fields or {}).items()}
+        self.outputs = 0
+        self.compacted = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+
+    def budget(self, tool_name: str) -> int:
+        """Token budget of a tool's outputs; 0 means unlimited."""
+        return self.budgets.get(tool_name, self.default_budget)
+
+    def compact(self, tool_name: str, text: str) -> str:
+        """Return text, compacted to the tool's budget if it is over."""
+        budget = self.budget(tool_name)
+        tokens_in = estimate_tokens(text)
+        result = text
+        if budget and tokens_in > budget:
+            result = self._compact(tool_name, text, budget)
+
+        tokens_out = estimate_tokens(result)
+        self.outputs += 1
+        self.bytes_in += len(text.encode("utf-8"))
+        self.bytes_out += len(result.encode("utf-8"))
+        self.tokens_in += tokens_in
+        self.tokens_out += tokens_out
+        if result is not text:
+            self.compacted += 1
+            print(f"Compacted {tool_name} output from {tokens_in} to {tokens_out} tokens")
+        return result
+
+    def _compact(self, tool_name: str, text: str, budget: int) -> str:
+        try:
+            value = json.loads(text)
+        except ValueError:
+            return self._cut(text, budget)
+
+        result = _dumps(value)
+        if estimate_tokens(result) <= budget:
+            return result
+
+        if tool_name in self.fields:
+            value = _project(value, self.fields[tool_name])
+            result = _dumps(value)
+            if estimate_tokens(result) <= budget:
+                return result
+
+        for max_items, max_chars in _COMPACTION_LEVELS:
+            result = _dumps(_truncate(value, max_items, max_chars))
+            if estimate_tokens(result) <= budget:
+                return result
+        return self._cut(result, budget)
+
+    @staticmethod
+    def _cut(text: str, budget: int) -> str:
+        note = "...[truncated {} of {} bytes]"
+        data = text.encode("utf-8")
+        keep = max(0, budget * BYTES_PER_TOKEN - len(note) - 16)
+        return data[:keep].decode("utf-8", errors="ignore") + note.format(len(data) - keep, len(data))
+
+    def stats(self) -> dict:
+        return {
+            "outputs": self.outputs,
+            "compacted": self.compacted,
+            "bytesIn": self.bytes_in,
+            "bytesOut": self.bytes_out,
+            "bytesSaved": self.bytes_in - self.bytes_out,
+            "tokensIn": self.tokens_in,
+            "tokensOut": self.tokens_out,
+            "tokensSaved": self.tokens_in - self.tokens_out,
+            "defaultBudget": self.default_budget,
+            "budgets": dict(self.budgets),
+        }
+
+
+def tool_output_compactor() -> ToolOutputCompactor:
+    """
+    A ToolOutputCompactor configured from the environment.
+
+    - TOOL_OUTPUT_TOKEN_BUDGET: Tokens allowed per tool output (default 2000, 0 for no limit)
+    - TOOL_OUTPUT_BUDGETS: Comma-separated name=tokens pairs for specific tools
+    - TOOL_OUTPUT_FIELDS: Comma-separated name=field|field pairs, the keys kept in a tool's JSON objects
+    """
+    budgets = {}
+    for pair in filter(None, os.getenv("TOOL_OUTPUT_BUDGETS", "").split(",")):
+        name, _, tokens = pair.partition("=")
+        budgets[name.strip()] = int(tokens)
+
+    fields = {}
+    for pair in filter(None, os.getenv("TOOL_OUTPUT_FIELDS", "").split(",")):
+        name, _, keys = pair.partition("=")
+        fields[name.strip()] = [key.strip() for key in keys.split("|") if key.strip()]
+
+    return ToolOutputCompactor(
+        default_budget=int(os.getenv("TOOL_OUTPUT_TOKEN_BUDGET", "2000")),
+        budgets=budgets,
+        fields=fields
+    )
@@ -1,22 +1,42 @@
 import os
-from fastapi import FastAPI
+import asyncio
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from contextlib import AsyncExitStack
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
 from dotenv import load_dotenv
 from .services import TaskService
-from .agents import LangGraphTaskAgent, FoundryTaskAgent
+from .agents.startup import AgentStartup
 from .routes import create_api_routes
 
+if TYPE_CHECKING:
+    from .agents import LangGraphTaskAgent, FoundryTaskAgent
+
 # Load environment variables from .env file
 load_dotenv()
 
 
 class TaskManagerApp:
-    """FastAPI application for task management with AI agents."""
+    """
+    FastAPI application for task management with AI agents.
+    
+    The task service, LangGraph agent and Foundry agent factory can be
+    injected, e.g. with stubs for benchmarks; by default they are built
+    from environment variables.
     
-    def __init__(self):
+    Task routes are served as soon as the app starts. The agents, and the
+    libraries behind them, load concurrently in the background; chat routes
+    answer 503 until theirs is ready, and GET /ready reports progress.
+    """
+    
+    def __init__(
+        self,
+        task_service: Optional[TaskService] = None,
+        langgraph_agent: Optional["LangGraphTaskAgent"] = None,
+        foundry_agent_factory: Optional[Callable[[AsyncExitStack], Awaitable["FoundryTaskAgent"]]] = None
+    ):
         # Auto-detect server URL: Azure App Service or local development
         if os.getenv("WEBSITE_HOSTNAME"):
             # Running in Azure App Service
@@ -38,27 +58,80 @@ class TaskManagerApp:
         self.exit_stack = None
 
         # Initialize services
-        self.task_service = TaskService()
-        self.langgraph_agent = LangGraphTaskAgent(self.task_service)
-        
-        #self.foundry_agent = FoundryTaskAgent()
+        self.task_service = task_service or TaskService(
+            cache=os.getenv("TASK_CACHE_ENABLED", "true").lower() == "true",
+            backend=os.getenv("TASK_STORAGE_BACKEND", "sqlite"),
+            # Group commit is off unless a window is configured
+            group_commit_window=float(os.getenv("TASK_GROUP_COMMIT_WINDOW_MS", "0")) / 1000 or None,
+            group_commit_max_batch=int(os.getenv("TASK_GROUP_COMMIT_MAX_BATCH", "64"))
+        )
+        self.langgraph_agent = langgraph_agent
+        self.foundry_agent_factory = foundry_agent_factory
+        self.startup = AgentStartup()
         
         self._setup_middleware()
-        #self._setup_routes()
+        self._setup_routes()
 
         @self.app.on_event("startup")
         async def startup_event():
             self.exit_stack = AsyncExitStack()
             await self.exit_stack.__aenter__()
-            self.foundry_agent = await FoundryTaskAgent.create(self.exit_stack)
-            self._setup_routes()  
+            self.startup.start({
+                "langgraph": self._start_langgraph_agent,
+                "foundry": self._start_foundry_agent
+            })
 
         @self.app.on_event("shutdown")
         async def shutdown_event():
-            # delete the Agent on Azure
-            self.foundry_agent.project_client.agents.delete_agent(self.foundry_agent.agent_id) 
-            if self.exit_stack:
-                await self.exit_stack.__aexit__(None, None, None)      
+            try:
+                await self.startup.aclose()
+                if self.foundry_agent:
+                    await self._delete_foundry_resources(self.foundry_agent)
+                if self.langgraph_agent:
+                    await self.langgraph_agent.aclose()
+            finally:
+                try:
+                    # Stops the MCP client pool and server processes
+                    if self.exit_stack:
+                        await self.exit_stack.__aexit__(None, None, None)
+                finally:
+                    # Commits writes still waiting for a group commit
+                    await self.task_service.close()
+    
+    async def _delete_foundry_resources(self, foundry_agent: "FoundryTaskAgent"):
+        """Delete the sessions' conversation threads, then the Agent on Azure; failures are logged."""
+        try:
+            await foundry_agent.cleanup()
+        except Exception as e:
+            print(f"Failed to delete Foundry session threads: {e}")
+        if foundry_agent.project_client and foundry_agent.agent_id:
+            try:
+                # A blocking HTTP call, kept off the event loop
+                await asyncio.to_thread(foundry_agent.project_client.agents.delete_agent, foundry_agent.agent_id)
+            except Exception as e:
+                print(f"Failed to delete Foundry agent {foundry_agent.agent_id}: {e}")
+    
+    async def _start_langgraph_agent(self) -> "LangGraphTaskAgent":
+        if self.langgraph_agent is None:
+            # Importing LangChain and LangGraph takes most of the time, so it runs off the event loop
+            self.langgraph_agent = await asyncio.to_thread(self._create_langgraph_agent)
+        return self.langgraph_agent
+    
+    def _create_langgraph_agent(self) -> "LangGraphTaskAgent":
+        from .agents import LangGraphTaskAgent
+        return LangGraphTaskAgent(self.task_service)
+    
+    async def _start_foundry_agent(self) -> "FoundryTaskAgent":
+        factory = self.foundry_agent_factory
+        if factory is None:
+            factory = (await asyncio.to_thread(self._foundry_agent_class)).create
+        self.foundry_agent = await factory(self.exit_stack)
+        return self.foundry_agent
+    
+    @staticmethod
+    def _foundry_agent_class() -> type:
+        from .agents import FoundryTaskAgent
+        return FoundryTaskAgent
     
     def _setup_middleware(self):
         """Set up CORS and other middleware."""
@@ -73,12 +146,16 @@ class TaskManagerApp:
     def _setup_routes(self):
         """Set up API routes and static file serving."""
         # API routes
-        api_router = create_api_routes(
-            self.langgraph_agent,
-            self.foundry_agent
-        )
+        api_router = create_api_routes(self.task_service, self.startup)
         self.app.include_router(api_router, prefix="/api")
         
+        @self.app.get("/ready", include_in_schema=False)
+        async def ready(response: Response):
+            """Whether the agents have finished starting; 503 while they are still loading"""
+            if not self.startup.ready:
+                response.status_code = 503
+            return self.startup.report()
+        
         # Static files
         static_dir = os.path.join(os.path.dirname(__file__), "..", "public")
         if os.path.exists(static_dir):
@@ -96,12 +173,6 @@ class TaskManagerApp:
     def get_app(self) -> FastAPI:
         """Get the FastAPI application instance."""
         return self.app
-    
-    async def shutdown(self):
-        """Cleanup resources."""
-        print("Shutting down Task Manager app...")
-        self.task_service.close()
-        await self.foundry_agent.cleanup()
 
 
 # Create the application instance
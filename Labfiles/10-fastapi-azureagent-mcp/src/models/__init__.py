@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from enum import Enum
 
 
@@ -7,6 +7,7 @@ class TaskItem(BaseModel):
     id: int
     title: str
     isComplete: bool
+    version: int = 1  # Incremented on every update, used for ETags
 
 
 class TaskCreateRequest(BaseModel):
@@ -19,6 +20,44 @@ class TaskUpdateRequest(BaseModel):
     isComplete: Optional[bool] = None
 
 
+class TaskPage(BaseModel):
+    items: List[TaskItem]
+    nextAfterId: Optional[int] = None
+
+
+class TaskBatchUpdate(BaseModel):
+    id: int
+    title: Optional[str] = None
+    isComplete: Optional[bool] = None
+
+
+class TaskBatchRequest(BaseModel):
+    create: List[TaskCreateRequest] = []
+    update: List[TaskBatchUpdate] = []
+    delete: List[int] = []
+
+
+class TaskBatchResponse(BaseModel):
+    created: List[TaskItem]
+    updated: List[int]
+    deleted: List[int]
+
+
+class TaskChangeType(str, Enum):
+    INSERT = "insert"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+class TaskChangeEvent(BaseModel):
+    version: int
+    seq: int = 0  # Position in the change feed, set when published
+    type: TaskChangeType
+    id: int
+    task: Optional[TaskItem] = None  # Full row, for inserts
+    changes: Optional[TaskUpdateRequest] = None  # Changed fields, for updates
+
+
 class Role(str, Enum):
     USER = "user"
     ASSISTANT = "assistant"
@@ -32,3 +71,19 @@ class ChatMessage(BaseModel):
 class ChatRequest(BaseModel):
     message: str
     sessionId: Optional[str] = None
+
+
+class ChatStreamEventType(str, Enum):
+    TOKEN = "token"
+    TOOL_START = "tool_start"
+    TOOL_END = "tool_end"
+    DONE = "done"
+    ERROR = "error"
+
+
+class ChatStreamEvent(BaseModel):
+    type: ChatStreamEventType
+    content: Optional[str] = None  # Token text, tool output, the full reply or an error message
+    tool: Optional[str] = None  # Tool name, for tool events
+    ttftMs: Optional[float] = None  # Time to first token, on the done event
+    totalMs: Optional[float] = None  # Total latency, on the done event
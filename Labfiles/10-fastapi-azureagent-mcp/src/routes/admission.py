@@ -0,0 +1,199 @@
+import os
+import math
+import time
+import uuid
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Deque, Dict, Optional
+
+# Wait times kept for the percentiles in stats()
+_WAIT_SAMPLES = 1024
+
+
+class AdmissionRejected(Exception):
+    """A request was turned away; retry_after is a hint in seconds."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Limits the requests one agent works on at once, so a spike waits in a
+    short queue or is turned away instead of piling up runs upstream.
+
+    - max_concurrent requests are admitted at a time
+    - Up to max_queue more wait for a slot, in arrival order or, with fair,
+      taking turns between sessions, so one busy session cannot hold up
+      the others
+    - A request is rejected at once if the queue is full or if its expected
+      wait, from the queue ahead of it and the average time a request holds
+      a slot, is over max_wait; one still queued after max_wait is rejected
+    - Rejections carry a Retry-After estimate
+    max_concurrent=0 admits everything.
+    """
+
+    def __init__(self, max_concurrent: int = 8, max_queue: int = 32, max_wait: float = 10.0, fair: bool = False):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.fair = fair
+        self.active = 0
+        self.queued = 0
+        self._queues: Dict[str, Deque[asyncio.Future]] = {}
+        # Session keys with waiters, in the order they take turns
+        self._turns: Deque[str] = deque()
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {"queue_full": 0, "expected_wait": 0, "timeout": 0}
+        self.service_time: Optional[float] = None
+        self._waits: Deque[float] = deque(maxlen=_WAIT_SAMPLES)
+
+    def expected_wait(self, position: int) -> float:
+        """Estimated wait of the request at this queue position (1 is next), from the average slot hold time."""
+        if not self.service_time or not self.max_concurrent:
+            return 0.0
+        return math.ceil(position / self.max_concurrent) * self.service_time
+
+    def _retry_after(self) -> float:
+        return max(1.0, self.expected_wait(self.queued + 1))
+
+    async def acquire(self, session_id: Optional[str] = None) -> Callable[[], None]:
+        """Wait for a slot and return the function that gives it back; raises AdmissionRejected."""
+        if not self.max_concurrent:
+            return lambda: None
+
+        start = time.perf_counter()
+        if self.active < self.max_concurrent and not self.queued:
+            self.active += 1
+        else:
+            if self.queued >= self.max_queue:
+                self.rejected["queue_full"] += 1
+                raise AdmissionRejected("queue is full", self._retry_after())
+            if self.expected_wait(self.queued + 1) > self.max_wait:
+                self.rejected["expected_wait"] += 1
+                raise AdmissionRejected("expected wait is too long", self._retry_after())
+
+            # Without fair there is one queue; sessionless requests each take their own turn
+            key = (session_id or uuid.uuid4().hex) if self.fair else ""
+            waiter = asyncio.get_running_loop().create_future()
+            self._enqueue(key, waiter)
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter), self.max_wait)
+            except asyncio.TimeoutError:
+                # A slot handed over just as the wait ran out is kept
+                if self._abandon(key, waiter):
+                    self.rejected["timeout"] += 1
+                    raise AdmissionRejected("waited too long for a slot", self._retry_after())
+            except asyncio.CancelledError:
+                if not self._abandon(key, waiter):
+                    self._release()
+                raise
+
+        self.admitted += 1
+        self._waits.append(time.perf_counter() - start)
+        return self._holder(time.perf_counter())
+
+    @asynccontextmanager
+    async def admit(self, session_id: Optional[str] = None) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block."""
+        release = await self.acquire(session_id)
+        try:
+            yield
+        finally:
+            release()
+
+    def _holder(self, started: float) -> Callable[[], None]:
+        released = False
+
+        def release():
+            nonlocal released
+            if released:
+                return
+            released = True
+            held = time.perf_counter() - started
+            self.service_time = held if self.service_time is None else 0.9 * self.service_time + 0.1 * held
+            self._release()
+
+        return release
+
+    def _enqueue(self, key: str, waiter: asyncio.Future):
+        if key not in self._queues:
+            self._queues[key] = deque()
+            self._turns.append(key)
+        self._queues[key].append(waiter)
+        self.queued += 1
+
+    def _abandon(self, key: str, waiter: asyncio.Future) -> bool:
+        """Take a waiter out of the queue; False if it had already been given a slot."""
+        if waiter.done():
+            return False
+        waiter.cancel()
+        queue = self._queues.get(key)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            self.queued -= 1
+            if not queue:
+                del self._queues[key]
+                self._turns.remove(key)
+        return True
+
+    def _release(self):
+        """Hand the slot to the next waiter, taking sessions in turn, or free it."""
+        while self._turns:
+            key = self._turns.popleft()
+            queue = self._queues[key]
+            waiter = queue.popleft()
+            self.queued -= 1
+            if queue:
+                self._turns.append(key)
+            else:
+                del self._queues[key]
+            waiter.set_result(None)
+            return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        waits = sorted(self._waits)
+
+        def percentile(pct: float) -> Optional[float]:
+            if not waits:
+                return None
+            return round(waits[min(len(waits) - 1, int(len(waits) * pct / 100))] * 1000, 1)
+
+        return {
+            "active": self.active,
+            "queueDepth": self.queued,
+            "queuedSessions": len(self._queues),
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "waitMs": {"p50": percentile(50), "p95": percentile(95), "p99": percentile(99), "max": percentile(100)},
+            "serviceMs": round(self.service_time * 1000, 1) if self.service_time is not None else None,
+            "maxConcurrent": self.max_concurrent,
+            "maxQueue": self.max_queue,
+            "maxWaitSeconds": self.max_wait,
+            "fair": self.fair,
+        }
+
+
+def admission_controller(prefix: str) -> AdmissionController:
+    """
+    An AdmissionController configured from the environment; each setting
+    can be given for one agent with its prefix, e.g. LANGGRAPH_CHAT_MAX_CONCURRENT.
+
+    - CHAT_MAX_CONCURRENT: Requests an agent works on at once (default 8, 0 for no limit)
+    - CHAT_MAX_QUEUE: Requests that may wait for a slot (default 32)
+    - CHAT_MAX_WAIT_SECONDS: Longest a request may wait for a slot (default 10)
+    - CHAT_FAIR_SESSIONS: Let queued sessions take turns (default false)
+    """
+    def setting(name: str, default: str) -> str:
+        return os.getenv(f"{prefix}_{name}") or os.getenv(name, default)
+
+    return AdmissionController(
+        max_concurrent=int(setting("CHAT_MAX_CONCURRENT", "8")),
+        max_queue=int(setting("CHAT_MAX_QUEUE", "32")),
+        max_wait=float(setting("CHAT_MAX_WAIT_SECONDS", "10")),
+        fair=setting("CHAT_FAIR_SESSIONS", "false").lower() == "true"
+    )
@@ -1,22 +1,314 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from ..models import TaskItem, TaskCreateRequest, TaskUpdateRequest, ChatRequest, ChatMessage
-from ..agents import LangGraphTaskAgent, FoundryTaskAgent
+import json
+import math
+import time
+import asyncio
+import weakref
+from fastapi import APIRouter, HTTPException, Query, Header, Response
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Callable, List, Optional
+from ..models import (
+    TaskItem, TaskPage, TaskCreateRequest, TaskUpdateRequest, TaskBatchRequest, TaskBatchResponse,
+    ChatRequest, ChatMessage, ChatStreamEvent, ChatStreamEventType
+)
+from ..services import TaskService, TaskVersionConflict
+from ..agents.startup import AgentStartup
+from .admission import AdmissionRejected, admission_controller
 
 
-def create_api_routes(
-    langgraph_agent: LangGraphTaskAgent,
-    foundry_agent: FoundryTaskAgent
-) -> APIRouter:
+def task_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """Whether an If-Match / If-None-Match header value matches the given ETag."""
+    candidates = [value.strip().removeprefix("W/") for value in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _call_soon_or_now(loop: asyncio.AbstractEventLoop, callback: Callable[[], None]):
+    """Run callback on loop, or right away if the loop has already closed."""
+    try:
+        loop.call_soon_threadsafe(callback)
+    except RuntimeError:
+        callback()
+
+
+def chat_event_stream(
+    agent_name: str,
+    events: AsyncIterator[ChatStreamEvent],
+    on_close: Optional[Callable[[], None]] = None
+) -> StreamingResponse:
+    """
+    Relay an agent's stream events as server-sent events, ending with a done
+    event that carries the full reply, time to first token and total latency.
+    
+    on_close is called once the stream ends, however it ends, even if the
+    client goes away before it starts; it may be called more than once.
+    """
+    async def event_stream():
+        start = time.perf_counter()
+        first_token = None
+        reply = []
+        try:
+            async for event in events:
+                if event.type == ChatStreamEventType.TOKEN:
+                    if first_token is None:
+                        first_token = time.perf_counter()
+                    reply.append(event.content)
+                yield f"event: {event.type.value}\ndata: {event.model_dump_json(exclude_none=True)}\n\n"
+                if event.type == ChatStreamEventType.ERROR:
+                    return
+        finally:
+            if on_close:
+                on_close()
+        
+        total_ms = (time.perf_counter() - start) * 1000
+        ttft_ms = (first_token - start) * 1000 if first_token is not None else None
+        ttft_text = f"{ttft_ms:.0f}ms" if ttft_ms is not None else "n/a"
+        print(f"{agent_name} stream: time to first token {ttft_text}, total {total_ms:.0f}ms")
+        done = ChatStreamEvent(type=ChatStreamEventType.DONE, content="".join(reply), ttftMs=ttft_ms, totalMs=total_ms)
+        yield f"event: {done.type.value}\ndata: {done.model_dump_json(exclude_none=True)}\n\n"
+    
+    stream = event_stream()
+    if on_close:
+        # A stream that never started (the client left before the headers
+        # were sent) skips the finally above, and Starlette then skips
+        # background tasks too, so close it when it is collected instead,
+        # which may be after the loop has closed
+        loop = asyncio.get_running_loop()
+        weakref.finalize(stream, _call_soon_or_now, loop, on_close).atexit = False
+    
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def create_api_routes(task_service: TaskService, agents: AgentStartup) -> APIRouter:
     """
     Create API router with task CRUD endpoints and chat agent routes.
     
+    Chat routes look their agent up in agents on each request and answer 503
+    while it is still starting, with Retry-After, or if it failed to start.
+    
     Routes:
+    - GET    /tasks          : Lists tasks one keyset page at a time, with optional filters
+    - GET    /tasks/search   : Full-text search over task titles
+    - GET    /tasks/stream   : Streams task changes as server-sent events from a given version
+    - POST   /tasks/batch    : Creates, updates and deletes tasks in one transaction
+    - GET    /tasks/cache    : Returns task cache hit/miss counters
+    - GET    /tasks/storage  : Returns storage backend statistics
+    - GET    /tasks/{id}     : Gets one task, with an ETag; honours If-None-Match
+    - PATCH  /tasks/{id}     : Updates fields of one task; honours If-Match
     - POST   /chat/langgraph : Processes a chat message using the LangGraph agent
+    - POST   /chat/langgraph/stream : Streams the LangGraph agent's reply as server-sent events
     - POST   /chat/foundry   : Processes a chat message using the Foundry agent
+    - POST   /chat/foundry/stream   : Streams the Foundry agent's reply as server-sent events
+    - GET    /chat/foundry/tools/cache : Returns MCP tool result cache statistics
+    - GET    /chat/foundry/tools/output : Returns tool output compaction statistics
+    - GET    /chat/admission : Returns each chat agent's admission queue depth and wait times
+    
+    Each chat agent has an admission controller (see admission_controller for
+    its settings): requests over its concurrency limit wait in a short queue,
+    and are answered 429 with Retry-After when the queue is full or the wait
+    would be too long. Streams hold their slot until they end.
     """
     router = APIRouter()
     
+    def chat_agent(name: str, label: str):
+        agent = agents.get(name)
+        if agent is None:
+            if agents.status.get(name) == "failed":
+                raise HTTPException(status_code=503, detail=f"{label} agent failed to start")
+            raise HTTPException(status_code=503, detail=f"{label} agent is still starting", headers={"Retry-After": "1"})
+        return agent
+    
+    admission = {"langgraph": admission_controller("LANGGRAPH"), "foundry": admission_controller("FOUNDRY")}
+    
+    async def admit(name: str, session_id: Optional[str]) -> Callable[[], None]:
+        try:
+            return await admission[name].acquire(session_id)
+        except AdmissionRejected as e:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Too many chat requests: {e.reason}",
+                headers={"Retry-After": str(math.ceil(e.retry_after))}
+            )
+    
+    @router.get("/tasks", response_model=TaskPage, operation_id="getTasks")
+    async def get_tasks(
+        afterId: Optional[int] = Query(default=None, description="Return tasks with an ID greater than this cursor"),
+        limit: int = Query(default=TaskService.DEFAULT_PAGE_SIZE, ge=1, le=TaskService.MAX_PAGE_SIZE),
+        isComplete: Optional[bool] = Query(default=None, description="Filter by completion status"),
+        title: Optional[str] = Query(default=None, description="Filter by a substring of the title")
+    ):
+        """Get a page of tasks ordered by ID"""
+        try:
+            return await task_service.get_tasks_page(afterId, limit, isComplete, title)
+        except Exception as e:
+            print(f"Error fetching tasks: {e}")
+            raise HTTPException(status_code=500, detail="Failed to fetch tasks")
+    
+    @router.get("/tasks/search", response_model=List[TaskItem], operation_id="searchTasks")
+    async def search_tasks(
+        q: str = Query(min_length=1, description="Words to look for in task titles"),
+        limit: int = Query(default=TaskService.DEFAULT_SEARCH_LIMIT, ge=1, le=TaskService.MAX_PAGE_SIZE)
+    ):
+        """Search task titles, best matches first"""
+        try:
+            return await task_service.search_tasks(q, limit)
+        except Exception as e:
+            print(f"Error searching tasks: {e}")
+            raise HTTPException(status_code=500, detail="Failed to search tasks")
+    
+    @router.get("/tasks/stream", operation_id="streamTaskChanges", include_in_schema=False)
+    async def stream_task_changes(
+        since: Optional[str] = Query(default=None, description="Id of the last event the client has applied"),
+        last_event_id: Optional[str] = Header(default=None)
+    ):
+        """
+        Stream task changes as server-sent events.
+        
+        Every change has its own event id. Clients resume from `since` (or the
+        Last-Event-ID header that EventSource sends on reconnect) and receive
+        only the changes after it. When that event is no longer in the change
+        history, the id is from before a restart, or no id is given, the
+        stream starts with a full snapshot instead.
+        """
+        hub = task_service.changes
+        cursor = since or last_event_id
+        since_seq = hub.parse_event_id(cursor) if cursor else None
+        
+        def format_event(event_type: str, seq: int, data: str) -> str:
+            return f"id: {hub.event_id(seq)}\nevent: {event_type}\ndata: {data}\n\n"
+        
+        async def snapshot():
+            seq = hub.last_seq
+            version = task_service.data_version
+            tasks = await task_service.get_all_tasks()
+            data = json.dumps({"version": version, "tasks": [t.model_dump() for t in tasks]})
+            return seq, format_event("snapshot", seq, data)
+        
+        async def event_stream():
+            # Subscribe before reading anything so no change can slip in between
+            queue = hub.subscribe()
+            try:
+                backlog = hub.events_since(since_seq) if since_seq is not None else None
+                if backlog is None:
+                    applied, message = await snapshot()
+                    yield message
+                else:
+                    for event in backlog:
+                        yield format_event("change", event.seq, event.model_dump_json(exclude_none=True))
+                    applied = backlog[-1].seq if backlog else since_seq
+                
+                while True:
+                    try:
+                        event = await asyncio.wait_for(queue.get(), timeout=15)
+                    except asyncio.TimeoutError:
+                        yield ": keep-alive\n\n"
+                        continue
+                    if event is hub.RESYNC:
+                        applied, message = await snapshot()
+                        yield message
+                    elif event.seq > applied:
+                        yield format_event("change", event.seq, event.model_dump_json(exclude_none=True))
+            finally:
+                hub.unsubscribe(queue)
+        
+        return StreamingResponse(
+            event_stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    @router.post("/tasks/batch", response_model=TaskBatchResponse, operation_id="batchTasks")
+    async def batch_tasks(batch_request: TaskBatchRequest):
+        """Create, update and delete several tasks in a single transaction"""
+        try:
+            if not (batch_request.create or batch_request.update or batch_request.delete):
+                raise HTTPException(status_code=400, detail="Batch must contain at least one operation")
+            
+            created, updated, deleted = await task_service.apply_batch(
+                batch_request.create,
+                batch_request.update,
+                batch_request.delete
+            )
+            return TaskBatchResponse(created=created, updated=updated, deleted=deleted)
+        except HTTPException:
+            raise
+        except Exception as e:
+            print(f"Error in batch task operation: {e}")
+            raise HTTPException(status_code=500, detail="Failed to apply batch")
+    
+    @router.get("/tasks/cache", operation_id="getTaskCacheStats", include_in_schema=False)
+    async def get_task_cache_stats():
+        """Get hit/miss counters for the task read cache"""
+        stats = task_service.cache_stats()
+        if stats is None:
+            raise HTTPException(status_code=404, detail="Task cache is disabled")
+        return stats
+    
+    @router.get("/tasks/storage", operation_id="getTaskStorageStats", include_in_schema=False)
+    async def get_task_storage_stats():
+        """Get storage backend statistics, such as group commit batch sizes"""
+        return task_service.storage_stats()
+    
+    @router.get("/tasks/{task_id}", response_model=TaskItem, operation_id="getTask")
+    async def get_task(
+        task_id: int,
+        response: Response,
+        if_none_match: Optional[str] = Header(default=None)
+    ):
+        """Get a task by ID. Returns 304 when If-None-Match has the current ETag"""
+        task = await task_service.get_task_by_id(task_id)
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+        
+        etag = task_etag(task.version)
+        if if_none_match and etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return task
+    
+    @router.patch("/tasks/{task_id}", response_model=TaskItem, operation_id="updateTask")
+    async def update_task(
+        task_id: int,
+        update_request: TaskUpdateRequest,
+        response: Response,
+        if_match: Optional[str] = Header(default=None)
+    ):
+        """Update a task by ID. With If-Match, fails with 412 if the task has changed"""
+        expected_version = None
+        if if_match and if_match.strip() != "*":
+            try:
+                expected_version = int(if_match.strip().removeprefix("W/").strip('"'))
+            except ValueError:
+                raise HTTPException(status_code=400, detail="If-Match must be an ETag returned by this API")
+        
+        try:
+            task = await task_service.update_task(
+                task_id,
+                update_request.title,
+                update_request.isComplete,
+                expected_version
+            )
+        except TaskVersionConflict as e:
+            raise HTTPException(
+                status_code=412,
+                detail="Task has been modified",
+                headers={"ETag": task_etag(e.current_version)}
+            )
+        except Exception as e:
+            print(f"Error updating task: {e}")
+            raise HTTPException(status_code=500, detail="Failed to update task")
+        
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+        response.headers["ETag"] = task_etag(task.version)
+        return task
+    
     @router.post("/chat/langgraph", response_model=ChatMessage, operation_id="chatWithLangGraph", include_in_schema=False)
     async def chat_with_langgraph(chat_request: ChatRequest):
         """Process a chat message using the LangGraph agent"""
@@ -24,10 +316,15 @@ def create_api_routes(
             if not chat_request.message:
                 raise HTTPException(status_code=400, detail="Message is required")
             
-            response = await langgraph_agent.process_message(
-                chat_request.message, 
-                chat_request.sessionId
-            )
+            agent = chat_agent("langgraph", "LangGraph")
+            release = await admit("langgraph", chat_request.sessionId)
+            try:
+                response = await agent.process_message(
+                    chat_request.message, 
+                    chat_request.sessionId
+                )
+            finally:
+                release()
             return response
         except HTTPException:
             raise
@@ -35,6 +332,20 @@ def create_api_routes(
             print(f"Error in LangGraph chat: {e}")
             raise HTTPException(status_code=500, detail="Failed to process message")
     
+    @router.post("/chat/langgraph/stream", operation_id="streamChatWithLangGraph", include_in_schema=False)
+    async def stream_chat_with_langgraph(chat_request: ChatRequest):
+        """Stream tokens and tool progress from the LangGraph agent"""
+        if not chat_request.message:
+            raise HTTPException(status_code=400, detail="Message is required")
+        
+        agent = chat_agent("langgraph", "LangGraph")
+        release = await admit("langgraph", chat_request.sessionId)
+        return chat_event_stream(
+            "LangGraph",
+            agent.stream_message(chat_request.message, chat_request.sessionId),
+            on_close=release
+        )
+    
     @router.post("/chat/foundry", response_model=ChatMessage, operation_id="chatWithFoundry", include_in_schema=False)
     async def chat_with_foundry(chat_request: ChatRequest):
         """Process a chat message using the Foundry agent"""
@@ -42,7 +353,15 @@ def create_api_routes(
             if not chat_request.message:
                 raise HTTPException(status_code=400, detail="Message is required")
             
-            response = await foundry_agent.process_message(chat_request.message)
+            agent = chat_agent("foundry", "Foundry")
+            release = await admit("foundry", chat_request.sessionId)
+            try:
+                response = await agent.process_message(
+                    chat_request.message,
+                    chat_request.sessionId
+                )
+            finally:
+                release()
             return response
         except HTTPException:
             raise
@@ -50,4 +369,37 @@ def create_api_routes(
             print(f"Error in Foundry chat: {e}")
             raise HTTPException(status_code=500, detail="Failed to process message")
     
+    @router.get("/chat/foundry/tools/cache", operation_id="getFoundryToolCacheStats", include_in_schema=False)
+    async def get_foundry_tool_cache_stats():
+        """Get hit/miss counters of the Foundry agent's MCP tool result cache"""
+        foundry_agent = agents.get("foundry")
+        tool_cache = foundry_agent.tool_cache if foundry_agent else None
+        return tool_cache.stats() if tool_cache else {}
+    
+    @router.get("/chat/foundry/tools/output", operation_id="getFoundryToolOutputStats", include_in_schema=False)
+    async def get_foundry_tool_output_stats():
+        """Get bytes and tokens saved by compacting the Foundry agent's tool outputs"""
+        foundry_agent = agents.get("foundry")
+        compactor = foundry_agent.output_compactor if foundry_agent else None
+        return compactor.stats() if compactor else {}
+    
+    @router.get("/chat/admission", operation_id="getChatAdmissionStats", include_in_schema=False)
+    async def get_chat_admission_stats():
+        """Get each chat agent's active requests, queue depth, wait times and rejections"""
+        return {name: controller.stats() for name, controller in admission.items()}
+    
+    @router.post("/chat/foundry/stream", operation_id="streamChatWithFoundry", include_in_schema=False)
+    async def stream_chat_with_foundry(chat_request: ChatRequest):
+        """Stream tokens and tool progress from the Foundry agent"""
+        if not chat_request.message:
+            raise HTTPException(status_code=400, detail="Message is required")
+        
+        agent = chat_agent("foundry", "Foundry")
+        release = await admit("foundry", chat_request.sessionId)
+        return chat_event_stream(
+            "Foundry",
+            agent.stream_message(chat_request.message, chat_request.sessionId),
+            on_close=release
+        )
+    
     return router
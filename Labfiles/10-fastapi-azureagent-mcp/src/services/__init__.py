@@ -1,3 +1,4 @@
 from .task_service import TaskService
+from .storage import TaskStorage, TaskVersionConflict, create_storage
 
-__all__ = ["TaskService"]
+__all__ = ["TaskService", "TaskStorage", "TaskVersionConflict", "create_storage"]
@@ -0,0 +1,169 @@
+import sqlite3
+import asyncio
+from typing import List, Optional, Tuple
+import aiosqlite
+from ..models import TaskItem, TaskPage, TaskCreateRequest, TaskBatchUpdate
+from .storage import TaskStorage, TaskVersionConflict
+from .sqlite_storage import (
+    SELECT_ALL, SELECT_BY_ID, SELECT_VERSION, INSERT, UPDATE_PARTIAL, PATCH, DELETE,
+    SELECT_SEQUENCE, SEARCH, ID_CHUNK_SIZE, initialize_schema, fts_match_expression,
+    row_to_task, page_query, rows_to_page, existing_ids_query, update_params, patch_params
+)
+
+
+class AioSQLiteTaskStorage(TaskStorage):
+    """
+    Task storage on native asyncio connections through aiosqlite.
+
+    Uses one writer and one reader connection in WAL mode, so reads never
+    queue behind writes. A lock keeps each write transaction contiguous on
+    the writer connection.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._reader: Optional[aiosqlite.Connection] = None
+        self._open_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+        self._initialize_database()
+
+    def _initialize_database(self):
+        """Create the schema synchronously so the service is usable right after construction."""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        initialize_schema(conn)
+        conn.commit()
+        conn.close()
+        print("Tasks table initialized")
+
+    async def _connect(self) -> aiosqlite.Connection:
+        conn = await aiosqlite.connect(self.db_path)
+        await conn.execute("PRAGMA synchronous=NORMAL")
+        await conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    async def _ensure_open(self):
+        # aiosqlite connections need a running loop, so open them on first use
+        if self._writer is not None:
+            return
+        async with self._open_lock:
+            if self._writer is None:
+                self._reader = await self._connect()
+                self._writer = await self._connect()
+
+    async def _read(self, sql: str, params=()) -> list:
+        await self._ensure_open()
+        return list(await self._reader.execute_fetchall(sql, params))
+
+    async def _write(self, fn):
+        await self._ensure_open()
+        async with self._write_lock:
+            try:
+                result = await fn(self._writer)
+                await self._writer.commit()
+                return result
+            except Exception:
+                await self._writer.rollback()
+                raise
+
+    async def get_all(self) -> List[TaskItem]:
+        return [row_to_task(row) for row in await self._read(SELECT_ALL)]
+
+    async def get_page(
+        self,
+        after_id: int,
+        limit: int,
+        is_complete: Optional[bool],
+        title_contains: Optional[str]
+    ) -> TaskPage:
+        sql, params = page_query(after_id, limit, is_complete, title_contains)
+        return rows_to_page(await self._read(sql, params), limit)
+
+    async def get(self, task_id: int) -> Optional[TaskItem]:
+        rows = await self._read(SELECT_BY_ID, (task_id,))
+        return row_to_task(rows[0]) if rows else None
+
+    async def search(self, query: str, limit: int) -> List[TaskItem]:
+        expression = fts_match_expression(query)
+        if expression is None:
+            return []
+        return [row_to_task(row) for row in await self._read(SEARCH, (expression, limit))]
+
+    async def add(self, title: str, is_complete: bool) -> TaskItem:
+        async def create_task(conn: aiosqlite.Connection):
+            cursor = await conn.execute(INSERT, (title, 1 if is_complete else 0))
+            return TaskItem(id=cursor.lastrowid, title=title, isComplete=is_complete)
+
+        return await self._write(create_task)
+
+    async def update(
+        self,
+        task_id: int,
+        title: Optional[str],
+        is_complete: Optional[bool],
+        expected_version: Optional[int] = None
+    ) -> Optional[TaskItem]:
+        params = patch_params(task_id, title, is_complete, expected_version)
+
+        async def update(conn: aiosqlite.Connection):
+            rows = list(await conn.execute_fetchall(PATCH, params))
+            if rows:
+                return row_to_task(rows[0])
+            # Nothing matched: tell a missing task apart from a stale version
+            if expected_version is not None:
+                current = list(await conn.execute_fetchall(SELECT_VERSION, (task_id,)))
+                if current:
+                    raise TaskVersionConflict(task_id, current[0][0])
+            return None
+
+        return await self._write(update)
+
+    async def delete(self, task_id: int) -> bool:
+        async def delete(conn: aiosqlite.Connection):
+            cursor = await conn.execute(DELETE, (task_id,))
+            return cursor.rowcount > 0
+
+        return await self._write(delete)
+
+    @staticmethod
+    async def _existing_ids(conn: aiosqlite.Connection, task_ids: List[int]) -> List[int]:
+        found = set()
+        for start in range(0, len(task_ids), ID_CHUNK_SIZE):
+            chunk = task_ids[start:start + ID_CHUNK_SIZE]
+            rows = await conn.execute_fetchall(existing_ids_query(chunk), chunk)
+            found.update(row[0] for row in rows)
+        return [task_id for task_id in dict.fromkeys(task_ids) if task_id in found]
+
+    async def apply_batch(
+        self,
+        create: List[TaskCreateRequest],
+        update: List[TaskBatchUpdate],
+        delete: List[int]
+    ) -> Tuple[List[TaskItem], List[int], List[int]]:
+        async def apply(conn: aiosqlite.Connection):
+            created = []
+            if create:
+                await conn.executemany(INSERT, [(t.title, 1 if t.isComplete else 0) for t in create])
+                # AUTOINCREMENT ids are contiguous while this transaction holds the write lock
+                last_id = list(await conn.execute_fetchall(SELECT_SEQUENCE))[0][0]
+                first_id = last_id - len(create) + 1
+                created = [
+                    TaskItem(id=first_id + i, title=t.title, isComplete=bool(t.isComplete))
+                    for i, t in enumerate(create)
+                ]
+            updated = await self._existing_ids(conn, [u.id for u in update]) if update else []
+            if update:
+                await conn.executemany(UPDATE_PARTIAL, update_params(update))
+            deleted = await self._existing_ids(conn, delete) if delete else []
+            if deleted:
+                await conn.executemany(DELETE, [(task_id,) for task_id in deleted])
+            return created, updated, deleted
+
+        return await self._write(apply)
+
+    async def close(self):
+        for conn in (self._reader, self._writer):
+            if conn is not None:
+                await conn.close()
+        self._reader = self._writer = None
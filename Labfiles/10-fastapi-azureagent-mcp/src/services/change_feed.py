@@ -0,0 +1,91 @@
+import uuid
+import asyncio
+from collections import deque
+from typing import Deque, List, Optional, Set
+from ..models import TaskChangeEvent
+
+
+class TaskChangeHub:
+    """
+    In-process broadcast hub for task change events.
+
+    TaskService publishes every committed change here. Each event gets its
+    own sequence number, so a batch's events can be resumed from one by one.
+    Subscribers get their own bounded queue; the hub also keeps a short
+    history so a reconnecting client can resume from the last event it saw.
+
+    Event ids (see event_id) carry the hub's epoch, which is new in every
+    process, so an id from before a restart sends the client to a snapshot
+    instead of resuming from the wrong place.
+
+    A subscriber that falls too far behind has its backlog dropped and
+    receives RESYNC instead, telling it to reload a snapshot.
+    """
+
+    RESYNC = object()
+
+    def __init__(self, history_size: int = 1000, queue_size: int = 256):
+        self.queue_size = queue_size
+        self.epoch = uuid.uuid4().hex[:8]
+        self.last_seq = 0
+        self._history: Deque[TaskChangeEvent] = deque(maxlen=history_size)
+        # Highest sequence number of an event no longer in the history
+        self._floor = 0
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def event_id(self, seq: int) -> str:
+        """The SSE id for a position in the feed."""
+        return f"{self.epoch}-{seq}"
+
+    def parse_event_id(self, event_id: str) -> Optional[int]:
+        """The sequence number in an id from event_id, or None if it is malformed or from another process."""
+        epoch, _, seq = event_id.strip().rpartition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def publish(self, events: List[TaskChangeEvent]):
+        """Number events, record them and fan them out to every subscriber without blocking."""
+        for event in events:
+            self.last_seq += 1
+            event.seq = self.last_seq
+            if len(self._history) == self._history.maxlen:
+                self._floor = self._history[0].seq
+            self._history.append(event)
+
+        for queue in list(self._subscribers):
+            for event in events:
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    self._reset(queue)
+                    break
+
+    def _reset(self, queue: asyncio.Queue):
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(self.RESYNC)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def events_since(self, seq: int) -> Optional[List[TaskChangeEvent]]:
+        """
+        Events after the given sequence number, oldest first.
+
+        Returns None when the history no longer reaches back that far (or the
+        number is ahead of the feed) and the caller must start again from a
+        snapshot.
+        """
+        if seq > self.last_seq or seq < self._floor:
+            return None
+        return [event for event in self._history if event.seq > seq]
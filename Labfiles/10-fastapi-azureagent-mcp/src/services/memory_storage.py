@@ -0,0 +1,118 @@
+from typing import Dict, List, Optional, Tuple
+from ..models import TaskItem, TaskPage, TaskCreateRequest, TaskBatchUpdate
+from .storage import TaskStorage, TaskVersionConflict
+from .sqlite_storage import search_terms
+
+
+class InMemoryTaskStorage(TaskStorage):
+    """
+    Process-local task storage for tests and benchmarks.
+
+    IDs are assigned in increasing order and dicts keep insertion order, so
+    iterating the dict is already ordered by ID. Nothing is persisted.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[int, TaskItem] = {}
+        self._last_id = 0
+
+    async def get_all(self) -> List[TaskItem]:
+        return [task.model_copy() for task in self._tasks.values()]
+
+    async def get_page(
+        self,
+        after_id: int,
+        limit: int,
+        is_complete: Optional[bool],
+        title_contains: Optional[str]
+    ) -> TaskPage:
+        needle = title_contains.lower() if title_contains else None
+        items: List[TaskItem] = []
+        has_more = False
+        for task in self._tasks.values():
+            if task.id <= after_id:
+                continue
+            if is_complete is not None and task.isComplete != is_complete:
+                continue
+            if needle and needle not in task.title.lower():
+                continue
+            if len(items) == limit:
+                has_more = True
+                break
+            items.append(task.model_copy())
+        return TaskPage(items=items, nextAfterId=items[-1].id if has_more else None)
+
+    async def get(self, task_id: int) -> Optional[TaskItem]:
+        task = self._tasks.get(task_id)
+        return task.model_copy() if task else None
+
+    async def search(self, query: str, limit: int) -> List[TaskItem]:
+        # Approximates the FTS5 backends: prefix-matched words, ranked by how many terms hit
+        terms = search_terms(query)
+        scored = []
+        for task in self._tasks.values():
+            words = search_terms(task.title)
+            score = sum(1 for term in terms if any(word.startswith(term) for word in words))
+            if score:
+                scored.append((-score, task.id, task))
+        scored.sort(key=lambda entry: entry[:2])
+        return [task.model_copy() for _, _, task in scored[:limit]]
+
+    def _insert(self, title: str, is_complete: bool) -> TaskItem:
+        self._last_id += 1
+        task = TaskItem(id=self._last_id, title=title, isComplete=is_complete)
+        self._tasks[task.id] = task
+        return task.model_copy()
+
+    def _update(
+        self,
+        task_id: int,
+        title: Optional[str],
+        is_complete: Optional[bool],
+        expected_version: Optional[int] = None
+    ) -> Optional[TaskItem]:
+        task = self._tasks.get(task_id)
+        if not task:
+            return None
+        if expected_version is not None and task.version != expected_version:
+            raise TaskVersionConflict(task_id, task.version)
+        if title is not None:
+            task.title = title
+        if is_complete is not None:
+            task.isComplete = is_complete
+        task.version += 1
+        return task.model_copy()
+
+    async def add(self, title: str, is_complete: bool) -> TaskItem:
+        return self._insert(title, is_complete)
+
+    async def update(
+        self,
+        task_id: int,
+        title: Optional[str],
+        is_complete: Optional[bool],
+        expected_version: Optional[int] = None
+    ) -> Optional[TaskItem]:
+        return self._update(task_id, title, is_complete, expected_version)
+
+    async def delete(self, task_id: int) -> bool:
+        return self._tasks.pop(task_id, None) is not None
+
+    async def apply_batch(
+        self,
+        create: List[TaskCreateRequest],
+        update: List[TaskBatchUpdate],
+        delete: List[int]
+    ) -> Tuple[List[TaskItem], List[int], List[int]]:
+        # No awaits below, so the batch is atomic with respect to other coroutines
+        created = [self._insert(t.title, bool(t.isComplete)) for t in create]
+        updated = [
+            task_id for task_id in dict.fromkeys(u.id for u in update) if task_id in self._tasks
+        ]
+        for u in update:
+            self._update(u.id, u.title, u.isComplete)
+        deleted = [task_id for task_id in dict.fromkeys(delete) if self._tasks.pop(task_id, None)]
+        return created, updated, deleted
+
+    async def close(self):
+        self._tasks.clear()
@@ -0,0 +1,215 @@
+import time
+import queue
+import sqlite3
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SQLiteEngine:
+    """
+    Connection-pooled SQLite engine.
+
+    The database runs in WAL journal mode so readers never wait for the writer:
+    - One writer connection, driven by a single-threaded executor
+    - N reader connections that stay open, one reader thread per connection
+    - Every connection keeps its own prepared statement cache
+
+    Group commit is opt-in: with group_commit_window set (in seconds), writes
+    from concurrent callers are collected for up to that long, or until
+    group_commit_max_batch are waiting, and committed as one transaction.
+    Each write runs in its own savepoint, so a failing write only fails its
+    own caller. Writes are write-behind: a queued write still runs even if
+    its caller is cancelled.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        readers: int = 4,
+        statement_cache_size: int = 128,
+        group_commit_window: Optional[float] = None,
+        group_commit_max_batch: int = 64
+    ):
+        if readers < 1:
+            raise ValueError("readers must be at least 1")
+        if group_commit_max_batch < 1:
+            raise ValueError("group_commit_max_batch must be at least 1")
+
+        self.db_path = db_path
+        self.readers = readers
+        self.statement_cache_size = statement_cache_size
+        self.group_commit_window = group_commit_window
+        self.group_commit_max_batch = group_commit_max_batch
+
+        # Writes waiting for the next group commit: (fn, caller future, enqueue time)
+        self._pending: List[Tuple[Callable, asyncio.Future, float]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batches = 0
+        self._grouped_writes = 0
+        self._max_batch_size = 0
+        self._commit_seconds = 0.0
+        self._max_commit_seconds = 0.0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+        self._writer = self._connect()
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._writer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+
+        # One open connection per reader thread, so acquiring never blocks
+        self._reader_pool: "queue.SimpleQueue[sqlite3.Connection]" = queue.SimpleQueue()
+        self._reader_connections = [self._connect() for _ in range(readers)]
+        for conn in self._reader_connections:
+            self._reader_pool.put(conn)
+        self._reader_executor = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="sqlite-reader")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection tuned for WAL mode."""
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=self.statement_cache_size
+        )
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def _run_read(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        conn = self._reader_pool.get()
+        try:
+            return fn(conn)
+        finally:
+            self._reader_pool.put(conn)
+
+    def _run_write(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        try:
+            result = fn(self._writer)
+            self._writer.commit()
+            return result
+        except Exception:
+            self._writer.rollback()
+            raise
+
+    def _run_group(self, batch: List[Callable]) -> Tuple[list, float]:
+        """Run a batch of writes in one transaction, isolating each in a savepoint."""
+        start = time.perf_counter()
+        conn = self._writer
+        outcomes = []
+        # Explicit BEGIN so releasing a savepoint never commits on its own
+        conn.execute("BEGIN")
+        try:
+            for fn in batch:
+                conn.execute("SAVEPOINT group_write")
+                try:
+                    outcomes.append((True, fn(conn)))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO group_write")
+                    outcomes.append((False, e))
+                conn.execute("RELEASE group_write")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return outcomes, time.perf_counter() - start
+
+    def _flush(self):
+        """Hand the pending writes to the writer thread as one group."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        loop = asyncio.get_running_loop()
+        group = loop.run_in_executor(self._writer_executor, self._run_group, [fn for fn, _, _ in batch])
+        group.add_done_callback(lambda done: self._deliver(batch, done))
+
+    def _deliver(self, batch: List[Tuple[Callable, asyncio.Future, float]], done: asyncio.Future):
+        """Resolve each caller's future with its own result, and record statistics."""
+        if done.exception() is not None:
+            # The commit itself failed, so none of the writes happened
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(done.exception())
+            return
+
+        outcomes, commit_seconds = done.result()
+        now = time.perf_counter()
+        self._batches += 1
+        self._grouped_writes += len(batch)
+        self._max_batch_size = max(self._max_batch_size, len(batch))
+        self._commit_seconds += commit_seconds
+        self._max_commit_seconds = max(self._max_commit_seconds, commit_seconds)
+        for (_, future, enqueued), (ok, value) in zip(batch, outcomes):
+            wait = now - enqueued
+            self._wait_seconds += wait
+            self._max_wait_seconds = max(self._max_wait_seconds, wait)
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    async def _write_grouped(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((fn, future, time.perf_counter()))
+        if len(self._pending) >= self.group_commit_max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.group_commit_window, self._flush)
+        return await future
+
+    def group_commit_stats(self) -> Optional[dict]:
+        """Batch size and latency statistics, or None when group commit is off."""
+        if not self.group_commit_window:
+            return None
+        return {
+            "windowMs": self.group_commit_window * 1000,
+            "maxBatch": self.group_commit_max_batch,
+            "pending": len(self._pending),
+            "batches": self._batches,
+            "writes": self._grouped_writes,
+            "avgBatchSize": self._grouped_writes / self._batches if self._batches else 0.0,
+            "maxBatchSize": self._max_batch_size,
+            "avgCommitMs": self._commit_seconds * 1000 / self._batches if self._batches else 0.0,
+            "maxCommitMs": self._max_commit_seconds * 1000,
+            "avgWaitMs": self._wait_seconds * 1000 / self._grouped_writes if self._grouped_writes else 0.0,
+            "maxWaitMs": self._max_wait_seconds * 1000
+        }
+
+    def write_sync(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Run fn in a write transaction and wait for it (for startup code)."""
+        return self._writer_executor.submit(self._run_write, fn).result()
+
+    async def read(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Run fn on a pooled reader connection."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._reader_executor, self._run_read, fn)
+
+    async def write(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Run fn on the writer connection and commit it, alone or as part of a group."""
+        if self.group_commit_window:
+            return await self._write_grouped(fn)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer_executor, self._run_write, fn)
+
+    async def drain(self):
+        """Commit any writes still waiting for a group commit."""
+        futures = [future for _, future, _ in self._pending]
+        self._flush()
+        if futures:
+            await asyncio.gather(*futures, return_exceptions=True)
+
+    def close(self):
+        """Shut down the executors and close every connection."""
+        self._reader_executor.shutdown(wait=True)
+        self._writer_executor.shutdown(wait=True)
+        for conn in self._reader_connections:
+            conn.close()
+        self._writer.close()
@@ -0,0 +1,338 @@
+import re
+import sqlite3
+from typing import List, Optional, Tuple
+from ..models import TaskItem, TaskPage, TaskCreateRequest, TaskBatchUpdate
+from .sqlite_engine import SQLiteEngine
+from .storage import TaskStorage, TaskVersionConflict
+
+# Statements are fixed strings so each connection's statement cache reuses them
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        isComplete BOOLEAN DEFAULT 0,
+        version INTEGER NOT NULL DEFAULT 1
+    )
+"""
+# Databases created before optimistic versioning lack the column
+ADD_VERSION_COLUMN = "ALTER TABLE tasks ADD COLUMN version INTEGER NOT NULL DEFAULT 1"
+
+# Serves status-filtered keyset scans: WHERE isComplete = ? AND id > ? ORDER BY id
+CREATE_STATUS_INDEX = "CREATE INDEX IF NOT EXISTS idx_tasks_isComplete ON tasks (isComplete, id)"
+# External-content FTS5 index over titles, kept in sync by triggers
+CREATE_FTS = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        title, content='tasks', content_rowid='id', tokenize='porter unicode61'
+    )
+"""
+CREATE_FTS_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, title) VALUES (new.id, new.title);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title) VALUES ('delete', old.id, old.title);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title ON tasks
+    WHEN old.title IS NOT new.title BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title) VALUES ('delete', old.id, old.title);
+        INSERT INTO tasks_fts(rowid, title) VALUES (new.id, new.title);
+    END
+    """,
+]
+SELECT_FTS_EXISTS = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'"
+REBUILD_FTS = "INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')"
+SEARCH = """
+    SELECT t.id, t.title, t.isComplete, t.version
+    FROM tasks_fts JOIN tasks t ON t.id = tasks_fts.rowid
+    WHERE tasks_fts MATCH ?
+    ORDER BY rank
+    LIMIT ?
+"""
+TASK_COLUMNS = "id, title, isComplete, version"
+SELECT_ALL = f"SELECT {TASK_COLUMNS} FROM tasks ORDER BY id"
+SELECT_BY_ID = f"SELECT {TASK_COLUMNS} FROM tasks WHERE id = ?"
+SELECT_VERSION = "SELECT version FROM tasks WHERE id = ?"
+INSERT = "INSERT INTO tasks (title, isComplete) VALUES (?, ?)"
+# Partial update in one statement: NULL parameters keep the stored value
+UPDATE_PARTIAL = """
+    UPDATE tasks
+    SET title = COALESCE(?, title), isComplete = COALESCE(?, isComplete), version = version + 1
+    WHERE id = ?
+"""
+# Same, guarded by an optional expected version and returning the new row
+PATCH = f"""
+    UPDATE tasks
+    SET title = COALESCE(:title, title), isComplete = COALESCE(:isComplete, isComplete), version = version + 1
+    WHERE id = :id AND (:expected IS NULL OR version = :expected)
+    RETURNING {TASK_COLUMNS}
+"""
+DELETE = "DELETE FROM tasks WHERE id = ?"
+SELECT_SEQUENCE = "SELECT seq FROM sqlite_sequence WHERE name = 'tasks'"
+
+# Stay under SQLite's bound-parameter limit for IN (...) lookups
+ID_CHUNK_SIZE = 500
+
+
+def initialize_schema(conn: sqlite3.Connection):
+    """Create the tasks table, its indexes and the FTS index (backfilling it on first creation)."""
+    conn.execute(CREATE_TABLE)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+    if "version" not in columns:
+        conn.execute(ADD_VERSION_COLUMN)
+    conn.execute(CREATE_STATUS_INDEX)
+    fts_exists = conn.execute(SELECT_FTS_EXISTS).fetchone() is not None
+    conn.execute(CREATE_FTS)
+    for trigger in CREATE_FTS_TRIGGERS:
+        conn.execute(trigger)
+    if not fts_exists:
+        conn.execute(REBUILD_FTS)
+
+
+def search_terms(query: str) -> List[str]:
+    """Split free text into lowercase word tokens."""
+    return re.findall(r"\w+", query.lower())
+
+
+def fts_match_expression(query: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 MATCH expression.
+
+    Each word becomes a quoted prefix term and terms are OR-ed, so FTS5
+    syntax characters in user text are inert and bm25 ranks the best matches
+    first. Returns None when the text has no searchable words.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return None
+    return " OR ".join(f'"{term}"*' for term in terms)
+
+
+def row_to_task(row) -> TaskItem:
+    return TaskItem(
+        id=row[0],
+        title=row[1],
+        isComplete=bool(row[2]),
+        version=row[3]
+    )
+
+
+def page_query(
+    after_id: int,
+    limit: int,
+    is_complete: Optional[bool],
+    title_contains: Optional[str]
+) -> Tuple[str, list]:
+    """Build the keyset page query. It fetches one extra row to detect a following page."""
+    clauses = ["id > ?"]
+    params: list = [after_id]
+    if is_complete is not None:
+        clauses.append("isComplete = ?")
+        params.append(1 if is_complete else 0)
+    if title_contains:
+        escaped = title_contains.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        clauses.append("title LIKE ? ESCAPE '\\'")
+        params.append(f"%{escaped}%")
+    params.append(limit + 1)
+    sql = (
+        f"SELECT {TASK_COLUMNS} FROM tasks WHERE "
+        + " AND ".join(clauses)
+        + " ORDER BY id LIMIT ?"
+    )
+    return sql, params
+
+
+def rows_to_page(rows, limit: int) -> TaskPage:
+    items = [row_to_task(row) for row in rows[:limit]]
+    next_after_id = items[-1].id if len(rows) > limit else None
+    return TaskPage(items=items, nextAfterId=next_after_id)
+
+
+def existing_ids_query(chunk: List[int]) -> str:
+    placeholders = ",".join("?" * len(chunk))
+    return f"SELECT id FROM tasks WHERE id IN ({placeholders})"
+
+
+def complete_param(is_complete: Optional[bool]) -> Optional[int]:
+    return None if is_complete is None else (1 if is_complete else 0)
+
+
+def update_params(updates: List[TaskBatchUpdate]) -> list:
+    return [(u.title, complete_param(u.isComplete), u.id) for u in updates]
+
+
+def patch_params(
+    task_id: int,
+    title: Optional[str],
+    is_complete: Optional[bool],
+    expected_version: Optional[int]
+) -> dict:
+    return {
+        "id": task_id,
+        "title": title,
+        "isComplete": complete_param(is_complete),
+        "expected": expected_version
+    }
+
+
+class SQLiteTaskStorage(TaskStorage):
+    """
+    Task storage on pooled sqlite3 connections.
+
+    Reads run concurrently on a pool of WAL-mode reader connections, while
+    writes are serialized on a single writer connection.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        readers: int = 4,
+        group_commit_window: Optional[float] = None,
+        group_commit_max_batch: int = 64
+    ):
+        self.db_path = db_path
+        self.engine = SQLiteEngine(
+            db_path,
+            readers=readers,
+            group_commit_window=group_commit_window,
+            group_commit_max_batch=group_commit_max_batch
+        )
+        self._initialize_database()
+
+    def _initialize_database(self):
+        """Initialize the SQLite database with tasks table."""
+        self.engine.write_sync(initialize_schema)
+        print("Tasks table initialized")
+
+    async def get_all(self) -> List[TaskItem]:
+        def get_tasks(conn: sqlite3.Connection):
+            rows = conn.execute(SELECT_ALL).fetchall()
+            return [row_to_task(row) for row in rows]
+
+        return await self.engine.read(get_tasks)
+
+    async def get_page(
+        self,
+        after_id: int,
+        limit: int,
+        is_complete: Optional[bool],
+        title_contains: Optional[str]
+    ) -> TaskPage:
+        sql, params = page_query(after_id, limit, is_complete, title_contains)
+
+        def get_page(conn: sqlite3.Connection):
+            return rows_to_page(conn.execute(sql, params).fetchall(), limit)
+
+        return await self.engine.read(get_page)
+
+    async def get(self, task_id: int) -> Optional[TaskItem]:
+        def get_task(conn: sqlite3.Connection):
+            row = conn.execute(SELECT_BY_ID, (task_id,)).fetchone()
+            return row_to_task(row) if row else None
+
+        return await self.engine.read(get_task)
+
+    async def search(self, query: str, limit: int) -> List[TaskItem]:
+        expression = fts_match_expression(query)
+        if expression is None:
+            return []
+
+        def search(conn: sqlite3.Connection):
+            rows = conn.execute(SEARCH, (expression, limit)).fetchall()
+            return [row_to_task(row) for row in rows]
+
+        return await self.engine.read(search)
+
+    async def add(self, title: str, is_complete: bool) -> TaskItem:
+        def create_task(conn: sqlite3.Connection):
+            cursor = conn.execute(INSERT, (title, 1 if is_complete else 0))
+            return TaskItem(
+                id=cursor.lastrowid,
+                title=title,
+                isComplete=is_complete
+            )
+
+        return await self.engine.write(create_task)
+
+    async def update(
+        self,
+        task_id: int,
+        title: Optional[str],
+        is_complete: Optional[bool],
+        expected_version: Optional[int] = None
+    ) -> Optional[TaskItem]:
+        params = patch_params(task_id, title, is_complete, expected_version)
+
+        def update(conn: sqlite3.Connection):
+            row = conn.execute(PATCH, params).fetchone()
+            if row:
+                return row_to_task(row)
+            # Nothing matched: tell a missing task apart from a stale version
+            if expected_version is not None:
+                current = conn.execute(SELECT_VERSION, (task_id,)).fetchone()
+                if current:
+                    raise TaskVersionConflict(task_id, current[0])
+            return None
+
+        return await self.engine.write(update)
+
+    async def delete(self, task_id: int) -> bool:
+        def delete(conn: sqlite3.Connection):
+            cursor = conn.execute(DELETE, (task_id,))
+            return cursor.rowcount > 0
+
+        return await self.engine.write(delete)
+
+    @staticmethod
+    def _insert_many(conn: sqlite3.Connection, tasks: List[TaskCreateRequest]) -> List[TaskItem]:
+        if not tasks:
+            return []
+        conn.executemany(
+            INSERT,
+            [(t.title, 1 if t.isComplete else 0) for t in tasks]
+        )
+        # AUTOINCREMENT ids are contiguous while this transaction holds the write lock
+        last_id = conn.execute(SELECT_SEQUENCE).fetchone()[0]
+        first_id = last_id - len(tasks) + 1
+        return [
+            TaskItem(id=first_id + i, title=t.title, isComplete=bool(t.isComplete))
+            for i, t in enumerate(tasks)
+        ]
+
+    @staticmethod
+    def _existing_ids(conn: sqlite3.Connection, task_ids: List[int]) -> List[int]:
+        found = set()
+        for start in range(0, len(task_ids), ID_CHUNK_SIZE):
+            chunk = task_ids[start:start + ID_CHUNK_SIZE]
+            rows = conn.execute(existing_ids_query(chunk), chunk).fetchall()
+            found.update(row[0] for row in rows)
+        return [task_id for task_id in dict.fromkeys(task_ids) if task_id in found]
+
+    async def apply_batch(
+        self,
+        create: List[TaskCreateRequest],
+        update: List[TaskBatchUpdate],
+        delete: List[int]
+    ) -> Tuple[List[TaskItem], List[int], List[int]]:
+        def apply(conn: sqlite3.Connection):
+            created = self._insert_many(conn, create)
+            updated = self._existing_ids(conn, [u.id for u in update]) if update else []
+            if update:
+                conn.executemany(UPDATE_PARTIAL, update_params(update))
+            deleted = self._existing_ids(conn, delete) if delete else []
+            if deleted:
+                conn.executemany(DELETE, [(task_id,) for task_id in deleted])
+            return created, updated, deleted
+
+        return await self.engine.write(apply)
+
+    def stats(self) -> dict:
+        return {"groupCommit": self.engine.group_commit_stats()}
+
+    async def close(self):
+        await self.engine.drain()
+        self.engine.close()
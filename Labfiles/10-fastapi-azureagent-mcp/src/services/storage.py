@@ -0,0 +1,117 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+from ..models import TaskItem, TaskPage, TaskCreateRequest, TaskBatchUpdate
+
+
+class TaskVersionConflict(Exception):
+    """Raised when an update's expected version no longer matches the stored task."""
+
+    def __init__(self, task_id: int, current_version: int):
+        super().__init__(f"Task {task_id} is at version {current_version}")
+        self.task_id = task_id
+        self.current_version = current_version
+
+
+class TaskStorage(ABC):
+    """
+    Storage backend interface behind TaskService.
+
+    Backends only persist and query tasks. Versioning, caching and other
+    cross-cutting behaviour stay in TaskService so every backend gets them.
+    """
+
+    @abstractmethod
+    async def get_all(self) -> List[TaskItem]:
+        """Return every task ordered by ID."""
+
+    @abstractmethod
+    async def get_page(
+        self,
+        after_id: int,
+        limit: int,
+        is_complete: Optional[bool],
+        title_contains: Optional[str]
+    ) -> TaskPage:
+        """Return up to limit tasks with an ID greater than after_id."""
+
+    @abstractmethod
+    async def get(self, task_id: int) -> Optional[TaskItem]:
+        """Return one task, or None if it does not exist."""
+
+    @abstractmethod
+    async def search(self, query: str, limit: int) -> List[TaskItem]:
+        """Return up to limit tasks whose titles best match the free-text query."""
+
+    @abstractmethod
+    async def add(self, title: str, is_complete: bool) -> TaskItem:
+        """Insert a task and return it with its new ID."""
+
+    @abstractmethod
+    async def update(
+        self,
+        task_id: int,
+        title: Optional[str],
+        is_complete: Optional[bool],
+        expected_version: Optional[int] = None
+    ) -> Optional[TaskItem]:
+        """
+        Update the given fields of a task and return the new row, or None if
+        it does not exist. Raises TaskVersionConflict when expected_version is
+        given and the stored version differs.
+        """
+
+    @abstractmethod
+    async def delete(self, task_id: int) -> bool:
+        """Delete a task. Returns False if it does not exist."""
+
+    @abstractmethod
+    async def apply_batch(
+        self,
+        create: List[TaskCreateRequest],
+        update: List[TaskBatchUpdate],
+        delete: List[int]
+    ) -> Tuple[List[TaskItem], List[int], List[int]]:
+        """Apply creates, updates and deletes atomically."""
+
+    def stats(self) -> dict:
+        """Backend-specific statistics for monitoring."""
+        return {}
+
+    @abstractmethod
+    async def close(self):
+        """Release connections and threads."""
+
+
+def create_storage(
+    backend: str,
+    db_path: str,
+    readers: int = 4,
+    group_commit_window: Optional[float] = None,
+    group_commit_max_batch: int = 64
+) -> TaskStorage:
+    """
+    Build the storage backend named by configuration.
+
+    Backends:
+    - sqlite    : Pooled WAL-mode sqlite3 connections on worker threads;
+                  the only backend that supports group commit
+    - aiosqlite : Native asyncio access through aiosqlite
+    - memory    : Process-local dict, for tests and benchmarks
+    """
+    if group_commit_window and backend != "sqlite":
+        raise ValueError(f"Group commit is not supported by the {backend} backend")
+    if backend == "sqlite":
+        from .sqlite_storage import SQLiteTaskStorage
+        return SQLiteTaskStorage(
+            db_path,
+            readers=readers,
+            group_commit_window=group_commit_window,
+            group_commit_max_batch=group_commit_max_batch
+        )
+    if backend == "aiosqlite":
+        from .aiosqlite_storage import AioSQLiteTaskStorage
+        return AioSQLiteTaskStorage(db_path)
+    if backend == "memory":
+        from .memory_storage import InMemoryTaskStorage
+        return InMemoryTaskStorage()
+    raise ValueError(f"Unknown task storage backend: {backend}")
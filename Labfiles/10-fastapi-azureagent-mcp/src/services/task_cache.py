@@ -0,0 +1,68 @@
+from typing import Dict, List, Optional
+from ..models import TaskItem
+
+
+class TaskCache:
+    """
+    Versioned in-process cache of task reads.
+
+    TaskService bumps a monotonically increasing data version on every
+    mutation. Entries are tagged with the version that was current when
+    their read started, so a read that raced with a write is never stored.
+    """
+
+    MISSING = object()
+
+    def __init__(self):
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._tasks: Dict[int, Optional[TaskItem]] = {}
+        self._listing: Optional[List[TaskItem]] = None
+
+    def invalidate(self, version: int):
+        """Move to a new data version and drop everything cached before it."""
+        self.version = version
+        self._tasks.clear()
+        self._listing = None
+
+    def get_task(self, task_id: int):
+        """Return the cached task, None for a known-missing ID, or MISSING."""
+        task = self._tasks.get(task_id, self.MISSING)
+        if task is self.MISSING and self._listing is not None:
+            # The full listing is cached, so the ID does not exist
+            task = None
+        self._count(task is not self.MISSING)
+        return task
+
+    def put_task(self, version: int, task_id: int, task: Optional[TaskItem]):
+        if version == self.version:
+            self._tasks[task_id] = task
+
+    def get_listing(self) -> Optional[List[TaskItem]]:
+        listing = self._listing
+        self._count(listing is not None)
+        return list(listing) if listing is not None else None
+
+    def put_listing(self, version: int, tasks: List[TaskItem]):
+        if version == self.version:
+            self._listing = list(tasks)
+            self._tasks.update((t.id, t) for t in tasks)
+
+    def _count(self, hit: bool):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size, for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": self.hits / lookups if lookups else 0.0,
+            "cachedTasks": len(self._tasks),
+            "listingCached": self._listing is not None
+        }
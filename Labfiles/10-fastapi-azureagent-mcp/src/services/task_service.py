@@ -1,148 +1,215 @@
-import sqlite3
 import asyncio
-from typing import List, Optional
-from concurrent.futures import ThreadPoolExecutor
-from ..models import TaskItem
+from typing import Awaitable, Callable, List, Optional, Tuple, TypeVar
+from ..models import (
+    TaskItem, TaskPage, TaskCreateRequest, TaskUpdateRequest, TaskBatchUpdate,
+    TaskChangeEvent, TaskChangeType
+)
+from .storage import TaskStorage, create_storage
+from .task_cache import TaskCache
+from .change_feed import TaskChangeHub
+
+T = TypeVar("T")
 
 
 class TaskService:
     """
     Service class for managing tasks with CRUD operations.
     This service provides all the necessary operations for task management.
+
+    Persistence is delegated to a TaskStorage backend chosen by name
+    ("sqlite", "aiosqlite" or "memory"). group_commit_window (seconds) opts
+    the sqlite backend into committing concurrent writes together. With
+    cache=True, task lookups and the full listing are served from a TaskCache
+    that is invalidated whenever data_version changes. Every committed change
+    is also published to the TaskChangeHub in self.changes, tagged with its
+    data_version; the hub gives each event its own sequence number.
     """
-    
-    def __init__(self):
-        self.db_path = "tasks.db"  # Persistent file-based database
-        self.executor = ThreadPoolExecutor(max_workers=1)
-        self._initialize_database()
-    
-    def _initialize_database(self):
-        """Initialize the SQLite database with tasks table."""
-        def init_db():
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS tasks (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    isComplete BOOLEAN DEFAULT 0
-                )
-            """)
-            conn.commit()
-            conn.close()
-            print("Tasks table initialized")
-        
-        # Run in thread pool to avoid blocking
-        self.executor.submit(init_db).result()
-    
+
+    DEFAULT_PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+    DEFAULT_SEARCH_LIMIT = 10
+
+    def __init__(
+        self,
+        db_path: str = "tasks.db",
+        readers: int = 4,
+        cache: bool = False,
+        backend: str = "sqlite",
+        storage: Optional[TaskStorage] = None,
+        group_commit_window: Optional[float] = None,
+        group_commit_max_batch: int = 64
+    ):
+        self.db_path = db_path  # Persistent file-based database
+        self.storage = storage or create_storage(
+            backend,
+            db_path,
+            readers=readers,
+            group_commit_window=group_commit_window,
+            group_commit_max_batch=group_commit_max_batch
+        )
+        self.data_version = 0  # Bumped after every committed mutation
+        self.cache = TaskCache() if cache else None
+        self.changes = TaskChangeHub()
+
+    def _bump_version(self):
+        self.data_version += 1
+        if self.cache:
+            self.cache.invalidate(self.data_version)
+
+    def _publish(self, change_type: TaskChangeType, task_id: int, **fields):
+        self.changes.publish([
+            TaskChangeEvent(version=self.data_version, type=change_type, id=task_id, **fields)
+        ])
+
+    async def _commit(self, write: Awaitable[T], on_commit: Callable[[T], None]) -> T:
+        """
+        Await a storage write, then bump the version and publish through on_commit.
+
+        Shielded, so a write that commits after its caller was cancelled is
+        still seen by the cache and the change feed.
+        """
+        async def write_and_publish() -> T:
+            result = await write
+            on_commit(result)
+            return result
+
+        return await asyncio.shield(write_and_publish())
+
+    def cache_stats(self) -> Optional[dict]:
+        """Cache hit/miss counters, or None when caching is disabled."""
+        return self.cache.stats() if self.cache else None
+
+    def storage_stats(self) -> dict:
+        """Backend statistics, such as group commit batch sizes and latencies."""
+        return self.storage.stats()
+
     async def get_all_tasks(self) -> List[TaskItem]:
         """Get all tasks from the database."""
-        def get_tasks():
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM tasks ORDER BY id")
-            rows = cursor.fetchall()
-            conn.close()
-            
-            return [
-                TaskItem(
-                    id=row[0],
-                    title=row[1],
-                    isComplete=bool(row[2])
-                )
-                for row in rows
-            ]
-        
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(self.executor, get_tasks)
-    
+        if self.cache:
+            cached = self.cache.get_listing()
+            if cached is not None:
+                return cached
+
+        version = self.data_version
+        tasks = await self.storage.get_all()
+        if self.cache:
+            self.cache.put_listing(version, tasks)
+        return tasks
+
+    async def get_tasks_page(
+        self,
+        after_id: Optional[int] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        is_complete: Optional[bool] = None,
+        title_contains: Optional[str] = None
+    ) -> TaskPage:
+        """
+        Get one page of tasks ordered by ID, using keyset pagination.
+
+        Pass the returned nextAfterId as after_id to fetch the following page;
+        it is None once the last page has been returned.
+        """
+        limit = max(1, min(limit, self.MAX_PAGE_SIZE))
+        return await self.storage.get_page(after_id or 0, limit, is_complete, title_contains)
+
+    async def search_tasks(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> List[TaskItem]:
+        """Full-text search over task titles, best matches first."""
+        limit = max(1, min(limit, self.MAX_PAGE_SIZE))
+        return await self.storage.search(query, limit)
+
     async def get_task_by_id(self, task_id: int) -> Optional[TaskItem]:
         """Get a task by its ID."""
-        def get_task():
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
-            row = cursor.fetchone()
-            conn.close()
-            
-            if row:
-                return TaskItem(
-                    id=row[0],
-                    title=row[1],
-                    isComplete=bool(row[2])
-                )
-            return None
-        
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(self.executor, get_task)
-    
+        if self.cache:
+            cached = self.cache.get_task(task_id)
+            if cached is not TaskCache.MISSING:
+                return cached
+
+        version = self.data_version
+        task = await self.storage.get(task_id)
+        if self.cache:
+            self.cache.put_task(version, task_id, task)
+        return task
+
     async def add_task(self, title: str, is_complete: bool = False) -> TaskItem:
         """Add a new task to the database."""
-        def create_task():
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO tasks (title, isComplete) VALUES (?, ?)",
-                (title, 1 if is_complete else 0)
-            )
-            task_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
-            
-            return TaskItem(
-                id=task_id,
-                title=title,
-                isComplete=is_complete
-            )
-        
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(self.executor, create_task)
-    
-    async def update_task(self, task_id: int, title: Optional[str] = None, is_complete: Optional[bool] = None) -> bool:
-        """Update a task by its ID."""
-        def update():
-            # First get current task to preserve existing values
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT title, isComplete FROM tasks WHERE id = ?", (task_id,))
-            row = cursor.fetchone()
-            
-            if not row:
-                conn.close()
-                return False
-            
-            current_title, current_complete = row
-            updated_title = title if title is not None else current_title
-            updated_complete = is_complete if is_complete is not None else bool(current_complete)
-            
-            cursor.execute(
-                "UPDATE tasks SET title = ?, isComplete = ? WHERE id = ?",
-                (updated_title, 1 if updated_complete else 0, task_id)
-            )
-            changes = cursor.rowcount
-            conn.commit()
-            conn.close()
-            
-            return changes > 0
-        
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(self.executor, update)
-    
+        def on_commit(task: TaskItem):
+            self._bump_version()
+            self._publish(TaskChangeType.INSERT, task.id, task=task)
+
+        return await self._commit(self.storage.add(title, is_complete), on_commit)
+
+    async def update_task(
+        self,
+        task_id: int,
+        title: Optional[str] = None,
+        is_complete: Optional[bool] = None,
+        expected_version: Optional[int] = None
+    ) -> Optional[TaskItem]:
+        """
+        Update a task by its ID and return the updated task, or None if it
+        does not exist. With expected_version, raises TaskVersionConflict if
+        the task has changed since that version was read.
+        """
+        def on_commit(updated: Optional[TaskItem]):
+            if updated:
+                self._bump_version()
+                self._publish(TaskChangeType.UPDATE, task_id, changes=TaskUpdateRequest(title=title, isComplete=is_complete))
+
+        return await self._commit(self.storage.update(task_id, title, is_complete, expected_version), on_commit)
+
     async def delete_task(self, task_id: int) -> bool:
         """Delete a task by its ID."""
-        def delete():
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
-            changes = cursor.rowcount
-            conn.commit()
-            conn.close()
-            
-            return changes > 0
-        
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(self.executor, delete)
-    
-    def close(self):
-        """Close the database connection and thread pool."""
-        self.executor.shutdown(wait=True)
+        def on_commit(deleted: bool):
+            if deleted:
+                self._bump_version()
+                self._publish(TaskChangeType.DELETE, task_id)
+
+        return await self._commit(self.storage.delete(task_id), on_commit)
+
+    async def add_tasks(self, tasks: List[TaskCreateRequest]) -> List[TaskItem]:
+        """Add several tasks in a single transaction."""
+        created, _, _ = await self.apply_batch(tasks, [], [])
+        return created
+
+    async def update_tasks(self, updates: List[TaskBatchUpdate]) -> List[int]:
+        """Update several tasks in a single transaction. Returns the IDs that existed."""
+        _, updated, _ = await self.apply_batch([], updates, [])
+        return updated
+
+    async def delete_tasks(self, task_ids: List[int]) -> List[int]:
+        """Delete several tasks in a single transaction. Returns the IDs that were deleted."""
+        _, _, deleted = await self.apply_batch([], [], task_ids)
+        return deleted
+
+    async def apply_batch(
+        self,
+        create: List[TaskCreateRequest],
+        update: List[TaskBatchUpdate],
+        delete: List[int]
+    ) -> Tuple[List[TaskItem], List[int], List[int]]:
+        """Apply creates, updates and deletes together as one transaction."""
+        def on_commit(result: Tuple[List[TaskItem], List[int], List[int]]):
+            created, updated, deleted = result
+            if not (created or updated or deleted):
+                return
+            self._bump_version()
+
+            version = self.data_version
+            existing = set(updated)
+            self.changes.publish(
+                [TaskChangeEvent(version=version, type=TaskChangeType.INSERT, id=t.id, task=t) for t in created]
+                + [
+                    TaskChangeEvent(
+                        version=version, type=TaskChangeType.UPDATE, id=u.id,
+                        changes=TaskUpdateRequest(title=u.title, isComplete=u.isComplete)
+                    )
+                    for u in update if u.id in existing
+                ]
+                + [TaskChangeEvent(version=version, type=TaskChangeType.DELETE, id=task_id) for task_id in deleted]
+            )
+
+        return await self._commit(self.storage.apply_batch(create, update, delete), on_commit)
+
+    async def close(self):
+        """Close the storage backend's connections and threads."""
+        await self.storage.close()
@@ -0,0 +1,76 @@
+"""
+Shared fixtures. Async tests run on asyncio through anyio's pytest plugin,
+marked with @pytest.mark.anyio.
+"""
+
+import time
+import socket
+import asyncio
+import threading
+from typing import Callable, List
+
+import pytest
+import uvicorn
+from fastapi import FastAPI
+
+from src.services import TaskService
+from src.routes import create_api_routes
+from src.agents.startup import AgentStartup
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def task_service(tmp_path):
+    service = TaskService(str(tmp_path / "tasks.db"))
+    yield service
+    await service.close()
+
+
+def api_app(task_service: TaskService, agents: AgentStartup = None) -> FastAPI:
+    """The /api routes alone, without TaskManagerApp's agents and static files."""
+    app = FastAPI()
+    app.include_router(create_api_routes(task_service, agents or AgentStartup()), prefix="/api")
+    return app
+
+
+@pytest.fixture
+def api_app_factory() -> Callable[..., FastAPI]:
+    return api_app
+
+
+@pytest.fixture
+def task_manager_app(tmp_path, monkeypatch):
+    """The TaskManagerApp class; importing src.app builds a default app, which opens tasks.db in the working directory."""
+    monkeypatch.chdir(tmp_path)
+    from src.app import TaskManagerApp
+    return TaskManagerApp
+
+
+@pytest.fixture
+def live_server() -> Callable[[FastAPI], str]:
+    """Serves apps under uvicorn on their own thread and event loop; returns a function giving each one's base URL."""
+    servers: List[tuple] = []
+
+    def start(app) -> str:
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        thread = threading.Thread(target=lambda: asyncio.run(server.serve()), daemon=True)
+        thread.start()
+        deadline = time.monotonic() + 10
+        while not server.started:
+            if not thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("uvicorn did not start")
+            time.sleep(0.01)
+        servers.append((server, thread))
+        return f"http://127.0.0.1:{port}"
+
+    yield start
+    for server, thread in servers:
+        server.should_exit = True
+        thread.join(timeout=10)
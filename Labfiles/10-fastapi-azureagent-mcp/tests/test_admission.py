@@ -0,0 +1,141 @@
+import gc
+import asyncio
+
+import httpx
+import pytest
+
+from benchmarks.stubs import StubLangGraphAgent
+from src.agents.startup import AgentStartup
+from src.routes.admission import AdmissionController, AdmissionRejected
+from src.routes.api import chat_event_stream
+
+
+@pytest.mark.anyio
+async def test_requests_over_the_limit_wait_in_turn_and_are_rejected_when_the_queue_is_full():
+    controller = AdmissionController(max_concurrent=1, max_queue=1)
+    release = await controller.acquire()
+    waiter = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        await controller.acquire()
+    assert rejected.value.retry_after >= 1
+    assert controller.stats()["rejected"]["queue_full"] == 1
+
+    release()
+    (await waiter)()
+    assert controller.active == 0
+
+
+@pytest.mark.anyio
+async def test_queued_request_is_rejected_after_max_wait():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, max_wait=0.05)
+    release = await controller.acquire()
+
+    with pytest.raises(AdmissionRejected):
+        await controller.acquire()
+    assert controller.stats()["rejected"]["timeout"] == 1
+    assert controller.queued == 0
+    release()
+    assert controller.active == 0
+
+
+@pytest.mark.anyio
+async def test_cancelled_waiter_gives_up_its_place_without_leaking_a_slot():
+    controller = AdmissionController(max_concurrent=1, max_queue=2)
+    release = await controller.acquire()
+    cancelled = asyncio.create_task(controller.acquire())
+    waiter = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0)
+
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    release()
+    (await waiter)()
+    assert (controller.active, controller.queued) == (0, 0)
+
+
+@pytest.mark.anyio
+async def test_fair_admission_lets_sessions_take_turns():
+    controller = AdmissionController(max_concurrent=1, max_queue=10, fair=True)
+    release = await controller.acquire("busy")
+    order = []
+
+    async def request(session_id: str):
+        async with controller.admit(session_id):
+            order.append(session_id)
+
+    requests = [asyncio.create_task(request(s)) for s in ("busy", "busy", "busy", "other")]
+    await asyncio.sleep(0)
+    release()
+    await asyncio.gather(*requests)
+    assert order == ["busy", "other", "busy", "busy"]
+
+
+@pytest.fixture
+def agents(task_service):
+    agents = AgentStartup()
+    agents.agents["langgraph"] = StubLangGraphAgent(task_service, model_latency=0.3)
+    agents.status["langgraph"] = "ready"
+    return agents
+
+
+@pytest.fixture
+async def client(task_service, agents, api_app_factory, monkeypatch):
+    monkeypatch.setenv("LANGGRAPH_CHAT_MAX_CONCURRENT", "1")
+    monkeypatch.setenv("LANGGRAPH_CHAT_MAX_QUEUE", "0")
+    transport = httpx.ASGITransport(app=api_app_factory(task_service, agents))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.anyio
+async def test_chat_over_the_limit_is_answered_429_with_retry_after(client):
+    first = asyncio.create_task(client.post("/api/chat/langgraph", json={"message": "hi"}))
+    await asyncio.sleep(0.1)
+
+    response = await client.post("/api/chat/langgraph", json={"message": "hi"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert (await first).status_code == 200
+
+
+@pytest.mark.anyio
+async def test_stream_holds_its_slot_until_it_ends(client):
+    response = await client.post("/api/chat/langgraph/stream", json={"message": "hi"})
+    assert response.status_code == 200
+    assert "event: done" in response.text
+
+    stats = (await client.get("/api/chat/admission")).json()["langgraph"]
+    assert (stats["active"], stats["admitted"]) == (0, 1)
+
+
+@pytest.mark.anyio
+async def test_chat_agent_still_starting_or_failed_is_answered_503(client, agents):
+    agents.agents.clear()
+    agents.status["langgraph"] = "starting"
+    response = await client.post("/api/chat/langgraph", json={"message": "hi"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+    agents.status["langgraph"] = "failed"
+    response = await client.post("/api/chat/langgraph", json={"message": "hi"})
+    assert response.status_code == 503
+    assert "Retry-After" not in response.headers
+
+
+def test_stream_collected_after_its_loop_closed_still_releases_its_slot():
+    released = []
+
+    async def no_events():
+        return
+        yield
+
+    async def build():
+        return chat_event_stream("Stub", no_events(), on_close=lambda: released.append(True))
+
+    # The client left before the stream started, and the loop is gone by the time it is collected
+    response = asyncio.run(build())
+    del response
+    gc.collect()
+    assert released == [True]
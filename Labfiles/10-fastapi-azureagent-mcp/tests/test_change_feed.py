@@ -0,0 +1,86 @@
+import json
+from typing import List, Optional, Tuple
+
+import httpx
+import pytest
+
+from src.models import TaskChangeEvent, TaskChangeType
+from src.services.change_feed import TaskChangeHub
+
+
+def change(task_id: int, version: int = 1) -> TaskChangeEvent:
+    return TaskChangeEvent(version=version, type=TaskChangeType.DELETE, id=task_id)
+
+
+def test_events_of_one_batch_get_their_own_sequence_numbers():
+    hub = TaskChangeHub()
+    hub.publish([change(1), change(2), change(3)])
+
+    assert [e.seq for e in hub.events_since(0)] == [1, 2, 3]
+    # Resuming from the middle of the batch returns the rest of it
+    assert [e.id for e in hub.events_since(1)] == [2, 3]
+    assert hub.events_since(3) == []
+
+
+def test_resume_needs_a_snapshot_when_history_is_gone_or_ahead():
+    hub = TaskChangeHub(history_size=2)
+    hub.publish([change(1), change(2), change(3)])
+
+    assert hub.events_since(0) is None
+    assert [e.id for e in hub.events_since(2)] == [3]
+    assert hub.events_since(4) is None
+
+
+def test_event_ids_from_another_process_are_not_resumed_from():
+    hub, restarted = TaskChangeHub(), TaskChangeHub()
+
+    assert hub.parse_event_id(hub.event_id(5)) == 5
+    assert restarted.parse_event_id(hub.event_id(5)) is None
+    assert hub.parse_event_id("5") is None
+    assert hub.parse_event_id("garbage") is None
+
+
+async def read_events(client: httpx.AsyncClient, count: int, headers: Optional[dict] = None) -> List[Tuple[str, str, dict]]:
+    """The first count (id, event, data) frames of the task stream."""
+    frames, frame = [], {}
+    async with client.stream("GET", "/api/tasks/stream", headers=headers) as response:
+        async for line in response.aiter_lines():
+            if line:
+                field, _, value = line.partition(": ")
+                frame[field] = value
+            elif "event" in frame:
+                frames.append((frame["id"], frame["event"], json.loads(frame["data"])))
+                if len(frames) == count:
+                    return frames
+                frame = {}
+    return frames
+
+
+@pytest.mark.anyio
+async def test_reconnect_mid_batch_resumes_with_the_rest_of_the_batch(task_service, api_app_factory, live_server):
+    base_url = live_server(api_app_factory(task_service))
+    async with httpx.AsyncClient(base_url=base_url, timeout=5) as client:
+        snapshot_id, event, _ = (await read_events(client, 1))[0]
+        assert event == "snapshot"
+
+        response = await client.post("/api/tasks/batch", json={"create": [{"title": f"task {i}"} for i in range(3)]})
+        response.raise_for_status()
+        frames = await read_events(client, 3, {"Last-Event-ID": snapshot_id})
+        assert [(event, data["task"]["title"]) for _, event, data in frames] == [
+            ("change", "task 0"), ("change", "task 1"), ("change", "task 2")
+        ]
+
+        # The connection dropped after the batch's first event
+        frames = await read_events(client, 2, {"Last-Event-ID": frames[0][0]})
+        assert [data["task"]["title"] for _, _, data in frames] == ["task 1", "task 2"]
+
+
+@pytest.mark.anyio
+async def test_last_event_id_from_before_a_restart_starts_with_a_snapshot(task_service, api_app_factory, live_server):
+    base_url = live_server(api_app_factory(task_service))
+    stale_id = TaskChangeHub().event_id(1)
+    async with httpx.AsyncClient(base_url=base_url, timeout=5) as client:
+        (await client.post("/api/tasks/batch", json={"create": [{"title": "kept"}]})).raise_for_status()
+        _, event, data = (await read_events(client, 1, {"Last-Event-ID": stale_id}))[0]
+    assert event == "snapshot"
+    assert [t["title"] for t in data["tasks"]] == ["kept"]
@@ -0,0 +1,36 @@
+import time
+
+from azure.core.credentials import AccessToken
+
+from src.agents.credentials import CachedCredential
+
+
+class ShortLivedCredential:
+    """Hands out numbered tokens that expire lifetime seconds after they are fetched."""
+
+    def __init__(self, lifetime: int):
+        self.lifetime = lifetime
+        self.fetches = 0
+
+    def get_token(self, *scopes, **kwargs) -> AccessToken:
+        self.fetches += 1
+        return AccessToken(f"token-{self.fetches}", int(time.time()) + self.lifetime)
+
+
+def test_tokens_shorter_lived_than_the_margin_are_cached_and_refreshed_once():
+    source = ShortLivedCredential(lifetime=8)
+    credential = CachedCredential(source, refresh_margin=300)
+    try:
+        assert credential.get_token("scope").token == "token-1"
+        # The margin is cut to a quarter of the lifetime, so the token is served from the cache
+        assert credential.get_token("scope").token == "token-1"
+        time.sleep(0.5)
+        assert source.fetches == 1
+
+        # Refreshed once half way through its life, not again and again
+        time.sleep(4.5)
+        assert source.fetches == 2
+        assert credential.get_token("scope").token == "token-2"
+        assert credential.stats()["refreshes"] == 1
+    finally:
+        credential.close()
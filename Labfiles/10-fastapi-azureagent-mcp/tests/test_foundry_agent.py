@@ -0,0 +1,161 @@
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.stubs import SimulatedAgentsService, StubLangGraphAgent
+from src.agents import FoundryTaskAgent
+from src.models import ChatStreamEventType
+from src.services import TaskService
+
+
+@pytest.mark.anyio
+async def test_disconnected_stream_cancels_its_run_before_the_next_message():
+    service = SimulatedAgentsService(api_latency=0.01, run_seconds=1.0)
+    agent = FoundryTaskAgent({}, project_client=service)
+
+    stream = agent.stream_message("first", "session")
+    event = await stream.__anext__()
+    assert event.type == ChatStreamEventType.TOKEN
+    # The client goes away mid-reply
+    await stream.aclose()
+    assert len(service.cancelled_runs) == 1
+
+    reply = await agent.process_message("second", "session")
+    assert reply.content.startswith("Simulated reply for")
+
+
+@pytest.mark.anyio
+async def test_stream_cancelled_before_its_first_run_event_cancels_its_run():
+    service = SimulatedAgentsService(api_latency=0.2, run_seconds=1.0)
+    agent = FoundryTaskAgent({}, project_client=service)
+
+    async def first_event():
+        return await agent.stream_message("first", "session").__anext__()
+
+    # Creating the thread and the message take 0.4s; the run is being opened
+    request = asyncio.create_task(first_event())
+    await asyncio.sleep(0.5)
+    request.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await request
+    assert len(service.cancelled_runs) == 1
+
+    reply = await agent.process_message("second", "session")
+    assert reply.content.startswith("Simulated reply for")
+
+
+@pytest.mark.anyio
+async def test_stream_reads_leave_the_default_executor_free():
+    service = SimulatedAgentsService(api_latency=0.01, run_seconds=1.0)
+    agent = FoundryTaskAgent({}, project_client=service)
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=1))
+
+    async def read_all(session_id: str):
+        return [event async for event in agent.stream_message("hi", session_id)]
+
+    streams = [asyncio.create_task(read_all(f"s{i}")) for i in range(2)]
+    await asyncio.sleep(0.3)
+    start = time.perf_counter()
+    await asyncio.to_thread(lambda: None)
+    assert time.perf_counter() - start < 0.1
+    assert all(events[-1].type == ChatStreamEventType.TOKEN for events in await asyncio.gather(*streams))
+    await agent.cleanup()
+
+
+@pytest.mark.anyio
+async def test_cancelled_request_cancels_its_run_before_the_next_message():
+    service = SimulatedAgentsService(api_latency=0.01, run_seconds=1.0)
+    agent = FoundryTaskAgent({}, project_client=service)
+
+    request = asyncio.create_task(agent.process_message("first", "session"))
+    await asyncio.sleep(0.3)
+    request.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await request
+    assert len(service.cancelled_runs) == 1
+
+    reply = await agent.process_message("second", "session")
+    assert reply.content.startswith("Simulated reply for")
+
+
+@pytest.mark.anyio
+async def test_task_routes_answer_while_foundry_runs_are_in_progress(task_service, task_manager_app, live_server):
+    # Every SDK call blocks for half a second, as a slow HTTP round trip would
+    service = SimulatedAgentsService(api_latency=0.5, run_seconds=2.0)
+
+    async def create_foundry_agent(exit_stack):
+        return await asyncio.to_thread(FoundryTaskAgent, {}, project_client=service)
+
+    app = task_manager_app(
+        task_service=task_service,
+        langgraph_agent=StubLangGraphAgent(task_service),
+        foundry_agent_factory=create_foundry_agent
+    ).get_app()
+    async with httpx.AsyncClient(base_url=live_server(app), timeout=30) as client:
+        while (await client.get("/ready")).status_code != 200:
+            await asyncio.sleep(0.05)
+
+        chats = [
+            asyncio.create_task(client.post("/api/chat/foundry", json={"message": "hi", "sessionId": f"s{i}"}))
+            for i in range(4)
+        ]
+        latencies = []
+        while not all(chat.done() for chat in chats):
+            start = time.perf_counter()
+            assert (await client.get("/api/tasks")).status_code == 200
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.05)
+
+        assert all(chat.result().status_code == 200 for chat in chats)
+    assert len(latencies) > 10
+    assert max(latencies) < 0.25
+
+
+def test_app_shutdown_deletes_session_threads(tmp_path, task_manager_app):
+    task_service = TaskService(str(tmp_path / "tasks.db"))
+    service = SimulatedAgentsService(api_latency=0.01, run_seconds=0.1)
+
+    async def create_foundry_agent(exit_stack):
+        return FoundryTaskAgent({}, project_client=service)
+
+    app = task_manager_app(
+        task_service=task_service,
+        langgraph_agent=StubLangGraphAgent(task_service),
+        foundry_agent_factory=create_foundry_agent
+    ).get_app()
+    with TestClient(app) as client:
+        while client.get("/ready").status_code != 200:
+            time.sleep(0.05)
+        for session_id in ("a", "b"):
+            assert client.post("/api/chat/foundry", json={"message": "hi", "sessionId": session_id}).status_code == 200
+        assert len(service._messages) == 2
+    assert service._messages == {}
+
+
+def test_app_shutdown_finishes_when_deleting_the_foundry_agent_fails(tmp_path, task_manager_app):
+    task_service = TaskService(str(tmp_path / "tasks.db"), group_commit_window=60)
+    service = SimulatedAgentsService(api_latency=0.01, run_seconds=0.1)
+
+    def delete_agent(agent_id):
+        raise RuntimeError("Azure is unreachable")
+
+    service.agents.delete_agent = delete_agent
+
+    async def create_foundry_agent(exit_stack):
+        return FoundryTaskAgent({}, project_client=service)
+
+    app = task_manager_app(
+        task_service=task_service,
+        langgraph_agent=StubLangGraphAgent(task_service),
+        foundry_agent_factory=create_foundry_agent
+    ).get_app()
+    with TestClient(app) as client:
+        while client.get("/ready").status_code != 200:
+            time.sleep(0.05)
+        write = client.portal.start_task_soon(task_service.add_task, "written at shutdown")
+    # The write waiting for its group commit is still committed
+    assert write.result(timeout=5).title == "written at shutdown"
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.stubs import StubFoundryAgent, StubLangGraphAgent
+from src.services import TaskService, TaskVersionConflict
+
+
+@pytest.mark.anyio
+async def test_concurrent_writes_commit_as_one_group(tmp_path):
+    service = TaskService(str(tmp_path / "tasks.db"), group_commit_window=0.05)
+    try:
+        tasks = await asyncio.gather(*(service.add_task(f"task {i}") for i in range(10)))
+        stats = service.storage_stats()["groupCommit"]
+        assert stats["batches"] == 1
+        assert stats["writes"] == 10
+        assert len({task.id for task in tasks}) == 10
+    finally:
+        await service.close()
+
+
+@pytest.mark.anyio
+async def test_failing_write_fails_only_its_caller(tmp_path):
+    service = TaskService(str(tmp_path / "tasks.db"), group_commit_window=0.05)
+    try:
+        task = await service.add_task("original")
+        stale_version = task.version
+        await service.update_task(task.id, title="changed")
+
+        results = await asyncio.gather(
+            service.add_task("before"),
+            service.update_task(task.id, title="lost", expected_version=stale_version),
+            service.add_task("after"),
+            return_exceptions=True
+        )
+        assert isinstance(results[1], TaskVersionConflict)
+        titles = sorted(t.title for t in await service.get_all_tasks())
+        assert titles == ["after", "before", "changed"]
+    finally:
+        await service.close()
+
+
+@pytest.mark.anyio
+async def test_close_commits_writes_waiting_for_the_window(tmp_path):
+    db_path = str(tmp_path / "tasks.db")
+    service = TaskService(db_path, group_commit_window=60)
+    writes = [asyncio.create_task(service.add_task(f"task {i}")) for i in range(3)]
+    # Long enough for the writes to reach the writer, far short of the window
+    await asyncio.sleep(0.05)
+    assert service.storage_stats()["groupCommit"]["pending"] == 3
+
+    await service.close()
+    assert [t.title for t in await asyncio.gather(*writes)] == ["task 0", "task 1", "task 2"]
+
+    reopened = TaskService(db_path)
+    try:
+        assert len(await reopened.get_all_tasks()) == 3
+    finally:
+        await reopened.close()
+
+
+@pytest.mark.anyio
+async def test_write_committed_after_its_caller_was_cancelled_is_still_published(tmp_path):
+    service = TaskService(str(tmp_path / "tasks.db"), cache=True, group_commit_window=0.1)
+    try:
+        task = await service.add_task("original")
+        assert (await service.get_task_by_id(task.id)).title == "original"
+
+        # The caller goes away while the write waits for its group
+        write = asyncio.create_task(service.update_task(task.id, title="changed"))
+        await asyncio.sleep(0.02)
+        write.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await write
+        await asyncio.sleep(0.2)
+
+        assert (await service.get_task_by_id(task.id)).title == "changed"
+        assert [e.type.value for e in service.changes.events_since(0)] == ["insert", "update"]
+    finally:
+        await service.close()
+
+def test_app_shutdown_commits_writes_waiting_for_the_window(tmp_path, task_manager_app):
+    db_path = str(tmp_path / "group.db")
+    service = TaskService(db_path, group_commit_window=60)
+    app = task_manager_app(
+        task_service=service,
+        langgraph_agent=StubLangGraphAgent(service),
+        foundry_agent_factory=StubFoundryAgent.factory()
+    ).get_app()
+
+    with TestClient(app) as client:
+        write = client.portal.start_task_soon(service.add_task, "written at shutdown")
+    assert write.result(timeout=5).title == "written at shutdown"
+
+    reopened = TaskService(db_path)
+    try:
+        assert [t.title for t in asyncio.run(reopened.get_all_tasks())] == ["written at shutdown"]
+    finally:
+        asyncio.run(reopened.close())
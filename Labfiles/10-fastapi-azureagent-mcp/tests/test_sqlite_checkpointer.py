@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+from benchmarks.stubs import ReplyChatModel
+from src.agents import LangGraphTaskAgent
+from src.agents.sqlite_checkpointer import SQLiteCheckpointer
+
+
+@pytest.fixture
+async def sqlite_agent(task_service, monkeypatch):
+    """Builds LangGraph agents sharing checkpoints.db next to the task database, and closes them after the test."""
+    monkeypatch.setenv("LANGGRAPH_CHECKPOINTER", "sqlite")
+    monkeypatch.setenv("LANGGRAPH_MAX_SESSIONS", "3")
+    monkeypatch.setenv("LANGGRAPH_MAX_CHECKPOINTS_PER_THREAD", "2")
+    # Compaction is run by the tests
+    monkeypatch.setenv("LANGGRAPH_COMPACTION_INTERVAL_SECONDS", "0")
+    agents = []
+
+    def build() -> LangGraphTaskAgent:
+        agent = LangGraphTaskAgent(task_service, llm=ReplyChatModel())
+        agents.append(agent)
+        return agent
+
+    yield build
+    for agent in agents:
+        await agent.aclose()
+
+
+async def thread_messages(agent: LangGraphTaskAgent, session_id: str) -> list:
+    thread_id = await agent.memory.thread_for_session(session_id)
+    state = await agent.agent.aget_state({"configurable": {"thread_id": thread_id}})
+    return state.values.get("messages", [])
+
+
+@pytest.mark.anyio
+async def test_another_agent_on_the_same_database_continues_the_session(sqlite_agent):
+    first, second = sqlite_agent(), sqlite_agent()
+    assert isinstance(first.memory, SQLiteCheckpointer)
+
+    await first.process_message("Remember the number 7", session_id="s")
+    await second.process_message("What was the number?", session_id="s")
+
+    messages = await thread_messages(first, "s")
+    assert [m.content for m in messages if m.type == "human"] == ["Remember the number 7", "What was the number?"]
+
+
+@pytest.mark.anyio
+async def test_compaction_keeps_the_most_recent_sessions_and_checkpoints(sqlite_agent):
+    agent = sqlite_agent()
+    for i in range(5):
+        await agent.process_message(f"Remember the number {i}", session_id=f"s{i}")
+        await agent.process_message("And again", session_id=f"s{i}")
+
+    result = await agent.memory.compact()
+    stats = await agent.memory.stats()
+    assert result["threadsPruned"] == 2
+    assert stats["threads"] == stats["sessions"] == 3
+    assert stats["checkpoints"] <= 3 * 2
+    # The newest checkpoint of a kept session still holds its whole conversation
+    assert len(await thread_messages(agent, "s4")) == 4
+
+
+@pytest.mark.anyio
+async def test_compaction_deletes_idle_sessions(sqlite_agent, monkeypatch):
+    monkeypatch.setenv("LANGGRAPH_SESSION_TTL_SECONDS", "60")
+    agent = sqlite_agent()
+    await agent.process_message("Remember the number 1", session_id="idle")
+
+    later = time.time() + 120
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert (await agent.memory.compact())["threadsPruned"] == 1
+    assert await thread_messages(agent, "idle") == []
@@ -0,0 +1,52 @@
+import httpx
+import pytest
+
+
+@pytest.fixture
+async def client(task_service, api_app_factory):
+    transport = httpx.ASGITransport(app=api_app_factory(task_service))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.anyio
+async def test_get_with_current_etag_is_not_modified(client):
+    task = (await client.post("/api/tasks/batch", json={"create": [{"title": "write report"}]})).json()["created"][0]
+
+    response = await client.get(f"/api/tasks/{task['id']}")
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+
+    response = await client.get(f"/api/tasks/{task['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    await client.patch(f"/api/tasks/{task['id']}", json={"isComplete": True})
+    response = await client.get(f"/api/tasks/{task['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.anyio
+async def test_patch_with_stale_if_match_fails_with_current_etag(client):
+    task = (await client.post("/api/tasks/batch", json={"create": [{"title": "write report"}]})).json()["created"][0]
+    etag = (await client.get(f"/api/tasks/{task['id']}")).headers["ETag"]
+
+    response = await client.patch(f"/api/tasks/{task['id']}", json={"title": "first"}, headers={"If-Match": etag})
+    assert response.status_code == 200
+    current = response.headers["ETag"]
+
+    response = await client.patch(f"/api/tasks/{task['id']}", json={"title": "second"}, headers={"If-Match": etag})
+    assert response.status_code == 412
+    assert response.headers["ETag"] == current
+    assert (await client.get(f"/api/tasks/{task['id']}")).json()["title"] == "first"
+
+
+@pytest.mark.anyio
+async def test_patch_if_match_must_be_an_etag(client):
+    task = (await client.post("/api/tasks/batch", json={"create": [{"title": "write report"}]})).json()["created"][0]
+
+    response = await client.patch(f"/api/tasks/{task['id']}", json={"title": "x"}, headers={"If-Match": "nonsense"})
+    assert response.status_code == 400
+    response = await client.patch(f"/api/tasks/{task['id']}", json={"title": "x"}, headers={"If-Match": "*"})
+    assert response.status_code == 200
@@ -0,0 +1,73 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.agents.tool_cache import ToolResultCache
+
+
+class CountingTool:
+    """A slow tool returning the number of times it has been called."""
+
+    def __init__(self, delay: float = 0.05, is_error: bool = False):
+        self.delay = delay
+        self.is_error = is_error
+        self.calls = 0
+
+    async def __call__(self, **kwargs):
+        self.calls += 1
+        call = self.calls
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(isError=self.is_error, value=call)
+
+
+@pytest.mark.anyio
+async def test_results_are_cached_by_arguments_until_they_expire():
+    cache, tool = ToolResultCache(), CountingTool(delay=0)
+    cached = cache.wrap("getTasks", tool, ttl=0.2)
+
+    first = await cached(limit=10, isComplete=False)
+    assert (await cached(isComplete=False, limit=10)) is first
+    assert (await cached(limit=20, isComplete=False)) is not first
+    await asyncio.sleep(0.25)
+    assert (await cached(limit=10, isComplete=False)) is not first
+    assert tool.calls == 3
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.anyio
+async def test_error_results_are_not_cached():
+    cache, tool = ToolResultCache(), CountingTool(delay=0, is_error=True)
+    cached = cache.wrap("getTasks", tool, ttl=60)
+
+    await cached(limit=10)
+    await cached(limit=10)
+    assert tool.calls == 2
+
+
+@pytest.mark.anyio
+async def test_concurrent_identical_calls_share_one_request():
+    cache, tool = ToolResultCache(), CountingTool()
+    cached = cache.wrap("getTasks", tool, ttl=60)
+
+    results = await asyncio.gather(*(cached(limit=10) for _ in range(5)))
+    assert tool.calls == 1
+    assert all(result is results[0] for result in results)
+
+
+@pytest.mark.anyio
+async def test_cancelled_caller_does_not_cancel_the_others_sharing_its_request():
+    cache, tool = ToolResultCache(), CountingTool()
+    cached = cache.wrap("getTasks", tool, ttl=60)
+
+    leader = asyncio.create_task(cached(limit=10))
+    await asyncio.sleep(0.01)
+    followers = [asyncio.create_task(cached(limit=10)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    results = await asyncio.gather(*followers)
+    assert leader.cancelled()
+    # One follower made the request again and the others shared it
+    assert tool.calls == 2
+    assert all(result.value == 2 for result in results)